@@ -11,6 +11,7 @@ import yaml
 from wurst import searching as ws
 
 from .filesystem_constants import DATA_DIR, VARIABLES_DIR
+from .indexing import SearchIndex
 
 POWERPLANT_TECHS = VARIABLES_DIR / "electricity_variables.yaml"
 FUELS_TECHS = VARIABLES_DIR / "fuels_variables.yaml"
@@ -52,6 +53,7 @@ def act_fltr(
     database: List[dict],
     fltr: Union[str, List[str]] = None,
     mask: Union[str, List[str]] = None,
+    search_index: SearchIndex = None,
 ) -> List[dict]:
     """Filter `database` for activities matching field contents given by `fltr` excluding strings in `mask`.
     `fltr`: string, list of strings or dictionary.
@@ -67,6 +69,9 @@ def act_fltr(
     :type fltr: Union[str, lst, dict]
     :param mask: value(s) to filter with.
     :type mask: Union[str, lst, dict]
+    :param search_index: if provided, index of `database` used to
+        narrow down the candidates before filtering.
+    :type search_index: SearchIndex
     :return: list of activity data set names
     :rtype: list
 
@@ -100,6 +105,12 @@ def act_fltr(
             else:
                 filters.append(ws.exclude(ws.contains(field, value)))
 
+    if search_index is not None:
+        for field, value in fltr.items():
+            if field in search_index.fields:
+                database = search_index.contains(database, field, value)
+                break
+
     return list(ws.get_many(database, *filters))
 
 
@@ -122,11 +133,16 @@ class InventorySet:
     """
 
     def __init__(
-        self, database: List[dict], version: str = None, model: str = None
+        self,
+        database: List[dict],
+        version: str = None,
+        model: str = None,
+        search_index: SearchIndex = None,
     ) -> None:
         self.database = database
         self.version = version
         self.model = model
+        self.search_index = search_index or SearchIndex()
 
         self.powerplant_filters = get_mapping(
             filepath=POWERPLANT_TECHS, var="ecoinvent_aliases", model=self.model
@@ -290,15 +306,22 @@ class InventorySet:
                 else:
                     names.append(entry["fltr"])
 
-        subset = list(
-            ws.get_many(
-                database,
-                ws.either(*[ws.contains("name", name) for name in names]),
+        if database is self.database:
+            subset = self.search_index.contains(database, "name", names)
+        else:
+            subset = list(
+                ws.get_many(
+                    database,
+                    ws.either(*[ws.contains("name", name) for name in names]),
+                )
             )
-        )
+
+        subset_index = SearchIndex(fields=("name",))
 
         techs = {
-            tech: act_fltr(subset, fltr.get("fltr"), fltr.get("mask"))
+            tech: act_fltr(
+                subset, fltr.get("fltr"), fltr.get("mask"), search_index=subset_index
+            )
             for tech, fltr in filtr.items()
         }
 
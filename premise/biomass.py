@@ -28,7 +28,7 @@ IAM_BIOMASS_VARS = VARIABLES_DIR / "biomass_variables.yaml"
 logger = create_logger("biomass")
 
 
-def _update_biomass(scenario, version, system_model):
+def _update_biomass(scenario, version, system_model, workers=None):
     biomass = Biomass(
         database=scenario["database"],
         iam_data=scenario["iam data"],
@@ -39,6 +39,7 @@ def _update_biomass(scenario, version, system_model):
         system_model=system_model,
         cache=scenario.get("cache"),
         index=scenario.get("index"),
+        workers=workers,
     )
 
     if scenario["iam data"].biomass_markets is not None:
@@ -92,6 +93,7 @@ class Biomass(BaseTransformation):
         system_model: str,
         cache: dict = None,
         index: dict = None,
+        workers: int = None,
     ) -> None:
         super().__init__(
             database,
@@ -103,6 +105,7 @@ class Biomass(BaseTransformation):
             system_model,
             cache,
             index,
+            workers,
         )
         self.system_model = system_model
         self.biosphere_dict = biosphere_flows_dictionary(self.version)
@@ -25,7 +25,7 @@ from .validation import CementValidation
 logger = create_logger("cement")
 
 
-def _update_cement(scenario, version, system_model):
+def _update_cement(scenario, version, system_model, workers=None):
     cement = Cement(
         database=scenario["database"],
         model=scenario["model"],
@@ -36,6 +36,7 @@ def _update_cement(scenario, version, system_model):
         system_model=system_model,
         cache=scenario.get("cache"),
         index=scenario.get("index"),
+        workers=workers,
     )
 
     if scenario["iam data"].cement_markets is not None:
@@ -93,6 +94,7 @@ class Cement(BaseTransformation):
         system_model: str,
         cache: dict = None,
         index: dict = None,
+        workers: int = None,
     ):
         super().__init__(
             database,
@@ -104,10 +106,11 @@ class Cement(BaseTransformation):
             system_model,
             cache,
             index,
+            workers,
         )
         self.version = version
 
-        mapping = InventorySet(self.database)
+        mapping = InventorySet(self.database, search_index=self.search_index)
         self.cement_fuels_map: dict = mapping.generate_cement_fuels_map()
 
         # reverse the fuel map to get a mapping from ecoinvent to premise
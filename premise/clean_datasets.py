@@ -7,7 +7,7 @@ filling missing exchange information, etc.
 import csv
 import pprint
 from pathlib import Path
-from typing import Dict, List, Tuple, Union
+from typing import Callable, Dict, List, Tuple, Union
 
 import bw2io
 import numpy as np
@@ -167,12 +167,9 @@ class DatabaseCleaner:
             )
             ecoinvent.apply_strategies()
             self.database = ecoinvent.data
-            # Location field is added to exchanges
-            self.add_location_field_to_exchanges()
-            # Product field is added to exchanges
-            self.add_product_field_to_exchanges()
-            # Parameter field is converted from a list to a dictionary
-            self.transform_parameter_field()
+            # Location and product fields are added to exchanges,
+            # and the parameter field is converted to a dictionary
+            self.fix_ecospold_datasets()
         self.version = version
 
     def find_product_given_lookup_dict(self, lookup_dict: Dict[str, str]) -> List[str]:
@@ -211,43 +208,29 @@ class DatabaseCleaner:
             )
         ]
 
-    def add_location_field_to_exchanges(self) -> None:
+    def fix_ecospold_datasets(self) -> None:
         """
-        Add the `location` key to the production and
-        technosphere exchanges in :attr:`database`.
+        Complete the datasets imported from ecospold files, in a single pass:
 
-        :raises IndexError: if no corresponding activity
-            (and reference product) can be found.
+        * add the `location` key to technosphere exchanges,
+        * add the `product` key to production and technosphere exchanges,
+          using the reference product of the dataset or of the supplier,
+        * set the name of production and technosphere exchanges
+          to the name of the dataset or of the supplier,
+        * convert the `parameters` field from a list to a dictionary.
 
-        """
-        d_location = {(a["database"], a["code"]): a["location"] for a in self.database}
-        for dataset in self.database:
-            for exchange in dataset["exchanges"]:
-                if exchange["type"] == "technosphere":
-                    exc_input = exchange["input"]
-                    exchange["location"] = d_location[exc_input]
-
-    def add_product_field_to_exchanges(self) -> None:
-        """
-
-        Add the `product` key to the production and
-        technosphere exchanges in :attr:`database`.
-
-        For production exchanges, use the value
-        of the `reference_product` field.
-        For technosphere exchanges, search the
-        activities in :attr:`database` and
-        use the reference product.
-
-        :raises IndexError: if no corresponding
-            activity (and reference product) can be found.
+        :raises KeyError: if the supplier of an exchange cannot be found.
 
         """
-        # Create a dictionary that contains the 'code' field as key and the 'product' field as value
-        d_product = {
-            a["code"]: (a["reference product"], a["name"]) for a in self.database
+        suppliers = {
+            (a["database"], a["code"]): (
+                a["location"],
+                a["reference product"],
+                a["name"],
+            )
+            for a in self.database
         }
-        # Add a `product` field to the production exchange
+
         for dataset in self.database:
             for exchange in dataset["exchanges"]:
                 if exchange["type"] == "production":
@@ -257,240 +240,249 @@ class DatabaseCleaner:
                     if exchange["name"] != dataset["name"]:
                         exchange["name"] = dataset["name"]
 
-        # Add a `product` field to technosphere exchanges
-        for dataset in self.database:
-            for exchange in dataset["exchanges"]:
-                if exchange["type"] == "technosphere":
-                    # Check if the field 'product' is present
-                    if "product" not in exchange:
-                        exchange["product"] = d_product[exchange["input"][1]][0]
+                elif exchange["type"] == "technosphere":
+                    location, product, name = suppliers[exchange["input"]]
+                    exchange["location"] = location
 
                     # If a 'reference product' field is present,
                     # we make sure it matches with the new 'product' field
-                    if "reference product" in exchange:
-                        try:
-                            assert exchange["product"] == exchange["reference product"]
-                        except AssertionError:
-                            exchange["product"] = d_product[exchange["input"][1]][0]
+                    if (
+                        "product" not in exchange
+                        or exchange.get("reference product", exchange["product"])
+                        != exchange["product"]
+                    ):
+                        exchange["product"] = product
 
                     # Ensure the name is correct
-                    exchange["name"] = d_product[exchange["input"][1]][1]
+                    exchange["name"] = name
 
-    def transform_parameter_field(self) -> None:
-        """
-        Transform the parameter field of the database to a dictionary.
-        """
-        # When handling ecospold files directly, the parameter field is a list.
-        # It is here transformed into a dictionary
-        for dataset in self.database:
+            # When handling ecospold files directly, the parameter field is a list.
+            # It is here transformed into a dictionary
             dataset["parameters"] = {
                 k["name"]: k["amount"] for k in dataset["parameters"]
             }
 
     # Functions to clean up Wurst import and additional technologies
     def fix_unset_technosphere_and_production_exchange_locations(
-        self, matching_fields: Tuple[str, str] = ("name", "unit")
+        self, dataset: dict
     ) -> None:
         """
-        Give all the production and technopshere exchanges
-        with a missing location name the location of the dataset
-        they belong to.
+        Give the production exchanges of a dataset with a missing location
+        the location of the dataset, and its technosphere exchanges with a
+        missing location the location of the only dataset with the same
+        name and unit.
         Modifies in place (does not return anything).
 
-        :param matching_fields: filter conditions
-        :type matching_fields: tuple
+        :param dataset: dataset to fix
 
         """
-        for dataset in self.database:
-            # collect production exchanges that simply do not have a location key and set it to
-            # the location of the dataset
-            for exc in wurst.production(dataset):
-                if "location" not in exc:
-                    exc["location"] = dataset["location"]
-
-            for exc in wurst.technosphere(dataset):
-                if "location" not in exc:
-                    locs = self.find_location_given_lookup_dict(
-                        {k: exc.get(k) for k in matching_fields}
+        # collect production exchanges that simply do not have a location key and set it to
+        # the location of the dataset
+        for exc in wurst.production(dataset):
+            if "location" not in exc:
+                exc["location"] = dataset["location"]
+
+        for exc in wurst.technosphere(dataset):
+            if "location" not in exc:
+                locs = self.locations.get((exc.get("name"), exc.get("unit")), [])
+                if len(locs) == 1:
+                    exc["location"] = locs[0]
+                else:
+                    print(
+                        f"No unique location found for exchange:\n{pprint.pformat(exc)}\nFound: {locs}"
                     )
-                    if len(locs) == 1:
-                        exc["location"] = locs[0]
-                    else:
-                        print(
-                            f"No unique location found for exchange:\n{pprint.pformat(exc)}\nFound: {locs}"
-                        )
-
-    def fix_biosphere_flow_categories(self) -> None:
-        """Add a `categories` for biosphere flows if missing.
-        This happens when importing directly from ecospold files"""
 
-        dict_bio_cat = get_biosphere_flow_categories(self.version)
-        dict_bio_uuid = get_biosphere_flow_uuid(self.version)
+    def fix_biosphere_flow_categories(self, dataset: dict) -> None:
+        """Add a `categories` for biosphere flows of a dataset if missing.
+        This happens when importing directly from ecospold files
 
-        for dataset in self.database:
-            for exc in dataset["exchanges"]:
-                if exc["type"] == "biosphere":
-                    if "categories" not in exc:
-                        # from the uuid, fetch the flow category
-                        if "input" in exc:
-                            if exc["input"][1] in dict_bio_cat:
-                                key = exc["input"][1]
-                                exc["categories"] = dict_bio_cat[key]
-                            else:
-                                print(f"no flow code for {exc['name']}")
-                                exc["delete"] = True
-
-                        elif "flow" in exc:
-                            if exc["flow"] in dict_bio_cat:
-                                key = exc["flow"]
-                                exc["categories"] = dict_bio_cat[key]
-                            else:
-                                print(f"no flow code for {exc['name']}")
-                                exc["delete"] = True
+        :param dataset: dataset to fix
+        """
 
+        for exc in dataset["exchanges"]:
+            if exc["type"] == "biosphere":
+                if "categories" not in exc:
+                    # from the uuid, fetch the flow category
+                    if "input" in exc:
+                        if exc["input"][1] in self.dict_bio_cat:
+                            key = exc["input"][1]
+                            exc["categories"] = self.dict_bio_cat[key]
                         else:
-                            print(f"no input or categories for {exc['name']}")
+                            print(f"no flow code for {exc['name']}")
                             exc["delete"] = True
 
-                    if "input" not in exc:
-                        if "flow" in exc:
-                            exc["input"] = ("biosphere3", exc["flow"])
-
-                        elif "categories" in exc:
-                            # from the category, fetch the uuid of that biosphere flow
-                            cat = (
-                                exc["categories"]
-                                if len(exc["categories"]) > 1
-                                else (exc["categories"][0], "unspecified")
-                            )
-                            uuid = dict_bio_uuid[
-                                exc["name"], cat[0], cat[1], exc["unit"]
-                            ]
-                            exc["input"] = ("biosphere3", uuid)
-
-                            if "delete" in exc:
-                                del exc["delete"]
+                    elif "flow" in exc:
+                        if exc["flow"] in self.dict_bio_cat:
+                            key = exc["flow"]
+                            exc["categories"] = self.dict_bio_cat[key]
                         else:
-                            print(f"no input or categories for {exc['name']}")
+                            print(f"no flow code for {exc['name']}")
                             exc["delete"] = True
 
-            dataset["exchanges"] = [
-                exc for exc in dataset["exchanges"] if "delete" not in exc
-            ]
+                    else:
+                        print(f"no input or categories for {exc['name']}")
+                        exc["delete"] = True
+
+                if "input" not in exc:
+                    if "flow" in exc:
+                        exc["input"] = ("biosphere3", exc["flow"])
+
+                    elif "categories" in exc:
+                        # from the category, fetch the uuid of that biosphere flow
+                        cat = (
+                            exc["categories"]
+                            if len(exc["categories"]) > 1
+                            else (exc["categories"][0], "unspecified")
+                        )
+                        uuid = self.dict_bio_uuid[
+                            exc["name"], cat[0], cat[1], exc["unit"]
+                        ]
+                        exc["input"] = ("biosphere3", uuid)
+
+                        if "delete" in exc:
+                            del exc["delete"]
+                    else:
+                        print(f"no input or categories for {exc['name']}")
+                        exc["delete"] = True
 
-    def correct_biogas_activities(self):
+        dataset["exchanges"] = [
+            exc for exc in dataset["exchanges"] if "delete" not in exc
+        ]
+
+    def correct_biogas_activities(self, dataset: dict) -> None:
         """
         Some activities producing biogas are not given any
         biogenic CO2 or energy input, leading to imbalanced carbon and energy flows
         when combusted.
-        """
-
-        list_biogas_activities = load_methane_correction_list()
-        biosphere_codes = get_biosphere_flow_uuid(self.version)
 
-        # find datasets that have a name in the list
-        filters = [
-            ws.either(*[ws.equals("name", name) for name in list_biogas_activities]),
-        ]
+        :param dataset: dataset to fix
+        """
 
-        biogas_datasets = ws.get_many(
-            self.database,
-            *filters,
-            ws.equals("reference product", "biogas"),
-            ws.equals("unit", "cubic meter"),
-        )
+        if (
+            dataset["name"] not in self.biogas_activities
+            or dataset.get("reference product") != "biogas"
+            or dataset.get("unit") != "cubic meter"
+        ):
+            return
 
         # add a flow of "Carbon dioxide, in air" to the dataset
         # if not present. We add 1.96 kg CO2/m3 biogas.
 
-        for ds in biogas_datasets:
-            # Add CO2 uptake
-            if not any(
-                exc
-                for exc in ws.biosphere(ds)
-                if exc["name"] == "Carbon dioxide, in air"
-            ):
-                ds["exchanges"].append(
-                    {
-                        "uncertainty type": 0,
-                        "amount": 1.96,
-                        "type": "biosphere",
-                        "name": "Carbon dioxide, in air",
-                        "unit": "kilogram",
-                        "categories": ("natural resource", "in air"),
-                        "input": (
-                            "biosphere3",
-                            biosphere_codes[
-                                (
-                                    "Carbon dioxide, in air",
-                                    "natural resource",
-                                    "in air",
-                                    "kilogram",
-                                )
-                            ],
-                        ),
-                    }
-                )
+        # Add CO2 uptake
+        if not any(
+            exc
+            for exc in ws.biosphere(dataset)
+            if exc["name"] == "Carbon dioxide, in air"
+        ):
+            dataset["exchanges"].append(
+                {
+                    "uncertainty type": 0,
+                    "amount": 1.96,
+                    "type": "biosphere",
+                    "name": "Carbon dioxide, in air",
+                    "unit": "kilogram",
+                    "categories": ("natural resource", "in air"),
+                    "input": (
+                        "biosphere3",
+                        self.dict_bio_uuid[
+                            (
+                                "Carbon dioxide, in air",
+                                "natural resource",
+                                "in air",
+                                "kilogram",
+                            )
+                        ],
+                    ),
+                }
+            )
 
-            # Add primary energy flow
-            if not any(
-                exc
-                for exc in ws.biosphere(ds)
-                if exc["name"] == "Energy, gross calorific value, in biomass"
-            ):
-                ds["exchanges"].append(
-                    {
-                        "uncertainty type": 0,
-                        "amount": 22.73,
-                        "type": "biosphere",
-                        "name": "Energy, gross calorific value, in biomass",
-                        "unit": "megajoule",
-                        "categories": ("natural resource", "biotic"),
-                        "input": (
-                            "biosphere3",
-                            biosphere_codes[
-                                (
-                                    "Energy, gross calorific value, in biomass",
-                                    "natural resource",
-                                    "biotic",
-                                    "megajoule",
-                                )
-                            ],
-                        ),
-                    }
-                )
+        # Add primary energy flow
+        if not any(
+            exc
+            for exc in ws.biosphere(dataset)
+            if exc["name"] == "Energy, gross calorific value, in biomass"
+        ):
+            dataset["exchanges"].append(
+                {
+                    "uncertainty type": 0,
+                    "amount": 22.73,
+                    "type": "biosphere",
+                    "name": "Energy, gross calorific value, in biomass",
+                    "unit": "megajoule",
+                    "categories": ("natural resource", "biotic"),
+                    "input": (
+                        "biosphere3",
+                        self.dict_bio_uuid[
+                            (
+                                "Energy, gross calorific value, in biomass",
+                                "natural resource",
+                                "biotic",
+                                "megajoule",
+                            )
+                        ],
+                    ),
+                }
+            )
 
-    def prepare_datasets(self, keep_uncertainty_data) -> List[dict]:
+    def prepare_datasets(
+        self,
+        keep_uncertainty_data,
+        fixers: List[Callable[[dict], None]] = None,
+    ) -> List[dict]:
         """
         Clean datasets for all databases listed in
         scenarios: fix location names, remove
         empty exchanges, etc.
 
+        The fixes are applied to each dataset in turn,
+        in a single traversal of the database.
+
+        :param keep_uncertainty_data: if False, uncertainty data are removed
+        :param fixers: additional functions to apply to each dataset,
+        after the fixes of premise. They modify the dataset in place.
+        :return: cleaned database
+
         """
 
         # Set missing locations to ```GLO``` for datasets in ``database``
+        # and index the locations of the datasets by name and unit
         print("Set missing location of datasets to global scope.")
-        wurst.default_global_location(self.database)
+        self.locations = {}
+        for dataset in self.database:
+            if dataset.get("location") is None:
+                dataset["location"] = "GLO"
+            self.locations.setdefault(
+                (dataset.get("name"), dataset.get("unit")), []
+            ).append(dataset["location"])
+
+        self.dict_bio_cat = get_biosphere_flow_categories(self.version)
+        self.dict_bio_uuid = get_biosphere_flow_uuid(self.version)
+        self.biogas_activities = set(load_methane_correction_list())
 
         # Set missing locations to ```GLO``` for exchanges in ``datasets``
         print("Set missing location of production exchanges to scope of dataset.")
-
         print("Correct missing location of technosphere exchanges.")
-        self.fix_unset_technosphere_and_production_exchange_locations()
-
         print("Correct missing flow categories for biosphere exchanges")
-        self.fix_biosphere_flow_categories()
-
         # Remove empty exchanges
         print("Remove empty exchanges.")
-        remove_nones(self.database)
 
-        # correct carbon and energy balance
-        self.correct_biogas_activities()
+        pipeline = [
+            self.fix_unset_technosphere_and_production_exchange_locations,
+            self.fix_biosphere_flow_categories,
+            lambda dataset: remove_nones([dataset]),
+            # correct carbon and energy balance
+            self.correct_biogas_activities,
+        ]
 
         # Remove uncertainty data
         if not keep_uncertainty_data:
             print("Remove uncertainty data.")
-            self.database = remove_uncertainty(self.database)
+            pipeline.append(lambda dataset: remove_uncertainty([dataset]))
+
+        pipeline.extend(fixers or [])
+
+        for dataset in self.database:
+            for fixer in pipeline:
+                fixer(dataset)
 
         return self.database
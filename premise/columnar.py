@@ -0,0 +1,385 @@
+"""
+columnar.py stores wurst databases as Arrow tables,
+an alternative to pickle for cached databases and scenario dumps.
+
+Each dataset is a row of the table, and each dataset field a column.
+Exchanges are stored in a list column, with one struct field per
+exchange field. Fields whose values are all of the same simple type
+(str, float, int or bool) are stored as typed Arrow columns, strings
+being dictionary-encoded, and tuples or lists of such values as list
+columns. Other fields (dictionaries, mixed types, etc.) are stored as
+pickled binary values, so that datasets round-trip exactly.
+Columns are decoded as a whole, rather than value by value.
+"""
+
+import pickle
+from collections.abc import Sequence
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+EXCHANGES = "exchanges"
+ARROW_TYPES = {
+    float: pa.float64(),
+    int: pa.int64(),
+    bool: pa.bool_(),
+}
+PICKLED = {b"encoding": b"pickle"}
+SEQUENCES = {
+    tuple: {b"encoding": b"tuple"},
+    list: {b"encoding": b"list"},
+}
+
+_MISSING = object()
+
+
+def _encode_values(name: str, values: list) -> Tuple[pa.Field, pa.Array]:
+    """
+    Return the Arrow field and array storing `values`.
+    Missing values are stored as nulls.
+    """
+    present = [v for v in values if v is not _MISSING]
+    types = {type(v) for v in present}
+    value_type = types.pop() if len(types) == 1 else None
+
+    if value_type is str:
+        array = pa.array(
+            [None if v is _MISSING else v for v in values], type=pa.string()
+        ).dictionary_encode()
+        # the smallest integer type indexing the dictionary
+        index_type = next(
+            t
+            for t in (pa.int8(), pa.int16(), pa.int32())
+            if len(array.dictionary) <= np.iinfo(t.to_pandas_dtype()).max + 1
+        )
+        array = pa.DictionaryArray.from_arrays(
+            array.indices.cast(index_type), array.dictionary
+        )
+        return pa.field(name, array.type), array
+
+    if value_type in ARROW_TYPES:
+        arrow_type = ARROW_TYPES[value_type]
+        try:
+            array = pa.array(
+                [None if v is _MISSING else v for v in values], type=arrow_type
+            )
+            return pa.field(name, arrow_type), array
+        except (pa.ArrowInvalid, OverflowError):
+            # e.g., integers too large for int64
+            pass
+
+    if value_type in SEQUENCES:
+        # the items of all the sequences are stored in a single child array
+        offsets = np.zeros(len(values) + 1, dtype=np.int32)
+        np.cumsum([0 if v is _MISSING else len(v) for v in values], out=offsets[1:])
+        item, items = _encode_values("item", [i for v in present for i in v])
+        array = pa.ListArray.from_arrays(
+            pa.array(offsets),
+            items,
+            type=pa.list_(item),
+            mask=pa.array([v is _MISSING for v in values], type=pa.bool_()),
+        )
+        return pa.field(name, array.type, metadata=SEQUENCES[value_type]), array
+
+    array = pa.array(
+        [
+            None if v is _MISSING else pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL)
+            for v in values
+        ],
+        type=pa.binary(),
+    )
+    return pa.field(name, pa.binary(), metadata=PICKLED), array
+
+
+def _encode_records(
+    records: List[dict], exclude: Iterable[str] = ()
+) -> Tuple[List[pa.Field], List[pa.Array]]:
+    """
+    Return one Arrow field and array per key found in `records`.
+    """
+    columns: Dict[str, list] = {}
+    size = len(records)
+
+    for i, record in enumerate(records):
+        # `dict.items` reads the values of copy-on-write
+        # datasets without copying them
+        for key, value in dict.items(record):
+            if key in exclude:
+                continue
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [_MISSING] * size
+            column[i] = value
+
+    fields, arrays = [], []
+    for key, values in columns.items():
+        field, array = _encode_values(key, values)
+        fields.append(field)
+        arrays.append(array)
+
+    return fields, arrays
+
+
+def _list_offsets(array: pa.Array) -> np.ndarray:
+    """
+    Return the offsets of a list array, relative to its first value.
+    """
+    offsets = array.offsets.to_numpy()
+    return offsets - offsets[0]
+
+
+def _list_values(array: pa.Array) -> pa.Array:
+    """
+    Return the values of a (possibly sliced) list array.
+    """
+    offsets = array.offsets.to_numpy()
+    return array.values.slice(offsets[0], offsets[-1] - offsets[0])
+
+
+def _decode_values(field: pa.Field, array: pa.Array) -> list:
+    """
+    Return the values stored in `array`,
+    with `_MISSING` in place of nulls.
+    """
+    if field.metadata == PICKLED:
+        return [_MISSING if v is None else pickle.loads(v) for v in array.to_pylist()]
+
+    if field.metadata in SEQUENCES.values():
+        sequence = tuple if field.metadata == SEQUENCES[tuple] else list
+        items = _decode_values(field.type.value_field, _list_values(array))
+        offsets = _list_offsets(array).tolist()
+        values = [
+            sequence(items[first:last]) for first, last in zip(offsets, offsets[1:])
+        ]
+    elif pa.types.is_dictionary(field.type) and len(array) < len(array.dictionary):
+        # the dictionary of a few values, e.g., of a single dataset,
+        # is not decoded as a whole
+        values = array.to_pylist()
+    elif pa.types.is_dictionary(field.type):
+        # strings are decoded once per distinct value, and shared
+        dictionary = np.empty(len(array.dictionary), dtype=object)
+        dictionary[:] = array.dictionary.to_pylist()
+        values = dictionary[array.indices.fill_null(0).to_numpy()].tolist()
+    else:
+        # nulls are filled first, or integers would be converted to floats
+        fill = False if pa.types.is_boolean(array.type) else 0
+        values = (
+            array.fill_null(fill).to_numpy(zero_copy_only=False).astype(object).tolist()
+        )
+
+    if array.null_count:
+        for i in np.flatnonzero(array.is_null().to_numpy(zero_copy_only=False)):
+            values[i] = _MISSING
+    return values
+
+
+def _decode_arrays(
+    fields: List[pa.Field], arrays: List[pa.Array], size: int
+) -> List[dict]:
+    """
+    Rebuild `size` records from Arrow `fields` and `arrays`.
+    """
+    dense, sparse = [], []
+    for field, array in zip(fields, arrays):
+        values = _decode_values(field, array)
+        (sparse if array.null_count else dense).append((field.name, values))
+
+    # fields present in all the records are zipped together,
+    # the others are added to the records that have them
+    names = [name for name, _ in dense]
+    if dense:
+        records = [dict(zip(names, row)) for row in zip(*(v for _, v in dense))]
+    else:
+        records = [{} for _ in range(size)]
+
+    for name, values in sparse:
+        for record, value in zip(records, values):
+            if value is not _MISSING:
+                record[name] = value
+
+    return records
+
+
+def database_to_table(database: List[dict]) -> pa.Table:
+    """
+    Convert a wurst database into an Arrow table.
+    :param database: list of datasets
+    :return: Arrow table, with one row per dataset
+    """
+    # exchanges are stored in a list column, unless some
+    # datasets have something else than a list of exchanges
+    nested = all(
+        type(dict.get(ds, EXCHANGES, [])) is list
+        and all(type(exc) is dict for exc in dict.get(ds, EXCHANGES, []))
+        for ds in database
+    )
+
+    fields, arrays = _encode_records(database, exclude=(EXCHANGES,) if nested else ())
+
+    if nested:
+        exchanges, offsets, mask = [], [0], []
+        for ds in database:
+            mask.append(EXCHANGES not in ds)
+            exchanges.extend(dict.get(ds, EXCHANGES, []))
+            offsets.append(len(exchanges))
+
+        exc_fields, exc_arrays = _encode_records(exchanges)
+        if exc_fields:
+            values = pa.StructArray.from_arrays(exc_arrays, fields=exc_fields)
+        else:
+            values = pa.array([{}] * len(exchanges), type=pa.struct([]))
+        array = pa.LargeListArray.from_arrays(
+            pa.array(offsets, type=pa.int64()),
+            values,
+            mask=pa.array(mask, type=pa.bool_()),
+        )
+        fields.append(pa.field(EXCHANGES, array.type))
+        arrays.append(array)
+
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def _is_nested(schema: pa.Schema) -> bool:
+    """
+    Return True if the exchanges are stored as a list of structs.
+    """
+    return (
+        EXCHANGES in schema.names
+        and schema.field(EXCHANGES).metadata is None
+        and pa.types.is_large_list(schema.field(EXCHANGES).type)
+    )
+
+
+def table_to_database(table: pa.Table) -> List[dict]:
+    """
+    Convert an Arrow table written by `database_to_table`
+    back into a wurst database.
+    :param table: Arrow table
+    :return: list of datasets
+    """
+    table = table.combine_chunks()
+    nested = _is_nested(table.schema)
+    fields = [f for f in table.schema if not (nested and f.name == EXCHANGES)]
+    database = _decode_arrays(
+        fields,
+        [table.column(f.name).chunk(0) for f in fields],
+        table.num_rows,
+    )
+
+    if nested:
+        column = table.column(EXCHANGES).chunk(0)
+        values = _list_values(column)
+        exchanges = _decode_arrays(list(values.type), values.flatten(), len(values))
+        offsets = _list_offsets(column).tolist()
+        for ds, is_valid, first, last in zip(
+            database,
+            column.is_valid().to_numpy(zero_copy_only=False).tolist(),
+            offsets,
+            offsets[1:],
+        ):
+            if is_valid:
+                ds[EXCHANGES] = exchanges[first:last]
+
+    return database
+
+
+def write_database(database: List[dict], filepath: Path) -> None:
+    """
+    Write a wurst database to an Arrow IPC file.
+    :param database: list of datasets
+    :param filepath: path of the file to write
+    """
+    table = database_to_table(database)
+    with pa.OSFile(str(filepath), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def read_database(filepath: Path) -> List[dict]:
+    """
+    Read a wurst database from an Arrow IPC file.
+    The file is memory-mapped rather than read into memory.
+    :param filepath: path of the file to read
+    :return: list of datasets
+    """
+    with pa.memory_map(str(filepath), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+        return table_to_database(table)
+
+
+class MappedDatabase(Sequence):
+    """
+    Read-only database backed by a memory-mapped Arrow file
+    written by `write_database`.
+
+    Datasets are decoded on access, and decoded datasets are not kept:
+    changes made to them are not stored. Datasets added with `append`
+    or `extend` are kept in memory, after those of the file.
+    `shared_datasets` decodes the file once per process, for callers
+    that share the datasets rather than copy them.
+    A pickled `MappedDatabase` maps the file again when unpickled, e.g.,
+    in a worker process, rather than sending the datasets. Processes
+    share the pages of the file, but not the decoded datasets:
+    each process decoding the whole file holds its own copy of them.
+    """
+
+    def __init__(self, filepath: Path, batch_size: int = 1000) -> None:
+        self.filepath = Path(filepath)
+        self.batch_size = batch_size
+        self._source = pa.memory_map(str(self.filepath), "r")
+        self._table = pa.ipc.open_file(self._source).read_all()
+        self._size = self._table.num_rows
+        self._tail: List[dict] = []
+        self._shared: List[dict] = None
+
+    def __len__(self) -> int:
+        return self._size + len(self._tail)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("database index out of range")
+
+        if index >= self._size:
+            return self._tail[index - self._size]
+        return table_to_database(self._table.slice(index, 1))[0]
+
+    def __iter__(self) -> Iterator[dict]:
+        # decode datasets by batches, rather than one by one
+        for start in range(0, self._size, self.batch_size):
+            yield from table_to_database(self._table.slice(start, self.batch_size))
+        yield from self._tail
+
+    def shared_datasets(self) -> List[dict]:
+        """
+        Return the datasets of the database, decoded on the first call
+        and then shared by all the callers of the process. Other processes
+        decode their own copy.
+        They must not be modified: wrap them with `copy_on_write_database`.
+        :return: list of datasets
+        """
+        if self._shared is None:
+            self._shared = list(islice(self, self._size))
+        return self._shared + self._tail
+
+    def append(self, dataset: dict) -> None:
+        self._tail.append(dataset)
+
+    def extend(self, datasets: Iterable[dict]) -> None:
+        self._tail.extend(datasets)
+
+    def __reduce__(self):
+        return _map_database, (self.filepath, self.batch_size, self._tail)
+
+
+def _map_database(filepath: Path, batch_size: int, tail: List[dict]) -> MappedDatabase:
+    database = MappedDatabase(filepath, batch_size)
+    database.extend(tail)
+    return database
@@ -6,7 +6,9 @@ and emission values for different sectors, carbon capture rates, etc.
 
 import copy
 import csv
+import hashlib
 import os
+import pickle
 from functools import lru_cache
 from io import BytesIO, StringIO
 from itertools import chain
@@ -17,10 +19,16 @@ import numpy as np
 import pandas as pd
 import xarray as xr
 import yaml
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken
 from prettytable import PrettyTable
 
-from .filesystem_constants import DATA_DIR, IAM_OUTPUT_DIR, VARIABLES_DIR
+from . import __version__
+from .filesystem_constants import (
+    DATA_DIR,
+    DIR_CACHED_DB,
+    IAM_OUTPUT_DIR,
+    VARIABLES_DIR,
+)
 from .geomap import Geomap
 from .marginal_mixes import consequential_method
 
@@ -316,6 +324,47 @@ def flatten(list_to_flatten):
     return rt
 
 
+@lru_cache
+def load_variables_file(filepath: Path) -> dict:
+    """
+    Load a yaml file of IAM variables.
+    :param filepath: path to the yaml file
+    :return: content of the file
+    """
+    with open(filepath, "r", encoding="utf-8") as stream:
+        return yaml.safe_load(stream)
+
+
+class lazy_attribute:
+    """
+    Attribute computed by the decorated method on first access.
+    The value is kept in the `_lazy_attributes` dictionary of the instance,
+    which is shared with the instances returned by `for_year`,
+    and cached on disk, next to the cached IAM data, for later runs.
+    """
+
+    def __init__(self, method):
+        self.method = method
+        self.name = method.__name__
+        self.__doc__ = method.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        values = instance._lazy_attributes
+        if self.name not in values:
+            cached = instance.read_cached_attribute(self.name)
+            if cached is not None:
+                values[self.name] = cached[self.name]
+            else:
+                values[self.name] = self.method(instance)
+                instance.write_cached_attribute(self.name, values[self.name])
+        return values[self.name]
+
+    def __set__(self, instance, value):
+        instance._lazy_attributes[self.name] = value
+
+
 class IAMDataCollection:
     """
     :var model: name of the IAM model (e.g., "remind")
@@ -343,113 +392,37 @@ class IAMDataCollection:
         self.external_scenarios = external_scenarios
         self.system_model_args = system_model_args
         self.use_absolute_efficiency = use_absolute_efficiency
+        self.system_model = system_model
+        self.gains_scenario = gains_scenario
         self.min_year = 2005
         self.max_year = 2100
+        self._lazy_attributes = {}
         key = key or None
 
-        electricity_prod_vars = self.__get_iam_variable_labels(
-            IAM_ELEC_VARS, variable="iam_aliases"
-        )
-        electricity_eff_vars = self.__get_iam_variable_labels(
-            IAM_ELEC_VARS, variable="eff_aliases"
-        )
-
-        fuel_prod_vars = self.__get_iam_variable_labels(
-            IAM_FUELS_VARS, variable="iam_aliases"
-        )
-        fuel_eff_vars = self.__get_iam_variable_labels(
-            IAM_FUELS_VARS, variable="eff_aliases"
-        )
-
-        cement_prod_vars = self.__get_iam_variable_labels(
-            IAM_CEMENT_VARS, variable="iam_aliases"
-        )
-
-        cement_energy_vars = self.__get_iam_variable_labels(
-            IAM_CEMENT_VARS, variable="energy_use_aliases"
-        )
-
-        cement_eff_vars = self.__get_iam_variable_labels(
-            IAM_CEMENT_VARS, variable="eff_aliases"
-        )
-
-        steel_prod_vars = self.__get_iam_variable_labels(
-            IAM_STEEL_VARS, variable="iam_aliases"
-        )
+        filepath = self.__find_iam_file(filepath_iam_files)
 
-        steel_energy_vars = self.__get_iam_variable_labels(
-            IAM_STEEL_VARS, variable="energy_use_aliases"
+        # the parsed IAM data are cached,
+        # and re-used by scenarios of the same file
+        cache_file = self.__cached_file_name(
+            filepath, system_model=system_model, gains_scenario=gains_scenario
         )
-
-        steel_eff_vars = self.__get_iam_variable_labels(
-            IAM_STEEL_VARS, variable="eff_aliases"
-        )
-
-        dac_prod_vars = self.__get_iam_variable_labels(
-            IAM_DAC_VARS, variable="iam_aliases"
-        )
-
-        dac_heat_vars = self.__get_iam_variable_labels(
-            IAM_DAC_VARS, variable="heat_use_aliases"
-        )
-        dac_electricity_vars = self.__get_iam_variable_labels(
-            IAM_DAC_VARS, variable="electricity_use_aliases"
-        )
-
-        biomass_prod_vars = self.__get_iam_variable_labels(
-            IAM_BIOMASS_VARS, variable="iam_aliases"
-        )
-
-        biomass_eff_vars = self.__get_iam_variable_labels(
-            IAM_BIOMASS_VARS, variable="eff_aliases"
-        )
-
-        land_use_vars = self.__get_iam_variable_labels(
-            IAM_CROPS_VARS, variable="land_use"
-        )
-        land_use_change_vars = self.__get_iam_variable_labels(
-            IAM_CROPS_VARS, variable="land_use_change"
-        )
-
-        carbon_capture_vars = self.__get_iam_variable_labels(
-            IAM_CARBON_CAPTURE_VARS, variable="iam_aliases"
-        )
-
-        other_vars = self.__get_iam_variable_labels(
-            IAM_OTHER_VARS, variable="iam_aliases"
-        )
-
-        # new_vars is a list of all variables that are declared above
-
-        new_vars = (
-            list(electricity_prod_vars.values())
-            + list(electricity_eff_vars.values())
-            + list(fuel_prod_vars.values())
-            + list(fuel_eff_vars.values())
-            + list(cement_prod_vars.values())
-            + list(cement_energy_vars.values())
-            + list(cement_eff_vars.values())
-            + list(steel_prod_vars.values())
-            + list(steel_energy_vars.values())
-            + list(dac_prod_vars.values())
-            + list(biomass_prod_vars.values())
-            + list(biomass_eff_vars.values())
-            + list(land_use_vars.values())
-            + list(land_use_change_vars.values())
-            + list(carbon_capture_vars.values())
-            + list(other_vars.values())
-        )
-
-        # flatten the list of lists
-        new_vars = flatten(new_vars)
+        self._cache_file = cache_file
+        self._cache_key = key
+        cached_data = self.__read_cache(cache_file, key)
+        if cached_data is not None:
+            self.__dict__.update(cached_data)
+            self.__check_year(self.year)
+            return
 
         # if "liquid fossil fuels" is in the list of fuel variables
         # we add the split of gasoline, diesel, LPG and kerosene
         # to `data`, because it means it's not already in the IAM file.
+        fuel_prod_vars = self.__get_iam_variable_labels(
+            IAM_FUELS_VARS, variable="iam_aliases"
+        )
         data = self.__get_iam_data(
             key=key,
-            filedir=filepath_iam_files,
-            variables=new_vars,
+            filepath=filepath,
             split_fossil_liquid_fuels=(
                 fuel_prod_vars if "liquid fossil fuels" in fuel_prod_vars else None
             ),
@@ -458,295 +431,491 @@ class IAMDataCollection:
         self.data = data
 
         self.regions = data.region.values.tolist()
-        self.system_model = system_model
 
-        self.gains_data_EU = get_gains_EU_data()
-        self.gains_data_IAM = get_gains_IAM_data(
-            self.model, gains_scenario=gains_scenario
-        )
+        self.__write_cache(cache_file, key)
+
+    @lazy_attribute
+    def gains_data_EU(self) -> xr.DataArray:
+        return get_gains_EU_data()
+
+    @lazy_attribute
+    def gains_data_IAM(self) -> xr.DataArray:
+        return get_gains_IAM_data(self.model, gains_scenario=self.gains_scenario)
 
-        self.electricity_markets = self.__fetch_market_data(
-            data=data,
-            input_vars=electricity_prod_vars,
+    @lazy_attribute
+    def electricity_markets(self) -> [xr.DataArray, None]:
+        return self.__fetch_market_data(
+            data=self.data,
+            input_vars=self.__get_iam_variable_labels(
+                IAM_ELEC_VARS, variable="iam_aliases"
+            ),
             system_model=self.system_model,
             sector="electricity",
         )
 
-        self.petrol_markets = self.__fetch_market_data(
-            data=data,
-            input_vars={
-                k: v
-                for k, v in fuel_prod_vars.items()
-                if any(
-                    k.lower().startswith(x)
-                    for x in [
-                        "gasoline",
-                        "ethanol",
-                        "methanol",
-                        "bioethanol",
-                        "petrol,",
-                    ]
-                )
-            },
+    @lazy_attribute
+    def petrol_markets(self) -> [xr.DataArray, None]:
+        return self.__fetch_market_data(
+            data=self.data,
+            input_vars=self.__get_fuel_labels(
+                "iam_aliases",
+                ["gasoline", "ethanol", "methanol", "bioethanol", "petrol,"],
+            ),
             system_model=self.system_model,
             sector="petrol",
         )
 
-        self.diesel_markets = self.__fetch_market_data(
-            data=data,
-            input_vars={
-                k: v
-                for k, v in fuel_prod_vars.items()
-                if any(
-                    k.lower().startswith(x)
-                    for x in [
-                        "diesel",
-                        "biodiesel",
-                    ]
-                )
-            },
+    @lazy_attribute
+    def diesel_markets(self) -> [xr.DataArray, None]:
+        return self.__fetch_market_data(
+            data=self.data,
+            input_vars=self.__get_fuel_labels("iam_aliases", ["diesel", "biodiesel"]),
             system_model=self.system_model,
             sector="diesel",
         )
 
-        self.gas_markets = self.__fetch_market_data(
-            data=data,
-            input_vars={
-                k: v
-                for k, v in fuel_prod_vars.items()
-                if any(
-                    k.lower().startswith(x)
-                    for x in ["biogas", "methane", "natural gas", "biomethane"]
-                )
-            },
+    @lazy_attribute
+    def gas_markets(self) -> [xr.DataArray, None]:
+        return self.__fetch_market_data(
+            data=self.data,
+            input_vars=self.__get_fuel_labels(
+                "iam_aliases", ["biogas", "methane", "natural gas", "biomethane"]
+            ),
             system_model=self.system_model,
             sector="gas",
         )
 
-        self.hydrogen_markets = self.__fetch_market_data(
-            data=data,
-            input_vars={
-                k: v
-                for k, v in fuel_prod_vars.items()
-                if any(
-                    k.lower().startswith(x)
-                    for x in [
-                        "hydrogen",
-                    ]
-                )
-            },
+    @lazy_attribute
+    def hydrogen_markets(self) -> [xr.DataArray, None]:
+        return self.__fetch_market_data(
+            data=self.data,
+            input_vars=self.__get_fuel_labels("iam_aliases", ["hydrogen"]),
             system_model=self.system_model,
             sector="hydrogen",
         )
 
-        self.kerosene_markets = self.__fetch_market_data(
-            data=data,
-            input_vars={
-                k: v
-                for k, v in fuel_prod_vars.items()
-                if any(
-                    k.lower().startswith(x)
-                    for x in [
-                        "kerosene",
-                    ]
-                )
-            },
+    @lazy_attribute
+    def kerosene_markets(self) -> [xr.DataArray, None]:
+        return self.__fetch_market_data(
+            data=self.data,
+            input_vars=self.__get_fuel_labels("iam_aliases", ["kerosene"]),
             system_model=self.system_model,
             sector="kerosene",
         )
 
-        self.lpg_markets = self.__fetch_market_data(
-            data=data,
-            input_vars={
-                k: v
-                for k, v in fuel_prod_vars.items()
-                if any(
-                    k.lower().startswith(x)
-                    for x in [
-                        "liquefied petroleum gas",
-                    ]
-                )
-            },
+    @lazy_attribute
+    def lpg_markets(self) -> [xr.DataArray, None]:
+        return self.__fetch_market_data(
+            data=self.data,
+            input_vars=self.__get_fuel_labels(
+                "iam_aliases", ["liquefied petroleum gas"]
+            ),
             system_model=self.system_model,
             sector="lpg",
         )
 
-        self.cement_markets = self.__fetch_market_data(
-            data=data,
-            input_vars=cement_prod_vars,
+    @lazy_attribute
+    def cement_markets(self) -> [xr.DataArray, None]:
+        return self.__fetch_market_data(
+            data=self.data,
+            input_vars=self.__get_iam_variable_labels(
+                IAM_CEMENT_VARS, variable="iam_aliases"
+            ),
             system_model="cutoff",
             sector="cement",
         )
-        self.steel_markets = self.__fetch_market_data(
-            data=data, input_vars=steel_prod_vars, system_model="cutoff", sector="steel"
+
+    @lazy_attribute
+    def steel_markets(self) -> [xr.DataArray, None]:
+        return self.__fetch_market_data(
+            data=self.data,
+            input_vars=self.__get_iam_variable_labels(
+                IAM_STEEL_VARS, variable="iam_aliases"
+            ),
+            system_model="cutoff",
+            sector="steel",
         )
-        self.dac_markets = self.__fetch_market_data(
-            data=data, input_vars=dac_prod_vars, system_model="cutoff", sector="dac"
+
+    @lazy_attribute
+    def dac_markets(self) -> [xr.DataArray, None]:
+        return self.__fetch_market_data(
+            data=self.data,
+            input_vars=self.__get_iam_variable_labels(
+                IAM_DAC_VARS, variable="iam_aliases"
+            ),
+            system_model="cutoff",
+            sector="dac",
         )
-        self.biomass_markets = self.__fetch_market_data(
-            data=data,
-            input_vars=biomass_prod_vars,
+
+    @lazy_attribute
+    def biomass_markets(self) -> [xr.DataArray, None]:
+        return self.__fetch_market_data(
+            data=self.data,
+            input_vars=self.__get_iam_variable_labels(
+                IAM_BIOMASS_VARS, variable="iam_aliases"
+            ),
             system_model="cutoff",
             sector="biomass",
         )
 
-        self.carbon_capture_rate = self.__get_carbon_capture_rate(
+    @lazy_attribute
+    def carbon_capture_rate(self) -> xr.DataArray:
+        return self.__get_carbon_capture_rate(
             dict_vars=self.__get_iam_variable_labels(
                 IAM_CARBON_CAPTURE_VARS,
                 variable="iam_aliases",
             ),
-            data=data,
+            data=self.data,
         )
 
-        self.other_vars = self.__fetch_market_data(
-            data=data,
-            input_vars=other_vars,
+    @lazy_attribute
+    def other_vars(self) -> [xr.DataArray, None]:
+        return self.__fetch_market_data(
+            data=self.data,
+            input_vars=self.__get_iam_variable_labels(
+                IAM_OTHER_VARS, variable="iam_aliases"
+            ),
             normalize=False,
             system_model="cutoff",
         )
 
-        self.electricity_efficiencies = self.get_iam_efficiencies(
-            data=data,
-            efficiency_labels=electricity_eff_vars,
+    @lazy_attribute
+    def electricity_efficiencies(self) -> [xr.DataArray, None]:
+        return self.get_iam_efficiencies(
+            data=self.data,
+            efficiency_labels=self.__get_iam_variable_labels(
+                IAM_ELEC_VARS, variable="eff_aliases"
+            ),
             use_absolute_efficiency=self.use_absolute_efficiency,
         )
 
-        self.cement_efficiencies = self.get_iam_efficiencies(
-            data=data,
-            efficiency_labels=cement_eff_vars,
-            energy_labels=cement_energy_vars,
-            production_labels=cement_prod_vars,
+    @lazy_attribute
+    def cement_efficiencies(self) -> [xr.DataArray, None]:
+        return self.get_iam_efficiencies(
+            data=self.data,
+            efficiency_labels=self.__get_iam_variable_labels(
+                IAM_CEMENT_VARS, variable="eff_aliases"
+            ),
+            energy_labels=self.__get_iam_variable_labels(
+                IAM_CEMENT_VARS, variable="energy_use_aliases"
+            ),
+            production_labels=self.__get_iam_variable_labels(
+                IAM_CEMENT_VARS, variable="iam_aliases"
+            ),
         )
 
-        self.steel_efficiencies = self.get_iam_efficiencies(
-            data=data,
-            production_labels=steel_prod_vars,
-            energy_labels=steel_energy_vars,
-            efficiency_labels=steel_eff_vars,
+    @lazy_attribute
+    def steel_efficiencies(self) -> [xr.DataArray, None]:
+        return self.get_iam_efficiencies(
+            data=self.data,
+            production_labels=self.__get_iam_variable_labels(
+                IAM_STEEL_VARS, variable="iam_aliases"
+            ),
+            energy_labels=self.__get_iam_variable_labels(
+                IAM_STEEL_VARS, variable="energy_use_aliases"
+            ),
+            efficiency_labels=self.__get_iam_variable_labels(
+                IAM_STEEL_VARS, variable="eff_aliases"
+            ),
         )
 
-        self.petrol_efficiencies = self.get_iam_efficiencies(
-            data=data,
-            efficiency_labels={
-                k: v
-                for k, v in fuel_eff_vars.items()
-                if any(
-                    k.lower().startswith(x)
-                    for x in ["gasoline", "ethanol", "methanol", "bioethanol"]
-                )
-            },
+    @lazy_attribute
+    def petrol_efficiencies(self) -> [xr.DataArray, None]:
+        return self.get_iam_efficiencies(
+            data=self.data,
+            efficiency_labels=self.__get_fuel_labels(
+                "eff_aliases", ["gasoline", "ethanol", "methanol", "bioethanol"]
+            ),
         )
 
-        self.diesel_efficiencies = self.get_iam_efficiencies(
-            data=data,
-            efficiency_labels={
-                k: v
-                for k, v in fuel_eff_vars.items()
-                if any(
-                    k.lower().startswith(x)
-                    for x in [
-                        "diesel",
-                        "biodiesel",
-                    ]
-                )
-            },
+    @lazy_attribute
+    def diesel_efficiencies(self) -> [xr.DataArray, None]:
+        return self.get_iam_efficiencies(
+            data=self.data,
+            efficiency_labels=self.__get_fuel_labels(
+                "eff_aliases", ["diesel", "biodiesel"]
+            ),
         )
 
-        self.gas_efficiencies = self.get_iam_efficiencies(
-            data=data,
-            efficiency_labels={
-                k: v
-                for k, v in fuel_eff_vars.items()
-                if any(
-                    k.lower().startswith(x)
-                    for x in ["biogas", "methane", "natural gas", "biomethane"]
-                )
-            },
+    @lazy_attribute
+    def gas_efficiencies(self) -> [xr.DataArray, None]:
+        return self.get_iam_efficiencies(
+            data=self.data,
+            efficiency_labels=self.__get_fuel_labels(
+                "eff_aliases", ["biogas", "methane", "natural gas", "biomethane"]
+            ),
         )
 
-        self.hydrogen_efficiencies = self.get_iam_efficiencies(
-            data=data,
-            efficiency_labels={
-                k: v
-                for k, v in fuel_eff_vars.items()
-                if any(
-                    k.lower().startswith(x)
-                    for x in [
-                        "hydrogen",
-                    ]
-                )
-            },
+    @lazy_attribute
+    def hydrogen_efficiencies(self) -> [xr.DataArray, None]:
+        return self.get_iam_efficiencies(
+            data=self.data,
+            efficiency_labels=self.__get_fuel_labels("eff_aliases", ["hydrogen"]),
         )
 
-        self.kerosene_efficiencies = self.get_iam_efficiencies(
-            data=data,
-            efficiency_labels={
-                k: v
-                for k, v in fuel_eff_vars.items()
-                if any(
-                    k.lower().startswith(x)
-                    for x in [
-                        "kerosene",
-                    ]
-                )
-            },
+    @lazy_attribute
+    def kerosene_efficiencies(self) -> [xr.DataArray, None]:
+        return self.get_iam_efficiencies(
+            data=self.data,
+            efficiency_labels=self.__get_fuel_labels("eff_aliases", ["kerosene"]),
         )
 
-        self.lpg_efficiencies = self.get_iam_efficiencies(
-            data=data,
-            efficiency_labels={
-                k: v
-                for k, v in fuel_eff_vars.items()
-                if any(
-                    k.lower().startswith(x)
-                    for x in [
-                        "liquefied petroleum gas",
-                    ]
-                )
-            },
+    @lazy_attribute
+    def lpg_efficiencies(self) -> [xr.DataArray, None]:
+        return self.get_iam_efficiencies(
+            data=self.data,
+            efficiency_labels=self.__get_fuel_labels(
+                "eff_aliases", ["liquefied petroleum gas"]
+            ),
         )
 
-        self.dac_heat_efficiencies = self.get_iam_efficiencies(
-            data=data,
-            production_labels=dac_prod_vars,
-            energy_labels=dac_heat_vars,
+    @lazy_attribute
+    def dac_heat_efficiencies(self) -> [xr.DataArray, None]:
+        return self.get_iam_efficiencies(
+            data=self.data,
+            production_labels=self.__get_iam_variable_labels(
+                IAM_DAC_VARS, variable="iam_aliases"
+            ),
+            energy_labels=self.__get_iam_variable_labels(
+                IAM_DAC_VARS, variable="heat_use_aliases"
+            ),
         )
 
-        self.dac_electricity_efficiencies = self.get_iam_efficiencies(
-            data=data,
-            production_labels=dac_prod_vars,
-            energy_labels=dac_electricity_vars,
+    @lazy_attribute
+    def dac_electricity_efficiencies(self) -> [xr.DataArray, None]:
+        return self.get_iam_efficiencies(
+            data=self.data,
+            production_labels=self.__get_iam_variable_labels(
+                IAM_DAC_VARS, variable="iam_aliases"
+            ),
+            energy_labels=self.__get_iam_variable_labels(
+                IAM_DAC_VARS, variable="electricity_use_aliases"
+            ),
         )
 
-        self.land_use = self.__get_iam_production_volumes(
-            data=data, input_vars=land_use_vars, fill=True
+    @lazy_attribute
+    def land_use(self) -> [xr.DataArray, None]:
+        return self.__get_iam_production_volumes(
+            data=self.data,
+            input_vars=self.__get_iam_variable_labels(
+                IAM_CROPS_VARS, variable="land_use"
+            ),
+            fill=True,
         )
 
-        self.land_use_change = self.__get_iam_production_volumes(
-            data=data, input_vars=land_use_change_vars, fill=True
+    @lazy_attribute
+    def land_use_change(self) -> [xr.DataArray, None]:
+        return self.__get_iam_production_volumes(
+            data=self.data,
+            input_vars=self.__get_iam_variable_labels(
+                IAM_CROPS_VARS, variable="land_use_change"
+            ),
+            fill=True,
         )
 
-        self.trsp_cars = get_vehicle_fleet_composition(self.model, vehicle_type="car")
+    @lazy_attribute
+    def trsp_cars(self) -> Union[xr.DataArray, None]:
+        return get_vehicle_fleet_composition(self.model, vehicle_type="car")
 
-        self.trsp_trucks = get_vehicle_fleet_composition(
-            self.model, vehicle_type="truck"
-        )
+    @lazy_attribute
+    def trsp_trucks(self) -> Union[xr.DataArray, None]:
+        return get_vehicle_fleet_composition(self.model, vehicle_type="truck")
 
-        self.trsp_buses = get_vehicle_fleet_composition(self.model, vehicle_type="bus")
+    @lazy_attribute
+    def trsp_buses(self) -> Union[xr.DataArray, None]:
+        return get_vehicle_fleet_composition(self.model, vehicle_type="bus")
 
-        self.production_volumes = self.__get_iam_production_volumes(
-            data=data,
+    @lazy_attribute
+    def production_volumes(self) -> [xr.DataArray, None]:
+        return self.__get_iam_production_volumes(
+            data=self.data,
             input_vars={
-                **electricity_prod_vars,
-                **fuel_prod_vars,
-                **cement_prod_vars,
-                **steel_prod_vars,
-                **dac_prod_vars,
-                **biomass_prod_vars,
+                **self.__get_iam_variable_labels(IAM_ELEC_VARS, variable="iam_aliases"),
+                **self.__get_iam_variable_labels(
+                    IAM_FUELS_VARS, variable="iam_aliases"
+                ),
+                **self.__get_iam_variable_labels(
+                    IAM_CEMENT_VARS, variable="iam_aliases"
+                ),
+                **self.__get_iam_variable_labels(
+                    IAM_STEEL_VARS, variable="iam_aliases"
+                ),
+                **self.__get_iam_variable_labels(IAM_DAC_VARS, variable="iam_aliases"),
+                **self.__get_iam_variable_labels(
+                    IAM_BIOMASS_VARS, variable="iam_aliases"
+                ),
             },
         )
 
-        self.coal_power_plants = self.fetch_external_data_coal_power_plants()
+    @lazy_attribute
+    def coal_power_plants(self) -> xr.DataArray:
+        return self.fetch_external_data_coal_power_plants()
+
+    def for_year(
+        self, year: int, external_scenarios: dict = None
+    ) -> "IAMDataCollection":
+        """
+        Return the IAM data of the same model and pathway for another year.
+        The arrays cover all years, and are shared with this instance,
+        not copied.
+        :param year: year to produce the database for
+        :param external_scenarios: external scenarios of the scenario
+        :return: IAM data for `year`
+        """
+        if self.system_model == "consequential":
+            raise ValueError(
+                "Consequential market data are year-specific and cannot be shared."
+            )
+
+        self.__check_year(year)
+
+        data = copy.copy(self)
+        data.year = year
+        data.external_scenarios = external_scenarios
+        return data
+
+    def __check_year(self, year: int) -> None:
+        """
+        Check that `year` is within the years covered by the IAM data.
+        :param year: year to produce the database for
+        """
+        years = self.data.year.values
+        if year < years.min() or year > years.max():
+            raise KeyError(
+                f"{year} is outside of the boundaries "
+                f"of the IAM file: {years.min()}-{years.max()}"
+            )
+
+    def __cached_file_name(
+        self, filepath: Path, system_model: str, gains_scenario: str
+    ) -> Path:
+        """
+        Return the path of the cache file for the IAM data,
+        keyed on the content of the IAM file and on the arguments
+        the derived arrays depend on.
+        :param filepath: path of the IAM file
+        :param system_model: "cutoff" or "consequential"
+        :param gains_scenario: GAINS scenario
+        :return: file path
+        """
+        file_hash = hashlib.sha256()
+        with open(filepath, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                file_hash.update(chunk)
+
+        cache_key = hashlib.sha256(
+            "|".join(
+                [
+                    file_hash.hexdigest(),
+                    self.model,
+                    self.pathway,
+                    system_model,
+                    repr(self.system_model_args),
+                    gains_scenario,
+                    str(self.use_absolute_efficiency),
+                    # consequential market shares depend on the year
+                    str(self.year) if system_model == "consequential" else "",
+                ]
+            ).encode("utf-8")
+        ).hexdigest()[:12]
+
+        return (
+            DIR_CACHED_DB
+            / f"cached_{''.join(tuple(map(str, __version__)))}_iam_{self.model}_{cache_key}.pickle"
+        )
+
+    @staticmethod
+    def __read_cache(file_name: Path, key: bytes = None) -> Union[dict, None]:
+        """
+        Read cached IAM data, if any.
+        :param file_name: path of the cache file
+        :param key: encryption key of the IAM file, if any
+        :return: dictionary of attributes, or None
+        """
+        if not file_name.exists():
+            return None
+
+        with open(file_name, "rb") as file:
+            data = file.read()
+
+        if key is not None:
+            try:
+                data = Fernet(key).decrypt(data)
+            except InvalidToken:
+                return None
+
+        return pickle.loads(data)
+
+    def __write_cache(self, file_name: Path, key: bytes = None) -> None:
+        """
+        Cache the IAM data, and the arrays derived from it so far.
+        Data of encrypted IAM files are encrypted with the same key.
+        :param file_name: path of the cache file
+        :param key: encryption key of the IAM file, if any
+        """
+        self.__dump_cache(
+            {
+                k: v
+                for k, v in vars(self).items()
+                if k not in ["year", "external_scenarios", "_cache_file", "_cache_key"]
+            },
+            file_name,
+            key,
+        )
+
+    @staticmethod
+    def __dump_cache(data: dict, file_name: Path, key: bytes = None) -> None:
+        """
+        Write `data` to a cache file, encrypted with `key`, if any.
+        The file is replaced atomically, as scenarios updated
+        in parallel may write the same file.
+        :param data: dictionary to cache
+        :param file_name: path of the cache file
+        :param key: encryption key of the IAM file, if any
+        """
+        data = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+        if key is not None:
+            data = Fernet(key).encrypt(data)
+
+        tmp_file = file_name.with_name(f"{file_name.name}.{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as file:
+            file.write(data)
+        os.replace(tmp_file, file_name)
+
+    def __cached_attribute_file(self, name: str) -> Union[Path, None]:
+        """
+        Return the path of the cache file of a lazy attribute,
+        or None if the IAM data are not cached.
+        :param name: name of the attribute
+        :return: file path
+        """
+        cache_file = getattr(self, "_cache_file", None)
+        if cache_file is None:
+            return None
+        return cache_file.with_name(f"{cache_file.stem}_{name}.pickle")
+
+    def read_cached_attribute(self, name: str) -> Union[dict, None]:
+        """
+        Read the cached value of a lazy attribute, if any.
+        :param name: name of the attribute
+        :return: dictionary with the attribute name as key, or None
+        """
+        file_name = self.__cached_attribute_file(name)
+        if file_name is None:
+            return None
+        return self.__read_cache(file_name, self._cache_key)
+
+    def write_cached_attribute(self, name: str, value) -> None:
+        """
+        Cache the value of a lazy attribute, once computed,
+        so that later runs do not compute it again.
+        :param name: name of the attribute
+        :param value: value of the attribute
+        """
+        file_name = self.__cached_attribute_file(name)
+        if file_name is not None:
+            self.__dump_cache({name: value}, file_name, self._cache_key)
 
     def __get_iam_variable_labels(
         self, filepath: Path, variable: str
@@ -761,10 +930,7 @@ class IAMDataCollection:
 
         dict_vars = {}
 
-        with open(filepath, "r", encoding="utf-8") as stream:
-            out = yaml.safe_load(stream)
-
-        for key, values in out.items():
+        for key, values in load_variables_file(filepath).items():
             if variable in values:
                 if self.model in values[variable]:
                     if values[variable][self.model] is not None:
@@ -772,11 +938,48 @@ class IAMDataCollection:
 
         return dict_vars
 
+    def __find_iam_file(self, filedir: Path) -> Path:
+        """
+        Find the IAM file of the model and pathway in `filedir`.
+        :param filedir: directory containing the IAM files
+        :return: file path to IAM file
+        """
+
+        # find file in directory which name contains both self.model and self.pathway
+        # Walk through the directory
+        filepath = ""
+        for root, dirs, files in os.walk(filedir):
+            for file in files:
+                # Check if both model and pathway are present in the filename
+                if self.model in file and self.pathway in file:
+                    filepath = Path(os.path.join(root, file))
+
+        if filepath == "":
+            raise FileNotFoundError(
+                f"Could not find any file containing both {self.model} and {self.pathway} in {filedir}"
+            )
+
+        return filepath
+
+    def __get_fuel_labels(self, variable: str, prefixes: List[str]) -> dict:
+        """
+        Return the fuel variable labels starting with any of `prefixes`.
+        :param variable: type of labels, e.g., "iam_aliases" or "eff_aliases"
+        :param prefixes: prefixes of the fuel names
+        :return: dictionary of fuel names and IAM variable names
+        """
+        return {
+            k: v
+            for k, v in self.__get_iam_variable_labels(
+                IAM_FUELS_VARS, variable=variable
+            ).items()
+            if any(k.lower().startswith(x) for x in prefixes)
+        }
+
     def __get_iam_data(
         self,
         key: bytes,
-        filedir: Path,
-        variables: List,
+        filepath: Path,
         split_fossil_liquid_fuels: dict = None,
     ) -> xr.DataArray:
         """
@@ -787,27 +990,12 @@ class IAMDataCollection:
         * year
 
         :param key: encryption key, if provided by user
-        :param filedir: file path to IAM file
-        :param variables: list of variables to extract from IAM file
+        :param filepath: file path to IAM file
 
         :return: a multidimensional array with IAM data
 
         """
 
-        # find file in directory which name contains both self.model and self.pathway
-        # Walk through the directory
-        filepath = ""
-        for root, dirs, files in os.walk(filedir):
-            for file in files:
-                # Check if both model and pathway are present in the filename
-                if self.model in file and self.pathway in file:
-                    filepath = Path(os.path.join(root, file))
-
-        if filepath == "":
-            raise FileNotFoundError(
-                f"Could not find any file containing both {self.model} and {self.pathway} in {filedir}"
-            )
-
         if key is None:
             # Uses a non-encrypted file
             # if extension is ".csv"
@@ -31,7 +31,7 @@ def fetch_mapping(filepath: str) -> dict:
     return mapping
 
 
-def _update_dac(scenario, version, system_model):
+def _update_dac(scenario, version, system_model, workers=None):
     dac = DirectAirCapture(
         database=scenario["database"],
         iam_data=scenario["iam data"],
@@ -42,6 +42,7 @@ def _update_dac(scenario, version, system_model):
         system_model=system_model,
         cache=scenario.get("cache"),
         index=scenario.get("index"),
+        workers=workers,
     )
 
     if scenario["iam data"].dac_markets is not None:
@@ -73,6 +74,7 @@ class DirectAirCapture(BaseTransformation):
         system_model: str,
         cache: dict = None,
         index: dict = None,
+        workers: int = None,
     ):
         super().__init__(
             database,
@@ -84,6 +86,7 @@ class DirectAirCapture(BaseTransformation):
             system_model,
             cache,
             index,
+            workers,
         )
         self.database = database
         self.iam_data = iam_data
@@ -92,7 +95,7 @@ class DirectAirCapture(BaseTransformation):
         self.year = year
         self.version = version
         self.system_model = system_model
-        mapping = InventorySet(self.database)
+        mapping = InventorySet(self.database, search_index=self.search_index)
         self.dac_plants = mapping.generate_daccs_map()
         self.carbon_storage = mapping.generate_carbon_storage_map()
 
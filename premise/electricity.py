@@ -25,7 +25,6 @@ from .transformation import (
     List,
     Tuple,
     find_fuel_efficiency,
-    get_suppliers_of_a_region,
     np,
     uuid,
     ws,
@@ -367,6 +366,77 @@ class Electricity(BaseTransformation):
         self.powerplant_max_efficiency = mapping.powerplant_max_efficiency
         self.powerplant_min_efficiency = mapping.powerplant_min_efficiency
 
+        # periods over which market mixes are averaged
+        self.periods = [0] if self.system_model == "consequential" else [0, 20, 40, 60]
+        # mixes and production volumes of all regions, looked up by the markets,
+        # if the IAM data has electricity markets
+        self.electricity_mixes = {}
+        self.market_production_volumes = {}
+        if self.iam_data.electricity_markets is not None:
+            self.electricity_mixes = self.get_electricity_mixes(self.periods)
+            if self.iam_data.production_volumes is not None:
+                self.market_production_volumes = self.get_market_production_volumes()
+
+    def get_electricity_mixes(
+        self, periods: List[int]
+    ) -> Dict[Tuple[str, int], Dict[str, float]]:
+        """
+        Return the electricity mix of each IAM region,
+        averaged over each period starting from the scenario year
+        (or the mix of the scenario year, for consequential databases).
+        Mixes of all regions and periods are computed at once.
+        :param periods: lengths of the periods, in years
+        :return: dictionary with (region, period) as keys
+        and {technology: share} as values
+        """
+
+        markets = self.iam_data.electricity_markets.transpose(
+            "region", "variables", "year"
+        )
+
+        if self.system_model == "consequential":
+            mix = markets.sel(year=self.year).values
+            mixes = [mix for _ in periods]
+        else:
+            # interpolate the mixes once, over the longest period
+            annual_mixes = markets.interp(
+                year=np.arange(self.year, self.year + max(periods) + 1),
+                kwargs={"fill_value": "extrapolate"},
+            )
+            mixes = [
+                annual_mixes.isel(year=slice(0, period + 1)).mean(dim="year").values
+                for period in periods
+            ]
+
+        technologies = markets.variables.values.tolist()
+
+        return {
+            (region, period): dict(zip(technologies, values))
+            for period, mix in zip(periods, mixes)
+            for region, values in zip(markets.region.values.tolist(), mix)
+        }
+
+    def get_market_production_volumes(self) -> Dict[str, float]:
+        """
+        Return the production volume of the electricity markets
+        of each IAM region, in the scenario year.
+        :return: dictionary with regions as keys and production volumes as values
+        """
+
+        volumes = self.iam_data.production_volumes.sel(
+            variables=self.iam_data.electricity_markets.variables.values,
+        )
+
+        if self.year in volumes.coords["year"].values:
+            volumes = volumes.sel(year=self.year)
+        else:
+            volumes = volumes.interp(year=self.year)
+
+        # the production volume of the first technology of the markets
+        volumes = volumes.isel(variables=0)
+
+        return dict(zip(volumes.region.values.tolist(), volumes.values.tolist()))
+
     @lru_cache
     def get_production_per_tech_dict(self) -> Dict[Tuple[str, str], float]:
         """
@@ -380,10 +450,7 @@ class Electricity(BaseTransformation):
 
         for dataset_names in self.powerplant_map.values():
             for name in dataset_names:
-                for dataset in ws.get_many(
-                    self.database,
-                    ws.equals("name", name),
-                ):
+                for dataset in self.get_datasets(name):
                     for exc in ws.production(dataset):
                         # even if non-existent, we set a minimum value of 1e-9
                         # because if not, we risk dividing by zero!!!
@@ -436,6 +503,107 @@ class Electricity(BaseTransformation):
         # If not, we allocate an equal share of supply
         return 1 / len(suppliers)
 
+    @lru_cache
+    def get_supplier_table(self) -> Dict[Tuple[str, str], List[Tuple[dict, float]]]:
+        """
+        Build the table of the power plant datasets supplying each technology
+        of the electricity markets in each IAM region, with their shares of supply.
+        Suppliers are looked for in the IAM region, then in the ecoinvent
+        locations it contains, then in RER, RoW, CH, and finally in any location.
+        Suppliers with a share below 0.1% are dropped, and the others rescaled.
+        The table is built once, and shared by the market groups of all voltages.
+        :return: dictionary with (technology, region) as keys
+        and lists of (supplier, share) as values
+        """
+
+        technologies = self.iam_data.electricity_markets.variables.values.tolist()
+        names = defaultdict(list)
+        for technology in technologies:
+            for name in self.powerplant_map[technology]:
+                names[name].append(technology)
+
+        # power plant datasets of each technology, in database order
+        candidates = defaultdict(list)
+        for dataset in filter_technology(list(names), self.database):
+            if "electricity" in dataset["reference product"]:
+                for technology in names[dataset["name"]]:
+                    candidates[technology].append(dataset)
+
+        table = {}
+
+        for region in self.regions:
+            if region == "World":
+                continue
+
+            possible_locations = [
+                [region],
+                self.geo.iam_to_ecoinvent_location(region),
+                ["RER"],
+                ["RoW"],
+                ["CH"],
+                list(self.ecoinvent_to_iam_loc.keys()),
+            ]
+
+            for technology in technologies:
+                suppliers = []
+                for locations in possible_locations:
+                    locations = set(locations)
+                    suppliers = [
+                        dataset
+                        for dataset in candidates[technology]
+                        if dataset["location"] in locations
+                    ]
+                    if suppliers:
+                        break
+
+                if not suppliers:
+                    if self.system_model == "consequential":
+                        table[(technology, region)] = []
+                        continue
+                    raise IndexError(
+                        f"Couldn't find suppliers for {technology} when looking for {self.powerplant_map[technology]}."
+                    )
+
+                volumes = [
+                    float(
+                        self.production_per_tech.get(
+                            (supplier["name"], supplier["location"]), 0
+                        )
+                    )
+                    for supplier in suppliers
+                ]
+                total_volume = sum(volumes)
+                shares = [
+                    (volume / total_volume if total_volume != 0 else 1 / len(suppliers))
+                    for volume in volumes
+                ]
+
+                # remove suppliers that have a supply share inferior to 0.1%
+                # and rescale the shares so that they sum to 1
+                kept = [
+                    (supplier, share)
+                    for supplier, share in zip(suppliers, shares)
+                    if share > 0.001
+                ]
+                total_share = sum(share for _, share in kept)
+                table[(technology, region)] = [
+                    (supplier, share / total_share) for supplier, share in kept
+                ]
+
+        return table
+
+    def get_technology_suppliers(
+        self, technology: str, region: str
+    ) -> List[Tuple[dict, float]]:
+        """
+        Return the power plant datasets supplying a technology
+        of the electricity markets in an IAM region, with their shares of supply.
+        :param technology: technology of the electricity markets
+        :param region: IAM region
+        :return: list of (supplier, share)
+        """
+        return self.get_supplier_table()[(technology, region)]
+
     def create_new_markets_low_voltage(self) -> None:
         """
         Create low voltage market groups for electricity, by receiving medium voltage market groups as input
@@ -452,11 +620,6 @@ class Electricity(BaseTransformation):
             if "solar pv residential" in tech.lower()
         ]
 
-        # Get the possible names of ecoinvent datasets
-        ecoinvent_technologies = {
-            technology: self.powerplant_map[technology] for technology in technologies
-        }
-
         # Create an empty dataset
         generic_dataset = {
             "name": "market group for electricity, low voltage",
@@ -468,7 +631,7 @@ class Electricity(BaseTransformation):
             "exchanges": [],
         }
 
-        def generate_regional_markets(region: str, period: int, subset: list) -> dict:
+        def generate_regional_markets(region: str, period: int) -> dict:
             new_dataset = copy.deepcopy(generic_dataset)
             new_dataset["location"] = region
             new_dataset["code"] = str(uuid.uuid4().hex)
@@ -476,98 +639,16 @@ class Electricity(BaseTransformation):
             transf_loss = self.network_loss[region]["low"]["transf_loss"]
             distr_loss = self.network_loss[region]["low"]["distr_loss"]
 
-            # Fetch ecoinvent regions contained in the IAM region
-            ecoinvent_regions = self.geo.iam_to_ecoinvent_location(region)
-
-            possible_locations = [
-                [region],
-                ecoinvent_regions,
-                ["RER"],
-                ["RoW"],
-                ["CH"],
-            ]
-
-            tech_suppliers = defaultdict(list)
-
-            for technology in ecoinvent_technologies:
-                suppliers, counter = [], 0
-
-                while len(suppliers) == 0:
-                    suppliers = list(
-                        get_suppliers_of_a_region(
-                            database=subset,
-                            locations=possible_locations[counter],
-                            names=ecoinvent_technologies[technology],
-                            reference_prod="electricity",
-                            unit="kilowatt hour",
-                            exact_match=True,
-                        )
-                    )
-                    counter += 1
-
-                for supplier in suppliers:
-                    share = self.get_production_weighted_share(supplier, suppliers)
-                    tech_suppliers[technology].append((supplier, share))
-
-                # remove suppliers that have a supply share inferior to 0.1%
-                tech_suppliers[technology] = [
-                    supplier
-                    for supplier in tech_suppliers[technology]
-                    if supplier[1] > 0.001
-                ]
-                # rescale the shares so that they sum to 1
-                total_share = sum(
-                    supplier[1] for supplier in tech_suppliers[technology]
-                )
-                tech_suppliers[technology] = [
-                    (supplier[0], supplier[1] / total_share)
-                    for supplier in tech_suppliers[technology]
-                ]
-
-                # Create a time-weighted average mix
-                if self.system_model == "consequential":
-                    electricity_mix = dict(
-                        zip(
-                            self.iam_data.electricity_markets.variables.values,
-                            self.iam_data.electricity_markets.sel(
-                                region=region, year=self.year
-                            ).values,
-                        )
-                    )
+            tech_suppliers = {
+                technology: self.get_technology_suppliers(technology, region)
+                for technology in technologies
+            }
 
-                else:
-                    # Create a time-weighted average mix
-                    electricity_mix = dict(
-                        zip(
-                            self.iam_data.electricity_markets.variables.values,
-                            self.iam_data.electricity_markets.sel(
-                                region=region,
-                            )
-                            .interp(
-                                year=np.arange(self.year, self.year + period + 1),
-                                kwargs={"fill_value": "extrapolate"},
-                            )
-                            .mean(dim="year")
-                            .values,
-                        )
-                    )
+            # time-weighted average mix
+            electricity_mix = self.electricity_mixes[(region, period)]
 
             # fetch production volume
-            if self.year in self.iam_data.production_volumes.coords["year"].values:
-                production_volume = self.iam_data.production_volumes.sel(
-                    region=region,
-                    variables=self.iam_data.electricity_markets.variables.values,
-                    year=self.year,
-                ).values.item(0)
-            else:
-                production_volume = (
-                    self.iam_data.production_volumes.sel(
-                        region=region,
-                        variables=self.iam_data.electricity_markets.variables.values,
-                    )
-                    .interp(year=self.year)
-                    .values.item(0)
-                )
+            production_volume = self.market_production_volumes[region]
 
             # First, add the reference product exchange
             new_exchanges = [
@@ -733,25 +814,10 @@ class Electricity(BaseTransformation):
             )
             return new_dataset
 
-        if self.system_model == "consequential":
-            periods = [
-                0,
-            ]
-        else:
-            periods = [0, 20, 40, 60]
-
-        # Using a list comprehension to process all technologies
-        subset = filter_technology(
-            dataset_names=[
-                item for subset in ecoinvent_technologies.values() for item in subset
-            ],
-            database=self.database,
-        )
-
         new_datasets = [
-            generate_regional_markets(region, period, subset)
+            generate_regional_markets(region, period)
             for region in self.regions
-            for period in periods
+            for period in self.periods
             if region != "World"
         ]
 
@@ -797,21 +863,7 @@ class Electricity(BaseTransformation):
             distr_loss = self.network_loss[region]["medium"]["distr_loss"]
 
             # fetch production volume
-            if self.year in self.iam_data.production_volumes.coords["year"].values:
-                production_volume = self.iam_data.production_volumes.sel(
-                    region=region,
-                    variables=self.iam_data.electricity_markets.variables.values,
-                    year=self.year,
-                ).values.item(0)
-            else:
-                production_volume = (
-                    self.iam_data.production_volumes.sel(
-                        region=region,
-                        variables=self.iam_data.electricity_markets.variables.values,
-                    )
-                    .interp(year=self.year)
-                    .values.item(0)
-                )
+            production_volume = self.market_production_volumes[region]
 
             # First, add the reference product exchange
             new_exchanges = [
@@ -953,17 +1005,10 @@ class Electricity(BaseTransformation):
 
             return new_dataset
 
-        if self.system_model == "consequential":
-            periods = [
-                0,
-            ]
-        else:
-            periods = [0, 20, 40, 60]
-
         new_datasets = [
             generate_regional_markets(region, period)
             for region in self.regions
-            for period in periods
+            for period in self.periods
             if region != "World"
         ]
 
@@ -994,11 +1039,6 @@ class Electricity(BaseTransformation):
             if "solar pv residential" not in tech.lower()
         ]
 
-        # Get the possible names of ecoinvent datasets
-        ecoinvent_technologies = {
-            technology: self.powerplant_map[technology] for technology in technologies
-        }
-
         generic_dataset = {
             "name": "market group for electricity, high voltage",
             "reference product": "electricity, high voltage",
@@ -1009,104 +1049,26 @@ class Electricity(BaseTransformation):
             "exchanges": [],
         }
 
-        def generate_regional_markets(region: str, period: int, subset: list) -> dict:
+        def generate_regional_markets(region: str, period: int) -> dict:
 
             new_dataset = copy.deepcopy(generic_dataset)
             new_dataset["location"] = region
             new_dataset["code"] = str(uuid.uuid4().hex)
 
-            # Fetch ecoinvent regions contained in the IAM region
-            ecoinvent_regions = self.geo.iam_to_ecoinvent_location(region)
             # Second, add transformation loss
             transf_loss = self.network_loss[region]["high"]["transf_loss"]
 
-            # Fetch electricity-producing technologies contained in the IAM region
-            # if they cannot be found for the ecoinvent locations concerned
-            # we widen the scope to EU-based datasets, and RoW, and finally Switzerland
-
-            possible_locations = [
-                [region],
-                ecoinvent_regions,
-                ["RER"],
-                ["RoW"],
-                ["CH"],
-                list(self.ecoinvent_to_iam_loc.keys()),
-            ]
-
-            tech_suppliers = defaultdict(list)
-
-            for technology in ecoinvent_technologies:
-                suppliers, counter = [], 0
-
-                try:
-                    while len(suppliers) == 0:
-                        suppliers = list(
-                            get_suppliers_of_a_region(
-                                database=subset,
-                                locations=possible_locations[counter],
-                                names=ecoinvent_technologies[technology],
-                                reference_prod="electricity",
-                                unit="kilowatt hour",
-                                exact_match=True,
-                            )
-                        )
-                        counter += 1
-
-                    for supplier in suppliers:
-                        share = self.get_production_weighted_share(supplier, suppliers)
-                        tech_suppliers[technology].append((supplier, share))
-
-                    # remove suppliers that have a supply share inferior to 0.1%
-                    tech_suppliers[technology] = [
-                        supplier
-                        for supplier in tech_suppliers[technology]
-                        if supplier[1] > 0.001
-                    ]
-                    # rescale the shares so that they sum to 1
-                    total_share = sum(
-                        supplier[1] for supplier in tech_suppliers[technology]
-                    )
-                    tech_suppliers[technology] = [
-                        (supplier[0], supplier[1] / total_share)
-                        for supplier in tech_suppliers[technology]
-                    ]
-
-                except IndexError as exc:
-                    if self.system_model == "consequential":
-                        continue
-                    raise IndexError(
-                        f"Couldn't find suppliers for {technology} when looking for {ecoinvent_technologies[technology]}."
-                    ) from exc
-
-            if self.system_model == "consequential":
-                electricity_mix = dict(
-                    zip(
-                        self.iam_data.electricity_markets.variables.values,
-                        self.iam_data.electricity_markets.sel(
-                            region=region, year=self.year
-                        ).values,
-                    )
-                )
-
-            else:
-                electricity_mix = dict(
-                    zip(
-                        self.iam_data.electricity_markets.variables.values,
-                        self.iam_data.electricity_markets.sel(
-                            region=region,
-                        )
-                        .interp(
-                            year=np.arange(self.year, self.year + period + 1),
-                            kwargs={"fill_value": "extrapolate"},
-                        )
-                        .mean(dim="year")
-                        .values,
-                    )
-                )
+            tech_suppliers = {
+                technology: self.get_technology_suppliers(technology, region)
+                for technology in technologies
+            }
 
-            # remove `solar pv residential` from the mix
-            if "Solar PV Residential" in electricity_mix:
-                del electricity_mix["Solar PV Residential"]
+            # time-weighted average mix, without `solar pv residential`
+            electricity_mix = {
+                tech: share
+                for tech, share in self.electricity_mixes[(region, period)].items()
+                if tech != "Solar PV Residential"
+            }
             # normalize the mix to 1
             total = sum(electricity_mix.values())
             electricity_mix = {
@@ -1114,21 +1076,7 @@ class Electricity(BaseTransformation):
             }
 
             # fetch production volume
-            if self.year in self.iam_data.production_volumes.coords["year"].values:
-                production_volume = self.iam_data.production_volumes.sel(
-                    region=region,
-                    variables=self.iam_data.electricity_markets.variables.values,
-                    year=self.year,
-                ).values.item(0)
-            else:
-                production_volume = (
-                    self.iam_data.production_volumes.sel(
-                        region=region,
-                        variables=self.iam_data.electricity_markets.variables.values,
-                    )
-                    .interp(year=self.year)
-                    .values.item(0)
-                )
+            production_volume = self.market_production_volumes[region]
 
             # First, add the reference product exchange
             new_exchanges = [
@@ -1218,24 +1166,9 @@ class Electricity(BaseTransformation):
 
             return new_dataset
 
-        if self.system_model == "consequential":
-            periods = [
-                0,
-            ]
-        else:
-            periods = [0, 20, 40, 60]
-
-        # Using a list comprehension to process all technologies
-        subset = filter_technology(
-            dataset_names=[
-                item for subset in ecoinvent_technologies.values() for item in subset
-            ],
-            database=self.database,
-        )
-
         new_datasets = [
-            generate_regional_markets(region, period, subset)
-            for period in periods
+            generate_regional_markets(region, period)
+            for period in self.periods
             for region in self.regions
             if region != "World"
         ]
@@ -1280,26 +1213,34 @@ class Electricity(BaseTransformation):
             exc for exc in dataset["exchanges"] if exc["type"] != "production"
         ]
 
-        if self.year in self.iam_data.production_volumes.coords["year"].values:
+        volumes = self.iam_data.production_volumes.sel(
+            variables=self.iam_data.electricity_markets.variables.values,
+        )
+        # production volumes of the regions, relative to the world
+        shares = volumes.sum(dim="variables") / volumes.sel(
+            region=[x for x in volumes.region.values if x != "World"]
+        ).sum(dim=["variables", "region"])
+
+        if self.year in volumes.coords["year"].values:
             production_volume = (
-                self.iam_data.production_volumes.sel(
-                    region=regions,
-                    variables=self.iam_data.electricity_markets.variables.values,
-                    year=self.year,
-                )
+                volumes.sel(region=regions, year=self.year)
                 .sum(dim=["region", "variables"])
                 .values.item(0)
             )
+            shares = shares.sel(year=self.year)
         else:
             production_volume = (
-                self.iam_data.production_volumes.sel(
-                    region=regions,
-                    variables=self.iam_data.electricity_markets.variables.values,
-                )
+                volumes.sel(region=regions)
                 .interp(year=self.year)
                 .sum(dim=["region", "variables"])
                 .values.item(0)
             )
+            shares = shares.interp(
+                year=self.year,
+                kwargs={"fill_value": "extrapolate"},
+            )
+
+        shares = dict(zip(shares.region.values.tolist(), shares.values.tolist()))
 
         # add production exchange
         dataset["exchanges"].append(
@@ -1326,45 +1267,7 @@ class Electricity(BaseTransformation):
             if r == "World":
                 continue
 
-            if self.year in self.iam_data.production_volumes.coords["year"].values:
-                share = (
-                    self.iam_data.production_volumes.sel(
-                        region=r,
-                        variables=self.iam_data.electricity_markets.variables.values,
-                        year=self.year,
-                    ).sum(dim="variables")
-                    / self.iam_data.production_volumes.sel(
-                        region=[
-                            x
-                            for x in self.iam_data.production_volumes.region.values
-                            if x != "World"
-                        ],
-                        variables=self.iam_data.electricity_markets.variables.values,
-                        year=self.year,
-                    ).sum(dim=["variables", "region"])
-                ).values
-            else:
-                share = (
-                    (
-                        self.iam_data.production_volumes.sel(
-                            region=r,
-                            variables=self.iam_data.electricity_markets.variables.values,
-                        ).sum(dim="variables")
-                        / self.iam_data.production_volumes.sel(
-                            region=[
-                                x
-                                for x in self.iam_data.production_volumes.region.values
-                                if x != "World"
-                            ],
-                            variables=self.iam_data.electricity_markets.variables.values,
-                        ).sum(dim=["variables", "region"])
-                    )
-                    .interp(
-                        year=self.year,
-                        kwargs={"fill_value": "extrapolate"},
-                    )
-                    .values
-                )
+            share = shares[r]
 
             if np.isnan(share):
                 print("Incorrect market share for", dataset["name"], "in", r)
@@ -1410,9 +1313,8 @@ class Electricity(BaseTransformation):
         module_eff = get_efficiency_solar_photovoltaics()
 
         datasets = ws.get_many(
-            self.database,
+            self.search_index.contains(self.database, "name", "photovoltaic"),
             *[
-                ws.contains("name", "photovoltaic"),
                 ws.either(
                     ws.contains("name", "installation"),
                     ws.contains("name", "construction"),
@@ -1570,10 +1472,11 @@ class Electricity(BaseTransformation):
 
                     for provider in providers:
                         provider_ds = ws.get_one(
-                            self.database,
-                            ws.equals("name", provider["name"]),
-                            ws.equals("location", provider["location"]),
-                            ws.equals("reference product", provider["product"]),
+                            self.get_datasets(
+                                provider["name"],
+                                provider["product"],
+                                provider["location"],
+                            ),
                             ws.equals("unit", provider["unit"]),
                         )
                         co2_amount += sum(
@@ -1887,15 +1790,9 @@ class Electricity(BaseTransformation):
         for tech, variable in load_electricity_variables().items():
             if not variable.get("exists in database", True):
                 if self.powerplant_map.get(tech) is not None:
-                    original = list(
-                        ws.get_many(
-                            self.database,
-                            ws.equals("name", variable["proxy"]["name"]),
-                            ws.equals(
-                                "reference product",
-                                variable["proxy"]["reference product"],
-                            ),
-                        )
+                    original = self.get_datasets(
+                        variable["proxy"]["name"],
+                        variable["proxy"]["reference product"],
                     )[0]
 
                     # make a copy
@@ -1953,7 +1850,9 @@ class Electricity(BaseTransformation):
 
                     self.database.extend(new_datasets.values())
 
-        mapping = InventorySet(self.database, model=self.model)
+        mapping = InventorySet(
+            self.database, model=self.model, search_index=self.search_index
+        )
         self.powerplant_map = mapping.generate_powerplant_map()
 
         # reverse dictionary of self.powerplant_map
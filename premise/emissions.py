@@ -91,7 +91,7 @@ class Emissions(BaseTransformation):
         self.gains_sectors = fetch_mapping(GAINS_SECTORS)
         self.gains_scenario = gains_scenario
 
-        mapping = InventorySet(self.database)
+        mapping = InventorySet(self.database, search_index=self.search_index)
         self.gains_map_europe: Dict[str, Set] = mapping.generate_gains_mapping()
         self.gains_map_global: Dict[str, Set] = mapping.generate_gains_mapping_IAM(
             mapping=self.gains_map_europe
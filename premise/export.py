@@ -28,6 +28,7 @@ from scipy import sparse as nsp
 from . import __version__
 from .data_collection import get_delimiter
 from .filesystem_constants import DATA_DIR
+from .indexing import ProductionIndex
 from .inventory_imports import get_correspondence_bio_flows
 from .utils import dump_database, load_database, reset_all_codes
 from .validation import BaseDatasetValidator
@@ -920,7 +921,7 @@ def check_geographical_linking(scenario, original_database):
 
     # geo = Geomap(scenario["model"])
 
-    index = scenario.get("index") or {}
+    index = scenario.get("index") or ProductionIndex()
     database = scenario["database"]
     original_datasets = [
         (a["name"], a["reference product"], a["location"]) for a in original_database
@@ -946,9 +947,7 @@ def check_geographical_linking(scenario, original_database):
                             if exc["location"] != ds["location"]:
                                 # check if exchange from the same location as the dataset is available
                                 key = (exc["name"], exc["product"])
-                                if ds["location"] in [
-                                    k["location"] for k in index.get(key, [])
-                                ]:
+                                if ds["location"] in index.locations(key):
                                     # if ds["location"] not in geo.iam_to_ecoinvent_location(exc["location"]):
                                     if (exc["name"], exc["product"]) != (
                                         ds["name"],
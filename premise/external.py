@@ -422,7 +422,7 @@ class ExternalScenario(BaseTransformation):
         self.external_scenarios_data = external_scenarios_data
         self.biosphere_flows = get_biosphere_code(self.version)
         self.fuel_specs = get_fuel_properties()
-        mapping = InventorySet(self.database)
+        mapping = InventorySet(self.database, search_index=self.search_index)
         self.fuel_map = mapping.generate_fuel_map()
         self.fuel_map_reverse = {}
         for key, value in self.fuel_map.items():
@@ -1388,6 +1388,24 @@ class ExternalScenario(BaseTransformation):
                             fltr.append(ws.contains(field, k[field]))
             list_fltr.append(fltr)
 
+        # with exact names, only the consumers
+        # of the replaced suppliers need to be visited
+        if all(
+            k.get("operator", "equals") == "equals" and "name" in k for k in replaces
+        ):
+            self.consumer_index.sync(self.database)
+            consumers = {
+                id(d)
+                for d in self.consumer_index.consumers(
+                    key
+                    for k in replaces
+                    for key in self.consumer_index.find_suppliers(
+                        k["name"], k.get("product"), k.get("location")
+                    )
+                )
+            }
+            datasets = [d for d in datasets if id(d) in consumers]
+
         for dataset in datasets:
             filtered_exchanges = []
             for fltr in list_fltr:
@@ -1542,12 +1560,9 @@ class ExternalScenario(BaseTransformation):
                 ref = unique_exchanges_replaced[0][1]
                 locs = [x[2] for x in unique_exchanges_replaced]
 
-                for ds in ws.get_many(
-                    self.database,
-                    ws.equals("name", name),
-                    ws.equals("reference product", ref),
-                    ws.either(*[ws.equals("location", l) for l in locs]),
-                ):
+                for ds in [
+                    d for d in self.get_datasets(name, ref) if d["location"] in locs
+                ]:
                     # remove all exchanges except production exchanges
                     ds["exchanges"] = [
                         exc for exc in ds["exchanges"] if exc["type"] == "production"
@@ -1624,14 +1639,11 @@ class ExternalScenario(BaseTransformation):
         # if there are several suppliers with the same name and product, the one
         # with the highest production volume is chosen
         suppliers = get_shares_from_production_volume(
-            list(
-                ws.get_many(
-                    self.database,
-                    ws.equals("name", new_name),
-                    ws.equals("reference product", new_ref),
-                    ws.either(*[ws.equals("location", r) for r in regions]),
-                )
-            )
+            [
+                ds
+                for ds in self.get_datasets(new_name, new_ref)
+                if ds["location"] in regions
+            ]
         )
         return [(x[1], y) for x, y in suppliers.items()]
 
@@ -24,3 +24,6 @@ DIR_CACHED_FILES.mkdir(parents=True, exist_ok=True)
 
 USER_LOGS_DIR = platformdirs.user_log_path(appname="premise", appauthor="pylca")
 USER_LOGS_DIR.mkdir(parents=True, exist_ok=True)
+
+DIR_CHECKPOINTS = DIR_CACHED_FILES / "checkpoints"
+DIR_CHECKPOINTS.mkdir(parents=True, exist_ok=True)
@@ -272,7 +272,7 @@ def update_dataset(dataset, supplier_key, amount):
     return dataset
 
 
-def _update_fuels(scenario, version, system_model):
+def _update_fuels(scenario, version, system_model, workers=None):
     fuels = Fuels(
         database=scenario["database"],
         iam_data=scenario["iam data"],
@@ -283,6 +283,7 @@ def _update_fuels(scenario, version, system_model):
         system_model=system_model,
         cache=scenario.get("cache"),
         index=scenario.get("index"),
+        workers=workers,
     )
 
     if any(
@@ -332,6 +333,7 @@ class Fuels(BaseTransformation):
         system_model: str,
         cache: dict = None,
         index: dict = None,
+        workers: int = None,
     ):
         super().__init__(
             database,
@@ -343,6 +345,7 @@ class Fuels(BaseTransformation):
             system_model,
             cache,
             index,
+            workers,
         )
         # ecoinvent version
         self.version = version
@@ -441,6 +444,7 @@ class Fuels(BaseTransformation):
                         reference_prod=ref_prod,
                         unit=unit,
                         exclude=exclude,
+                        search_index=None if subset else self.search_index,
                     )
                 )
                 counter += 1
@@ -2421,7 +2425,7 @@ class Fuels(BaseTransformation):
 
         # refresh the fuel filters
         # as some have been created in the meanwhile
-        mapping = InventorySet(self.database)
+        mapping = InventorySet(self.database, search_index=self.search_index)
         self.fuel_map = mapping.generate_fuel_map()
         # reverse fuel map
         self.rev_fuel_map = {}
@@ -2605,8 +2609,7 @@ class Fuels(BaseTransformation):
 
         for old_ds in datasets_to_empty:
             for ds in ws.get_many(
-                self.database,
-                ws.equals("name", old_ds),
+                self.get_datasets(old_ds),
                 ws.doesnt_contain_any("location", self.regions),
             ):
                 self.remove_from_index(ds)
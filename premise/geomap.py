@@ -3,26 +3,49 @@ geomap.py contains the Geomap class that allows to find equivalents between
 the IAM locations and ecoinvent locations.
 """
 
+import hashlib
 import json
+import os
+import pickle
 from collections import defaultdict
+from functools import reduce
+from operator import or_
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+import constructive_geometries
 import yaml
-from constructive_geometries import Geomatcher
+from constructive_geometries import Geomatcher, resolved_row
 
-from .filesystem_constants import VARIABLES_DIR
+from . import __version__
+from .filesystem_constants import DIR_CACHED_DB, VARIABLES_DIR
 
 ECO_IAM_MAPPING_FILE = VARIABLES_DIR / "missing_geography_equivalences.yaml"
 TOPOLOGIES_DIR = VARIABLES_DIR / "topologies"
 CONSTANTS_FILE = VARIABLES_DIR / "constants.yaml"
 
 
+def face_mask(faces: set, positions: Dict[int, int]) -> int:
+    """
+    Return the set of topological `faces` as a bit mask,
+    bit `positions[face]` being set for each face.
+    """
+    mask = bytearray((len(positions) + 7) // 8)
+    for face in faces:
+        position = positions[face]
+        mask[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(mask, "little")
+
+
 class Geomap:
     """
     Map ecoinvent locations to IAM regions and vice-versa.
 
     :ivar model: IAM model (e.g., "remind", "image")
+    :ivar table: geography table of the model: the topological faces
+    of each location, as bit masks, and the mappings between the
+    IAM regions and the ecoinvent locations. It is computed once per topology,
+    and cached on disk.
 
     """
 
@@ -34,6 +57,7 @@ class Geomap:
         self.additional_mappings = self.get_additional_mapping()
 
         self.setup_geography()
+        self.table = self.load_table()
 
     @staticmethod
     def load_constants() -> Dict[str, Any]:
@@ -94,6 +118,176 @@ class Geomap:
             if isinstance(x, tuple) and x[0] == self.model.upper()
         ]
 
+    def table_file(self) -> Path:
+        """
+        Return the path of the cached geography table,
+        keyed on the topologies and mappings it is computed from.
+        :return: file path
+        """
+        table_key = hashlib.sha256(
+            json.dumps(
+                [
+                    self.topology,
+                    self.additional_mappings,
+                    self.constants,
+                    str(constructive_geometries.__version__),
+                ],
+                sort_keys=True,
+                default=str,
+            ).encode("utf-8")
+        ).hexdigest()[:12]
+
+        return (
+            DIR_CACHED_DB
+            / f"cached_{''.join(tuple(map(str, __version__)))}_geomap_{self.model.lower()}_{table_key}.pickle"
+        )
+
+    def load_table(self) -> Dict[str, dict]:
+        """
+        Load the geography table of the model from the cache,
+        or compute it and cache it.
+        :return: geography table
+        """
+        filepath = self.table_file()
+        if filepath.exists():
+            with open(filepath, "rb") as stream:
+                return pickle.load(stream)
+
+        table = self.build_table()
+
+        # written to a temporary file first, as other processes
+        # may be reading or writing the same table
+        tmp_filepath = filepath.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_filepath, "wb") as stream:
+            pickle.dump(table, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_filepath, filepath)
+
+        return table
+
+    def build_table(self) -> Dict[str, dict]:
+        """
+        Compute the geography table of the model: the faces of each location
+        of the geomatcher, as bit masks, and the ecoinvent locations
+        of each IAM region, and vice versa.
+        :return: geography table
+        """
+        positions = {face: i for i, face in enumerate(sorted(self.geo.faces))}
+
+        # mappings are computed with the geomatcher: the table is empty
+        self.table = {
+            "faces": face_mask(self.geo.faces, positions),
+            "masks": {
+                location: face_mask(faces, positions)
+                for location, faces in self.geo.topology.items()
+            },
+            "iam_to_ecoinvent": {},
+            "ecoinvent_to_iam": {},
+        }
+
+        iam_to_ecoinvent = {
+            (region, contained): self.iam_to_ecoinvent_location(region, contained)
+            for region in self.iam_regions
+            for contained in (True, False)
+        }
+
+        locations = {
+            location if isinstance(location, str) else location[1]
+            for location in self.geo.topology
+            if isinstance(location, str) or location[0] == "ecoinvent"
+        }
+        locations.update(self.additional_mappings)
+        locations.update(self.iam_regions)
+
+        ecoinvent_to_iam = {}
+        for location in sorted(locations):
+            # locations that cannot be mapped are left out,
+            # and raise an error when looked up
+            try:
+                ecoinvent_to_iam[location] = self.ecoinvent_to_iam_location(location)
+            except (KeyError, ValueError):
+                continue
+
+        self.table["iam_to_ecoinvent"] = iam_to_ecoinvent
+        self.table["ecoinvent_to_iam"] = ecoinvent_to_iam
+
+        return self.table
+
+    def match(
+        self,
+        location: str,
+        possible_locations: List[Union[str, Tuple[str, str]]],
+        contained: bool = True,
+        exclusive: bool = False,
+        biggest_first: bool = True,
+    ) -> List[Union[str, Tuple[str, str]]]:
+        """
+        Find the locations among `possible_locations` contained in
+        (or intersecting, if not `contained`) `location`, "RoW" standing for
+        the faces not covered by `possible_locations`. Equivalent to
+        `Geomatcher.contained` (or `Geomatcher.intersects`) within
+        `constructive_geometries.resolved_row`, but using the face masks
+        of the geography table.
+        :param location: location to match
+        :param possible_locations: locations of the geomatcher to choose from
+        :param contained: if True, only return locations contained in `location`
+        :param exclusive: if True, do not return overlapping locations
+        :param biggest_first: if True, return the biggest locations first
+        :return: list of locations
+        """
+        masks = self.table["masks"]
+
+        key = location
+        if key not in masks and key != "RoW":
+            key = ("ecoinvent", location)
+
+        if not possible_locations or (key not in masks and key != "RoW"):
+            # let the geomatcher resolve other names, or raise
+            with resolved_row(possible_locations, self.geo) as geo:
+                func = geo.contained if contained else geo.intersects
+                return func(
+                    location,
+                    include_self=True,
+                    exclusive=exclusive,
+                    biggest_first=biggest_first,
+                    only=possible_locations,
+                )
+
+        row = self.table["faces"] & ~reduce(
+            or_, [masks[loc] for loc in possible_locations]
+        )
+
+        def faces(loc):
+            return row if loc == "RoW" else masks[loc]
+
+        target = faces(key)
+        possibles = {loc: faces(loc) for loc in possible_locations}
+
+        if contained:
+            matches = [
+                (loc, mask.bit_count())
+                for loc, mask in possibles.items()
+                if mask and target & mask == mask
+            ]
+        else:
+            matches = [
+                (loc, ((mask & target).bit_count(), mask.bit_count()))
+                for loc, mask in possibles.items()
+                if mask & target
+            ]
+
+        matches.sort(key=lambda x: x[1], reverse=biggest_first)
+        matches = [loc for loc, _ in matches]
+
+        if exclusive:
+            removed, remaining = 0, []
+            for loc in matches:
+                if not possibles[loc] & removed:
+                    removed |= possibles[loc]
+                    remaining.append(loc)
+            matches = remaining
+
+        return matches
+
     def iam_to_ecoinvent_location(
         self, location: str, contained: bool = True
     ) -> List[str]:
@@ -104,6 +298,9 @@ class Geomap:
                           the IAM region should be returned. By default, `contained` is True.
         :return: list of names of ecoinvent regions
         """
+        if (location, contained) in self.table["iam_to_ecoinvent"]:
+            return list(self.table["iam_to_ecoinvent"][(location, contained)])
+
         location_tuple = (str(self.model.upper()), location)
 
         # Start with additional mappings that might exist
@@ -145,6 +342,9 @@ class Geomap:
         :param location: ecoinvent location
         :return: IAM region name
         """
+        if location in self.table["ecoinvent_to_iam"]:
+            return self.table["ecoinvent_to_iam"][location]
+
         iam_locations = self.map_ecoinvent_to_iam(location)
 
         # Handle the case where no IAM location was found
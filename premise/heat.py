@@ -76,7 +76,7 @@ class Heat(BaseTransformation):
         )
 
         self.carbon_intensity_markets = {}
-        mapping = InventorySet(self.database)
+        mapping = InventorySet(self.database, search_index=self.search_index)
         self.heat_techs = mapping.generate_heat_map()
 
     def fetch_fuel_market_co2_emissions(self):
@@ -0,0 +1,577 @@
+"""
+indexing.py contains lookup structures built over a wurst database,
+used by `BaseTransformation` and `InventorySet` to avoid scanning
+the whole database for every search.
+"""
+
+import hashlib
+from abc import ABC, abstractmethod
+from array import array
+from collections import defaultdict
+from itertools import islice
+from sys import intern
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+
+def _matches(dataset: dict, name: str, ref_prod: str = None, location: str = None):
+    return (
+        dataset.get("name") == name
+        and (ref_prod is None or dataset.get("reference product") == ref_prod)
+        and (location is None or dataset.get("location") == location)
+    )
+
+
+class _SyncedIndex(ABC):
+    """
+    Base class for indices synchronized lazily with a database list:
+    datasets appended to the list are indexed on the next lookup,
+    and the index is rebuilt if the list object has been replaced
+    (e.g., by a list comprehension).
+    """
+
+    def __init__(self) -> None:
+        self._database = None
+        self._size = 0
+        self._last = None
+
+    @abstractmethod
+    def _clear(self) -> None:
+        """Empty the index."""
+
+    @abstractmethod
+    def _add(self, dataset: dict) -> None:
+        """Index `dataset`."""
+
+    @abstractmethod
+    def _remove(self, dataset: dict) -> None:
+        """Remove `dataset` from the index."""
+
+    def _mark(self, database: List[dict]) -> None:
+        self._database = database
+        self._size = len(database)
+        self._last = database[-1] if database else None
+
+    def rebuild(self, database: List[dict]) -> None:
+        """
+        Index all datasets of `database` from scratch.
+        :param database: list of datasets
+        """
+        self._clear()
+        for dataset in database:
+            self._add(dataset)
+        self._mark(database)
+
+    def sync(self, database: List[dict]) -> None:
+        """
+        Bring the index up to date with `database`.
+        Only the datasets appended since the last synchronization
+        are indexed if `database` is the list previously indexed.
+        :param database: list of datasets
+        """
+        if (
+            database is self._database
+            and len(database) >= self._size
+            and (self._size == 0 or database[self._size - 1] is self._last)
+        ):
+            for dataset in islice(database, self._size, None):
+                self._add(dataset)
+            self._mark(database)
+        else:
+            self.rebuild(database)
+
+    def discard(self, datasets: Iterable[dict], database: List[dict]) -> None:
+        """
+        Remove `datasets` from the index, `database` being
+        the list of datasets once they have been removed.
+        :param datasets: datasets to remove from the index
+        :param database: database without `datasets`
+        """
+        for dataset in datasets:
+            self._remove(dataset)
+        self._mark(database)
+
+
+class DatasetIndex(_SyncedIndex):
+    """
+    Index of the datasets of a database by name,
+    (name, reference product) and (name, reference product, location).
+
+    The index points to the dataset objects themselves.
+    Hits are checked against the current fields of the datasets, and
+    a miss falls back to a scan of the database, so that results are
+    the same as those of a `wurst` search on exact filters.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._by_name = defaultdict(list)
+        self._by_product = defaultdict(list)
+        self._by_key = defaultdict(list)
+
+    def _clear(self) -> None:
+        self._by_name.clear()
+        self._by_product.clear()
+        self._by_key.clear()
+
+    def _add(self, dataset: dict) -> None:
+        name = dataset.get("name")
+        ref_prod = dataset.get("reference product")
+        self._by_name[name].append(dataset)
+        self._by_product[(name, ref_prod)].append(dataset)
+        self._by_key[(name, ref_prod, dataset.get("location"))].append(dataset)
+
+    def _remove(self, dataset: dict) -> None:
+        name = dataset.get("name")
+        ref_prod = dataset.get("reference product")
+        for bucket in (
+            self._by_name.get(name),
+            self._by_product.get((name, ref_prod)),
+            self._by_key.get((name, ref_prod, dataset.get("location"))),
+        ):
+            if bucket:
+                bucket[:] = [d for d in bucket if d is not dataset]
+
+    def get(
+        self,
+        database: List[dict],
+        name: str,
+        ref_prod: str = None,
+        location: str = None,
+    ) -> List[dict]:
+        """
+        Return the datasets of `database` with the given name,
+        and optionally, reference product and location.
+        :param database: list of datasets
+        :param name: dataset name
+        :param ref_prod: dataset reference product
+        :param location: dataset location
+        :return: list of datasets, in database order
+        """
+        self.sync(database)
+
+        if ref_prod is None:
+            bucket = self._by_name.get(name, [])
+        elif location is None:
+            bucket = self._by_product.get((name, ref_prod), [])
+        else:
+            bucket = self._by_key.get((name, ref_prod, location), [])
+
+        hits = [d for d in bucket if _matches(d, name, ref_prod, location)]
+
+        if not hits:
+            # a dataset may have been renamed or
+            # relocated in place since it was indexed
+            hits = [d for d in database if _matches(d, name, ref_prod, location)]
+            if hits:
+                self.rebuild(database)
+
+        return hits
+
+
+class SearchIndex(_SyncedIndex):
+    """
+    Substring search index over text fields of the datasets
+    of a database (by default, name and reference product).
+
+    Distinct field values are indexed by their character n-grams.
+    A search for a substring intersects the values sharing all of its
+    n-grams, and checks the candidates with an exact substring test,
+    so that results are the same as those of `ws.contains` filters.
+    Datasets renamed in place after being indexed are only found
+    under their new name once the index is rebuilt.
+    """
+
+    def __init__(
+        self, fields: Tuple[str, ...] = ("name", "reference product"), n: int = 3
+    ) -> None:
+        super().__init__()
+        self.fields = fields
+        self.n = n
+        self._counter = 0
+        # field -> value -> list of (insertion order, dataset)
+        self._values = {field: {} for field in fields}
+        # field -> n-gram -> set of values
+        self._grams = {field: defaultdict(set) for field in fields}
+
+    def _clear(self) -> None:
+        self._counter = 0
+        for field in self.fields:
+            self._values[field].clear()
+            self._grams[field].clear()
+
+    def _add(self, dataset: dict) -> None:
+        self._counter += 1
+        for field in self.fields:
+            value = dataset.get(field)
+            if not isinstance(value, str):
+                continue
+            if value not in self._values[field]:
+                self._values[field][value] = []
+                for i in range(len(value) - self.n + 1):
+                    self._grams[field][value[i : i + self.n]].add(value)
+            self._values[field][value].append((self._counter, dataset))
+
+    def _remove(self, dataset: dict) -> None:
+        for field in self.fields:
+            entries = self._values[field].get(dataset.get(field))
+            if entries:
+                entries[:] = [e for e in entries if e[1] is not dataset]
+
+    def _find_values(self, field: str, substring: str) -> Set[str]:
+        values = self._values[field]
+        if len(substring) < self.n:
+            return {v for v in values if substring in v}
+
+        grams = self._grams[field]
+        postings = sorted(
+            (
+                grams.get(substring[i : i + self.n], set())
+                for i in range(len(substring) - self.n + 1)
+            ),
+            key=len,
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates &= posting
+
+        return {v for v in candidates if substring in v}
+
+    def contains(
+        self, database: List[dict], field: str, substrings: Union[str, List[str]]
+    ) -> List[dict]:
+        """
+        Return the datasets of `database` for which `field`
+        contains any of `substrings`.
+        :param database: list of datasets
+        :param field: name of the field to search, e.g., "name"
+        :param substrings: substring or list of substrings to look for
+        :return: list of datasets, in database order
+        """
+        if field not in self._values:
+            raise KeyError(f"Field {field} is not indexed.")
+
+        if isinstance(substrings, str):
+            substrings = [substrings]
+
+        self.sync(database)
+
+        found = {}
+        for substring in set(substrings):
+            for value in self._find_values(field, substring):
+                for order, dataset in self._values[field][value]:
+                    if dataset.get(field) == value:
+                        found[order] = dataset
+
+        return [found[order] for order in sorted(found)]
+
+
+class ConsumerIndex:
+    """
+    Reverse index from the suppliers of technosphere exchanges,
+    identified by (name, product, location), to the datasets consuming them.
+
+    `sync` walks the database and re-indexes only the datasets that are new
+    or whose list of exchanges has been replaced or resized since they were
+    indexed. Exchanges modified in place must be signaled with `refresh`.
+    Consumers returned are candidates: callers still filter their exchanges.
+    """
+
+    def __init__(self) -> None:
+        # id(dataset) -> (dataset, signature, supplier keys)
+        self._entries = {}
+        # supplier key -> set of id(dataset)
+        self._consumers = defaultdict(set)
+        # supplier name -> set of supplier keys
+        self._by_name = defaultdict(set)
+        # id(dataset) -> position in the database
+        self._order = {}
+
+    @staticmethod
+    def _signature(dataset: dict) -> Tuple[int, int]:
+        # bypass `CopyOnWriteDataset.__getitem__`,
+        # reading the exchanges must not copy them
+        exchanges = dict.get(dataset, "exchanges")
+        return id(exchanges), len(exchanges or ())
+
+    def _unlink(self, ident: int, keys: Set[tuple]) -> None:
+        for key in keys:
+            consumers = self._consumers.get(key)
+            if consumers is None:
+                continue
+            consumers.discard(ident)
+            if not consumers:
+                del self._consumers[key]
+                self._by_name[key[0]].discard(key)
+
+    def _index(self, dataset: dict) -> None:
+        ident = id(dataset)
+        keys = {
+            (exc.get("name"), exc.get("product"), exc.get("location"))
+            for exc in dict.get(dataset, "exchanges") or []
+            if exc.get("type") == "technosphere"
+        }
+        entry = self._entries.get(ident)
+        if entry is not None:
+            self._unlink(ident, entry[2] - keys)
+        for key in keys:
+            self._consumers[key].add(ident)
+            self._by_name[key[0]].add(key)
+        self._entries[ident] = (dataset, self._signature(dataset), keys)
+
+    def refresh(self, datasets: Iterable[dict]) -> None:
+        """
+        Re-index `datasets`, e.g., after their exchanges
+        have been modified in place.
+        :param datasets: datasets to re-index
+        """
+        for dataset in datasets:
+            self._index(dataset)
+
+    def sync(self, database: List[dict]) -> None:
+        """
+        Bring the index up to date with `database`.
+        :param database: list of datasets
+        """
+        order = {}
+        for position, dataset in enumerate(database):
+            entry = self._entries.get(id(dataset))
+            if entry is None or entry[1] != self._signature(dataset):
+                self._index(dataset)
+            order[id(dataset)] = position
+
+        for ident in [i for i in self._entries if i not in order]:
+            self._unlink(ident, self._entries.pop(ident)[2])
+
+        self._order = order
+
+    def suppliers(self) -> List[tuple]:
+        """
+        Return the (name, product, location) keys of
+        all suppliers consumed in the database.
+        """
+        return list(self._consumers)
+
+    def find_suppliers(
+        self, name: str, product: str = None, location: str = None
+    ) -> List[tuple]:
+        """
+        Return the supplier keys with the given name,
+        and optionally, product and location.
+        :param name: supplier name
+        :param product: supplier product
+        :param location: supplier location
+        :return: list of (name, product, location) keys
+        """
+        return [
+            key
+            for key in self._by_name.get(name, ())
+            if (product is None or key[1] == product)
+            and (location is None or key[2] == location)
+        ]
+
+    def consumers(self, keys: Iterable[tuple]) -> List[dict]:
+        """
+        Return the datasets consuming any of the suppliers in `keys`,
+        in the order of the database last synchronized.
+        :param keys: (name, product, location) supplier keys
+        :return: list of datasets
+        """
+        idents = set()
+        for key in keys:
+            idents.update(self._consumers.get(key, ()))
+        last = len(self._order)
+        return [
+            self._entries[ident][0]
+            for ident in sorted(idents, key=lambda i: self._order.get(i, last))
+        ]
+
+
+class ProductionIndex:
+    """
+    Index of the products supplied in a database:
+    (name, reference product) -> location -> entries.
+    Keys are interned strings, and units and production volumes
+    are stored in flat arrays shared by all entries.
+    This is the index stored under `scenario["index"]`.
+    """
+
+    def __init__(self) -> None:
+        # (name, product) -> location -> list of positions
+        self._slots: Dict[Tuple[str, str], Dict[str, List[int]]] = {}
+        self._units: List[str] = []
+        self._volumes = array("d")
+        # entries added and removed, once recording starts
+        self._changes: List[tuple] = None
+
+    @classmethod
+    def from_database(cls, database: List[dict]) -> "ProductionIndex":
+        """
+        Build the index of `database` in a single pass.
+        :param database: list of datasets
+        :return: production index
+        """
+        index = cls()
+        for dataset in database:
+            index.add_dataset(dataset)
+        return index
+
+    def add_dataset(self, dataset: dict) -> None:
+        """
+        Add the product supplied by `dataset` to the index.
+        :param dataset: dataset
+        """
+        volume = 0
+        # bypass `CopyOnWriteDataset.__getitem__`,
+        # reading the exchanges must not copy them
+        for exc in dict.get(dataset, "exchanges") or ():
+            if exc.get("type") == "production":
+                volume = exc.get("production volume", 0)
+                break
+
+        self.add(
+            dataset["name"],
+            dataset["reference product"],
+            dataset["location"],
+            dataset["unit"],
+            volume,
+        )
+
+    def add(
+        self,
+        name: str,
+        product: str,
+        location: str,
+        unit: str,
+        production_volume: float = 0,
+    ) -> None:
+        """
+        Add an entry to the index.
+        :param name: supplier name
+        :param product: supplier reference product
+        :param location: supplier location
+        :param unit: supplier unit
+        :param production_volume: supplier production volume
+        """
+        key = (intern(name), intern(product))
+        locations = self._slots.get(key)
+        if locations is None:
+            locations = self._slots[key] = {}
+        if isinstance(location, str):
+            location = intern(location)
+        locations.setdefault(location, []).append(len(self._volumes))
+        self._units.append(unit)
+        self._volumes.append(float(production_volume or 0))
+        if self._changes is not None:
+            self._changes.append(
+                ("add", (name, product, location, unit, production_volume))
+            )
+
+    def remove(self, name: str, product: str, location: str) -> None:
+        """
+        Remove an entry from the index, if present.
+        :param name: supplier name
+        :param product: supplier reference product
+        :param location: supplier location
+        """
+        locations = self._slots.get((name, product))
+        if locations and location in locations:
+            positions = locations[location]
+            positions.pop(0)
+            if not positions:
+                del locations[location]
+            if self._changes is not None:
+                self._changes.append(("remove", (name, product, location)))
+
+    def record_changes(self) -> None:
+        """
+        Start recording the entries added to and removed from the index,
+        to apply them to another index with `apply_changes`.
+        """
+        self._changes = []
+
+    def changes(self) -> List[tuple]:
+        """
+        Return the entries added and removed since `record_changes`,
+        in order, as ("add" or "remove", arguments) tuples.
+        """
+        return list(self._changes or ())
+
+    def apply_changes(self, changes: List[tuple]) -> None:
+        """
+        Add and remove the entries returned by `changes`.
+        :param changes: changes recorded on another index
+        """
+        for method, args in changes:
+            getattr(self, method)(*args)
+
+    def contains(self, name: str, product: str, location: str) -> bool:
+        """
+        Return True if a supplier is indexed for that
+        name, product and location.
+        """
+        return location in self._slots.get((name, product), ())
+
+    def locations(self, key: Tuple[str, str]) -> List[str]:
+        """
+        Return the locations of the suppliers of `key`.
+        :param key: (name, reference product)
+        """
+        return list(self._slots.get(key, ()))
+
+    def get(self, key: Tuple[str, str], default=None) -> List[dict]:
+        """
+        Return the entries of `key` as dictionaries with
+        `name`, `reference product`, `location`, `unit`
+        and `production volume` fields.
+        :param key: (name, reference product)
+        :param default: returned if `key` is not indexed
+        """
+        locations = self._slots.get(key)
+        if not locations:
+            return [] if default is None else default
+        return [
+            {
+                "name": key[0],
+                "reference product": key[1],
+                "location": location,
+                "unit": self._units[position],
+                "production volume": self._volumes[position],
+            }
+            for location, positions in locations.items()
+            for position in positions
+        ]
+
+    def signature(self, key: Tuple[str, str]) -> str:
+        """
+        Return a digest of the entries of `key`, which changes
+        whenever a supplier of `key` is added or removed,
+        or has another unit or production volume.
+        :param key: (name, reference product)
+        :return: hexadecimal digest, empty if `key` has no supplier
+        """
+        locations = self._slots.get(key)
+        if not locations:
+            return ""
+        entries = [
+            (location, self._units[position], self._volumes[position])
+            for location, positions in locations.items()
+            for position in positions
+        ]
+        return hashlib.sha256(repr(entries).encode("utf-8")).hexdigest()[:16]
+
+    def signatures(self) -> Dict[Tuple[str, str], str]:
+        """
+        Return the signature of each key of the index.
+        """
+        return {key: self.signature(key) for key in self._slots}
+
+    def __getitem__(self, key: Tuple[str, str]) -> List[dict]:
+        return self.get(key)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return bool(self._slots.get(key))
+
+    def __len__(self) -> int:
+        return len(self._slots)
@@ -4,21 +4,28 @@ and those provided by the user.
 """
 
 import csv
+import hashlib
 import itertools
 import logging
+import os
+import pickle
 import uuid
 from functools import lru_cache
+from io import StringIO
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
 
+import bw2data
 import bw2io
 import numpy as np
 import requests
 import yaml
-from bw2io import CSVImporter, ExcelImporter, Migration
+from bw2io import CSVImporter, ExcelImporter, Migration, migrations
+from bw2io.extractors import ExcelExtractor
 from prettytable import PrettyTable
 from wurst import searching as ws
 
+from . import __version__
 from .clean_datasets import remove_categories, remove_uncertainty
 from .data_collection import get_delimiter
 from .filesystem_constants import DATA_DIR, DIR_CACHED_DB, INVENTORY_DIR
@@ -32,6 +39,10 @@ CORRESPONDENCE_BIO_FLOWS = (
 
 TEMP_CSV_FILE = DIR_CACHED_DB / "temp.csv"
 
+# Brightway projects in which the migration maps
+# have been registered by the current process
+MIGRATION_PROJECTS = set()
+
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -82,6 +93,24 @@ def get_consequential_blacklist():
         return flows
 
 
+@lru_cache
+def read_migration_map() -> Tuple[str, List[List[str]]]:
+    """
+    Read the migration map file, once per process.
+    :return: the sha256 hash of the file, and its rows (without the header)
+    """
+    with open(FILEPATH_MIGRATION_MAP, "rb") as read_obj:
+        content = read_obj.read()
+
+    csv_reader = csv.reader(
+        StringIO(content.decode("utf-8")),
+        delimiter=get_delimiter(filepath=FILEPATH_MIGRATION_MAP),
+    )
+    next(csv_reader)
+
+    return hashlib.sha256(content).hexdigest(), list(csv_reader)
+
+
 @lru_cache
 def generate_migration_maps(origin: str, destination: str) -> Dict[str, list]:
     """
@@ -93,34 +122,58 @@ def generate_migration_maps(origin: str, destination: str) -> Dict[str, list]:
 
     response = {"fields": ["name", "reference product", "location"], "data": []}
 
-    with open(FILEPATH_MIGRATION_MAP, "r", encoding="utf-8") as read_obj:
-        csv_reader = csv.reader(
-            read_obj,
-            delimiter=get_delimiter(filepath=FILEPATH_MIGRATION_MAP),
-        )
-        next(csv_reader)
-        for row in csv_reader:
-            if row[0] == origin and row[1] == destination:
-                data = {}
-                if row[5] != "":
-                    data["name"] = row[5]
-                if row[6] != "":
-                    data["reference product"] = row[6]
-                if row[7] != "":
-                    data["location"] = row[7]
-                response["data"].append(((row[2], row[3], row[4]), data))
-
-            if row[0] == destination and row[1] == origin:
-                data = {}
-                if row[2] != "":
-                    data["name"] = row[2]
-                if row[3] != "":
-                    data["reference product"] = row[3]
-                if row[4] != "":
-                    data["location"] = row[4]
-                response["data"].append(((row[5], row[6], row[7]), data))
-
-        return response
+    for row in read_migration_map()[1]:
+        if row[0] == origin and row[1] == destination:
+            data = {}
+            if row[5] != "":
+                data["name"] = row[5]
+            if row[6] != "":
+                data["reference product"] = row[6]
+            if row[7] != "":
+                data["location"] = row[7]
+            response["data"].append(((row[2], row[3], row[4]), data))
+
+        if row[0] == destination and row[1] == origin:
+            data = {}
+            if row[2] != "":
+                data["name"] = row[2]
+            if row[3] != "":
+                data["reference product"] = row[3]
+            if row[4] != "":
+                data["location"] = row[4]
+            response["data"].append(((row[5], row[6], row[7]), data))
+
+    return response
+
+
+def register_migration_maps() -> None:
+    """
+    Register the migration maps between ecoinvent versions
+    in the current Brightway project, once per process.
+    Migrations are only rewritten if the migration map file has changed
+    since they were written, according to the hash stored with them.
+    """
+    if bw2data.projects.current in MIGRATION_PROJECTS:
+        return
+
+    map_hash = read_migration_map()[0]
+    ei_versions = ["35", "36", "37", "38", "39", "310"]
+
+    for combination in itertools.product(ei_versions, ei_versions):
+        if combination[0] != combination[1]:
+            name = f"migration_{combination[0]}_{combination[1]}"
+            if name in migrations and migrations[name].get("hash") == map_hash:
+                continue
+
+            mapping = generate_migration_maps(combination[0], combination[1])
+            if len(mapping["data"]) > 0:
+                Migration(name).write(
+                    mapping,
+                    description=f"Change technosphere names due to change from {combination[0]} to {combination[1]}",
+                )
+                migrations[name] = {**migrations[name], "hash": map_hash}
+
+    MIGRATION_PROJECTS.add(bw2data.projects.current)
 
 
 def check_for_duplicate_datasets(data: List[dict]) -> List[dict]:
@@ -158,6 +211,43 @@ def check_for_duplicate_datasets(data: List[dict]) -> List[dict]:
     return data
 
 
+def merge_inventories(inventories: List[List[dict]]) -> List[dict]:
+    """
+    Merge inventories that were imported independently of each other.
+    Datasets already imported from a previous inventory are skipped,
+    and technosphere exchanges whose product could not be found
+    are looked up among the datasets of the other inventories.
+    :param inventories: list of imported inventories, in import order
+    :return: list of datasets
+    """
+    data, codes, names = [], set(), set()
+
+    for inventory in inventories:
+        for dataset in inventory:
+            key = (dataset["name"], dataset["reference product"], dataset["location"])
+            if dataset["code"] in codes or key in names:
+                continue
+            codes.add(dataset["code"])
+            names.add(key)
+            data.append(dataset)
+
+    products = {}
+    for dataset in data:
+        products.setdefault(
+            (dataset["name"], dataset["location"], dataset["unit"]),
+            dataset["reference product"],
+        )
+
+    for dataset in data:
+        for exchange in dataset["exchanges"]:
+            if exchange["type"] == "technosphere" and exchange.get("product") is None:
+                exchange["product"] = products.get(
+                    (exchange["name"], exchange["location"], exchange["unit"])
+                )
+
+    return data
+
+
 def check_for_datasets_compliance_with_consequential_database(
     datasets: List[dict], blacklist: List[dict]
 ):
@@ -290,6 +380,102 @@ def check_uncertainty_data(data, filename):
         print(table)
 
 
+class InventoryLookup:
+    """
+    Lookup tables of a database, shared by the inventory imports into it:
+    dataset codes, (name, reference product, location) keys, reference
+    products by (name, location, unit), and biosphere flow codes.
+    Datasets added to the database should also be added with :meth:`add`.
+
+    :ivar version: ecoinvent version of the database
+    """
+
+    def __init__(self, database: List[dict], version: str) -> None:
+        self.version = version
+        self.biosphere_dict = get_biosphere_code(version)
+        self.codes = set()
+        self.names = set()
+        self.products = {}
+        self.add(database)
+
+    def add(self, datasets: List[dict]) -> None:
+        """
+        Add datasets to the lookup tables.
+        :param datasets: datasets added to the database
+        """
+        for dataset in datasets:
+            self.codes.add(dataset["code"])
+            self.names.add(
+                (dataset["name"], dataset["reference product"], dataset["location"])
+            )
+            # reference products are found in database order
+            self.products.setdefault(
+                (dataset["name"], dataset["location"], dataset["unit"]), {}
+            ).setdefault(dataset["reference product"], None)
+
+    def find_product(
+        self, name: str, location: str, unit: str, product: str = None
+    ) -> Union[str, None]:
+        """
+        Return the reference product of a dataset of the database.
+        :param name: dataset name
+        :param location: dataset location
+        :param unit: dataset unit
+        :param product: reference product the dataset should have, if known
+        :return: reference product, or None if no dataset matches
+        """
+        products = self.products.get((name, location, unit), {})
+        if product is not None:
+            return product if product in products else None
+        return next(iter(products), None)
+
+
+class CachedExcelExtractor(ExcelExtractor):
+    """
+    Extracts the worksheets of a workbook, and keeps them in the cache
+    folder, keyed on the content of the workbook and on the version of
+    premise. Later extractions of an unchanged workbook read the cached
+    worksheets instead of parsing the workbook again.
+    """
+
+    @classmethod
+    def extract(cls, filepath: Path, sheet_name=None, **kwargs):
+        filepath = Path(filepath)
+
+        with open(filepath, "rb") as file:
+            file_hash = hashlib.sha256(file.read())
+        file_hash.update(repr(sheet_name).encode("utf-8"))
+
+        cache_file = (
+            DIR_CACHED_DB
+            / f"cached_{''.join(tuple(map(str, __version__)))}_inventories_{filepath.stem}_{file_hash.hexdigest()[:12]}.pickle"
+        )
+
+        if cache_file.exists():
+            with open(cache_file, "rb") as file:
+                return pickle.load(file)
+
+        data = super().extract(filepath, sheet_name=sheet_name, **kwargs)
+
+        # write to a temporary file first, as other
+        # processes may extract the same workbook
+        temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_file, "wb") as file:
+            pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+
+        return data
+
+
+class CachedExcelImporter(ExcelImporter):
+    """
+    Excel importer that reads the worksheets cached by
+    :class:`CachedExcelExtractor` when the workbook is unchanged.
+    """
+
+    extractor = CachedExcelExtractor
+
+
 class BaseInventoryImport:
     """
     Base class for inventories that are to be merged with the wurst database.
@@ -311,16 +497,18 @@ class BaseInventoryImport:
         path: Union[str, Path],
         system_model: str,
         keep_uncertainty_data: bool = False,
+        lookup: InventoryLookup = None,
     ) -> None:
         """Create a :class:`BaseInventoryImport` instance."""
         self.database = database
-        self.db_code = [x["code"] for x in self.database]
-        self.db_names = [
-            (x["name"], x["reference product"], x["location"]) for x in self.database
-        ]
+        if lookup is None or lookup.version != version_out:
+            lookup = InventoryLookup(database, version_out)
+        self.lookup = lookup
+        self.db_code = lookup.codes
+        self.db_names = lookup.names
         self.version_in = version_in
         self.version_out = version_out
-        self.biosphere_dict = get_biosphere_code(self.version_out)
+        self.biosphere_dict = lookup.biosphere_dict
         self.correspondence_bio_flows = get_correspondence_bio_flows()
         self.system_model = system_model
         self.consequential_blacklist = get_consequential_blacklist()
@@ -344,16 +532,7 @@ class BaseInventoryImport:
         # register migration maps
         # as imported inventories link
         # to different ecoinvent versions
-        ei_versions = ["35", "36", "37", "38", "39", "310"]
-
-        for combination in itertools.product(ei_versions, ei_versions):
-            if combination[0] != combination[1]:
-                mapping = generate_migration_maps(combination[0], combination[1])
-                if len(mapping["data"]) > 0:
-                    Migration(f"migration_{combination[0]}_{combination[1]}").write(
-                        mapping,
-                        description=f"Change technosphere names due to change from {combination[0]} to {combination[1]}",
-                    )
+        register_migration_maps()
 
     def load_inventory(self) -> None:
         """Load an inventory from a specified path.
@@ -586,33 +765,14 @@ class BaseInventoryImport:
             None,
         )
 
-        # If not, look in the ecoinvent inventories
-        if candidate is None:
-            if exc[-1] is not None:
-                candidate = next(
-                    ws.get_many(
-                        self.database,
-                        ws.equals("name", exc[0]),
-                        ws.equals("location", exc[1]),
-                        ws.equals("unit", exc[2]),
-                        ws.equals("reference product", exc[-1]),
-                    ),
-                    None,
-                )
-            else:
-                candidate = next(
-                    ws.get_many(
-                        self.database,
-                        ws.equals("name", exc[0]),
-                        ws.equals("location", exc[1]),
-                        ws.equals("unit", exc[2]),
-                    ),
-                    None,
-                )
-
         if candidate is not None:
             return candidate["reference product"]
 
+        # If not, look in the ecoinvent inventories
+        product = self.lookup.find_product(exc[0], exc[1], exc[2], exc[-1])
+        if product is not None:
+            return product
+
         self.list_unlinked.append(
             (
                 exc[0],
@@ -806,13 +966,20 @@ class DefaultInventory(BaseInventoryImport):
         path,
         system_model,
         keep_uncertainty_data,
+        lookup=None,
     ):
         super().__init__(
-            database, version_in, version_out, path, system_model, keep_uncertainty_data
+            database,
+            version_in,
+            version_out,
+            path,
+            system_model,
+            keep_uncertainty_data,
+            lookup,
         )
 
     def load_inventory(self) -> bw2io.ExcelImporter:
-        return ExcelImporter(self.path)
+        return CachedExcelImporter(self.path)
 
     def prepare_inventory(self) -> None:
         if self.version_in != self.version_out:
@@ -938,8 +1105,12 @@ class AdditionalInventory(BaseInventoryImport):
     Import additional inventories, if any.
     """
 
-    def __init__(self, database, version_in, version_out, path, system_model):
-        super().__init__(database, version_in, version_out, path, system_model)
+    def __init__(
+        self, database, version_in, version_out, path, system_model, lookup=None
+    ):
+        super().__init__(
+            database, version_in, version_out, path, system_model, lookup=lookup
+        )
 
     def download_file(self, url, local_path) -> None:
         try:
@@ -4,12 +4,15 @@ as well as export it back.
 
 """
 
+import hashlib
+import json
 import logging
 import os
 import pickle
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import List, Union
+from typing import Callable, List, Union
 
 import bw2data
 import datapackage
@@ -18,7 +21,8 @@ from tqdm import tqdm
 from . import __version__
 from .biomass import _update_biomass
 from .cement import _update_cement
-from .clean_datasets import DatabaseCleaner
+from .clean_datasets import DatabaseCleaner, remove_uncertainty
+from .columnar import MappedDatabase, read_database, write_database
 from .data_collection import IAMDataCollection
 from .direct_air_capture import _update_dac
 from .electricity import _update_electricity
@@ -33,25 +37,44 @@ from .export import (
 )
 from .external import _update_external_scenarios
 from .external_data_validation import check_external_scenarios
-from .filesystem_constants import DIR_CACHED_DB, IAM_OUTPUT_DIR, INVENTORY_DIR
+from .filesystem_constants import (
+    DIR_CACHED_DB,
+    DIR_CHECKPOINTS,
+    IAM_OUTPUT_DIR,
+    INVENTORY_DIR,
+)
 from .fuels import _update_fuels
 from .heat import _update_heat
-from .inventory_imports import AdditionalInventory, DefaultInventory
+from .inventory_imports import (
+    MIGRATION_PROJECTS,
+    AdditionalInventory,
+    DefaultInventory,
+    InventoryLookup,
+    merge_inventories,
+    register_migration_maps,
+)
 from .report import generate_change_report, generate_summary_report
+from .scheduling import apply_sectors_concurrently, schedule_sectors
 from .steel import _update_steel
 from .transport import _update_vehicles
 from .utils import (
     clear_existing_cache,
+    copy_on_write_database,
     create_scenario_list,
     delete_all_pickles,
     dump_database,
     eidb_label,
     hide_messages,
     info_on_utils_functions,
+    load_checkpoint,
     load_constants,
     load_database,
+    load_relink_cache,
     print_version,
+    relink_cache_file,
+    save_relink_cache,
     warning_about_biogenic_co2,
+    write_checkpoint,
 )
 
 logger = logging.getLogger("module")
@@ -477,6 +500,235 @@ def check_presence_biosphere_database(biosphere_name: str) -> str:
     return biosphere_name
 
 
+# base database of the worker processes used by `NewDatabase.update`
+_WORKER_DATABASE = None
+_WORKER_LOOKUP = None
+
+
+def fingerprint_source_database(
+    source_type: str, source_db: str = None, source_file_path: Path = None
+) -> str:
+    """
+    Return a fingerprint of the source database, which changes
+    whenever the source database is re-imported or modified.
+    For a Brightway database, it is based on its metadata (backend,
+    modification timestamp, dependencies) and number of datasets.
+    For ecospold files, it is based on the relative path, size and
+    modification time of the files in the directory.
+    :param source_type: "brightway" or "ecospold"
+    :param source_db: name of the Brightway database
+    :param source_file_path: directory of the ecospold files
+    :return: hexadecimal fingerprint
+    """
+    hasher = hashlib.sha256()
+
+    if source_type == "ecospold":
+        for filepath in sorted(Path(source_file_path).rglob("*")):
+            if filepath.is_file():
+                stat = filepath.stat()
+                hasher.update(
+                    f"{filepath.relative_to(source_file_path)}|"
+                    f"{stat.st_size}|{stat.st_mtime_ns}\n".encode("utf-8")
+                )
+    else:
+        metadata = bw2data.databases[source_db]
+        hasher.update(
+            json.dumps(
+                {
+                    k: metadata.get(k)
+                    for k in ("backend", "modified", "number", "depends")
+                },
+                sort_keys=True,
+                default=str,
+            ).encode("utf-8")
+        )
+        hasher.update(str(len(bw2data.Database(source_db))).encode("utf-8"))
+
+    return hasher.hexdigest()[:16]
+
+
+def _init_update_worker(database: List[dict]) -> None:
+    """
+    Store the base database once per worker process.
+    """
+    global _WORKER_DATABASE
+    _WORKER_DATABASE = database
+
+
+def _init_import_worker(
+    database: List[dict], lookup: InventoryLookup, project: str
+) -> None:
+    """
+    Store the base database and its lookup tables once per worker process,
+    and use the Brightway project of the parent process, in which the
+    migration maps are already registered.
+    """
+    global _WORKER_DATABASE, _WORKER_LOOKUP
+    _WORKER_DATABASE = database
+    _WORKER_LOOKUP = lookup
+    bw2data.projects.set_current(project)
+    MIGRATION_PROJECTS.add(project)
+
+
+def _import_default_inventory(
+    filepath: Path,
+    version_in: str,
+    version_out: str,
+    system_model: str,
+    keep_uncertainty_data: bool,
+) -> List[dict]:
+    """
+    Import an inventory file in a worker process,
+    against the base database of the worker.
+    :return: list of datasets
+    """
+    inventory = DefaultInventory(
+        database=_WORKER_DATABASE,
+        version_in=version_in,
+        version_out=version_out,
+        path=filepath,
+        system_model=system_model,
+        keep_uncertainty_data=keep_uncertainty_data,
+        lookup=_WORKER_LOOKUP,
+    )
+    return list(inventory.merge_inventory())
+
+
+def _update_with_relink_cache(
+    scenario: dict,
+    source_fingerprint: str,
+    sector: str,
+    update_func: Callable,
+    *args,
+) -> dict:
+    """
+    Apply a sector update to a scenario, pre-seeding its relinking cache
+    from the relink cache file of the sector, and storing the relinking
+    decisions made by the update in that file, for later runs.
+    :param scenario: scenario dictionary
+    :param source_fingerprint: fingerprint of the source database
+    :param sector: name of the sector
+    :param update_func: update function of the sector
+    :return: scenario dictionary
+    """
+    filepath = relink_cache_file(source_fingerprint, scenario["model"], sector)
+    signatures, cached_keys = load_relink_cache(scenario, filepath)
+    scenario = update_func(scenario, *args)
+    save_relink_cache(scenario, filepath, signatures, cached_keys)
+    return scenario
+
+
+def _update_scenario(
+    scenario: dict,
+    sectors: List[str],
+    sector_update_methods: dict,
+    database: List[dict],
+    cache_format: str = "pickle",
+    concurrent_sectors: bool = False,
+    checkpoint: Path = None,
+    resume: bool = False,
+) -> dict:
+    """
+    Apply the sector updates to a scenario and dump its database.
+    :param scenario: scenario dictionary
+    :param sectors: list of sectors to update
+    :param sector_update_methods: update functions and arguments, per sector
+    :param database: base database to start from,
+    if the scenario does not have one yet
+    :param cache_format: format of the database dump, "pickle" or "arrow"
+    :param concurrent_sectors: if True, independent sectors are applied concurrently
+    :param checkpoint: if given, path of the file the scenario is checkpointed to,
+    after each sector (or group of concurrent sectors)
+    :param resume: if True, the scenario is restored from its checkpoint, if any
+    :return: scenario dictionary
+    """
+
+    # add database to scenarios
+    if "database filepath" in scenario:
+        scenario = load_database(scenario)
+    elif resume and checkpoint is not None and checkpoint.exists():
+        scenario = load_checkpoint(scenario, checkpoint)
+        print(
+            f"Resuming {scenario['model']}, {scenario['pathway']}, {scenario['year']} "
+            f"after: {', '.join(scenario.get('applied functions', []))}."
+        )
+    elif isinstance(database, MappedDatabase):
+        # datasets are decoded from the mapped file once, and shared
+        # by the scenarios until modified
+        scenario["database"] = copy_on_write_database(database.shared_datasets())
+    else:
+        scenario["database"] = copy_on_write_database(database)
+
+    if concurrent_sectors:
+        waves = schedule_sectors(
+            [s for s in sectors if s not in scenario.get("applied functions", [])]
+        )
+    else:
+        waves = [[sector] for sector in sectors]
+
+    for wave in waves:
+        applied = len(scenario.get("applied functions", []))
+
+        # sectors of a wave are independent, and applied concurrently.
+        # Those whose changes overlap with the changes of another
+        # sector of the wave are applied afterwards, in turn.
+        for sector in apply_sectors_concurrently(scenario, wave, sector_update_methods):
+            if sector in scenario.get("applied functions", []):
+                print(f"Function to update {sector} already applied to scenario.")
+                continue
+
+            # Prepare the function and arguments
+            update_func = sector_update_methods[sector]["func"]
+            fixed_args = sector_update_methods[sector]["args"]
+            scenario = update_func(scenario, *fixed_args)
+
+            if "applied functions" not in scenario:
+                scenario["applied functions"] = []
+            scenario["applied functions"].append(sector)
+
+        if (
+            checkpoint is not None
+            and len(scenario.get("applied functions", [])) > applied
+        ):
+            write_checkpoint(scenario, checkpoint)
+
+    # dump database
+    scenario = dump_database(scenario, cache_format)
+
+    # the scenario is complete: its checkpoint is no longer needed
+    if checkpoint is not None and checkpoint.exists():
+        checkpoint.unlink()
+
+    return scenario
+
+
+def _update_scenario_in_worker(
+    scenario: dict,
+    sectors: List[str],
+    sector_update_methods: dict,
+    database: List[dict] = None,
+    cache_format: str = "pickle",
+    concurrent_sectors: bool = False,
+    checkpoint: Path = None,
+    resume: bool = False,
+) -> dict:
+    """
+    Update a scenario in a worker process.
+    IAM data are not sent back, as they are already held by the parent process.
+    """
+    scenario = _update_scenario(
+        scenario,
+        sectors,
+        sector_update_methods,
+        database if database is not None else _WORKER_DATABASE,
+        cache_format,
+        concurrent_sectors,
+        checkpoint,
+        resume,
+    )
+    return {k: v for k, v in scenario.items() if k != "iam data"}
+
+
 class NewDatabase:
     """
     Class that represents a new wurst inventory database, modified according to IAM data.
@@ -486,6 +738,16 @@ class NewDatabase:
     :vartype source_db: str
     :ivar system_model: Can be `cutoff` (default) or `consequential`.
     :vartype system_model: str
+    :ivar cache_format: format of the cached databases and scenario dumps.
+        Can be `pickle` (default) or `arrow` (columnar Arrow files).
+    :vartype cache_format: str
+    :ivar use_memory_map: if True, the cached source database is memory-mapped,
+        and decoded once per process by the scenarios, which share it.
+        Requires `cache_format="arrow"`.
+    :vartype use_memory_map: bool
+    :ivar workers: number of worker processes to import inventories in parallel.
+        If None, inventories are imported sequentially.
+    :vartype workers: int
 
     """
 
@@ -508,6 +770,9 @@ class NewDatabase:
         gains_scenario="CLE",
         use_absolute_efficiency=False,
         biosphere_name: str = "biosphere3",
+        cache_format: str = "pickle",
+        use_memory_map: bool = False,
+        workers: int = None,
     ) -> None:
         self.source = source_db
         self.version = check_db_version(source_version)
@@ -533,6 +798,18 @@ class NewDatabase:
             raise ValueError("gains_scenario must be either 'CLE' or 'MFR'")
         self.gains_scenario = gains_scenario
 
+        if cache_format not in ["pickle", "arrow"]:
+            raise ValueError("cache_format must be either 'pickle' or 'arrow'")
+        self.cache_format = cache_format
+
+        if use_memory_map and cache_format != "arrow":
+            raise ValueError("use_memory_map requires cache_format='arrow'")
+        self.use_memory_map = use_memory_map
+
+        if workers is not None and workers < 1:
+            raise ValueError("`workers` must be a positive integer.")
+        self.workers = workers
+
         if self.source_type == "ecospold":
             self.source_file_path = check_ei_filepath(source_file_path)
         else:
@@ -563,19 +840,37 @@ class NewDatabase:
                 "E.g., {'external scenarios': ['scenario': 'A', 'data': datapackage]}"
             )
 
+        iam_data = {}
+
         def _fetch_iam_data(scenario):
-            data = IAMDataCollection(
-                model=scenario["model"],
-                pathway=scenario["pathway"],
-                year=scenario["year"],
-                external_scenarios=scenario.get("external scenarios"),
-                filepath_iam_files=scenario["filepath"],
-                key=key,
-                system_model=self.system_model,
-                system_model_args=self.system_model_args,
-                gains_scenario=self.gains_scenario,
-                use_absolute_efficiency=self.use_absolute_efficiency,
+            # scenarios of the same pathway share the IAM arrays,
+            # which cover all years, except for consequential market data
+            pathway = (
+                scenario["model"],
+                scenario["pathway"],
+                str(scenario["filepath"]),
             )
+
+            if pathway in iam_data and self.system_model != "consequential":
+                data = iam_data[pathway].for_year(
+                    scenario["year"],
+                    external_scenarios=scenario.get("external scenarios"),
+                )
+            else:
+                data = IAMDataCollection(
+                    model=scenario["model"],
+                    pathway=scenario["pathway"],
+                    year=scenario["year"],
+                    external_scenarios=scenario.get("external scenarios"),
+                    filepath_iam_files=scenario["filepath"],
+                    key=key,
+                    system_model=self.system_model,
+                    system_model_args=self.system_model_args,
+                    gains_scenario=self.gains_scenario,
+                    use_absolute_efficiency=self.use_absolute_efficiency,
+                )
+                iam_data[pathway] = data
+
             scenario["iam data"] = data
 
             if "external scenarios" in scenario:
@@ -583,6 +878,13 @@ class NewDatabase:
                     scenario["external scenarios"]
                 )
 
+        self.source_fingerprint = fingerprint_source_database(
+            self.source_type, self.source, self.source_file_path
+        )
+
+        self.__inventory_lookup = None
+        self.__inventory_lookup_size = 0
+
         print("- Extracting source database")
         if use_cached_database:
             self.database = self.__find_cached_db(source_db)
@@ -619,26 +921,22 @@ class NewDatabase:
         if db_name is None and self.source_type == "ecospold":
             db_name = f"ecospold_{self.system_model}_{self.version}"
 
-        uncertainty_data = (
-            "w_uncertainty" if self.keep_uncertainty_data is True else "wo_uncertainty"
-        )
-
-        file_name = (
-            DIR_CACHED_DB
-            / f"cached_{''.join(tuple(map(str, __version__)))}_{db_name.strip().lower()}_{uncertainty_data}.pickle"
-        )
+        file_name = self.__cached_file_name(db_name)
 
         # check that file path leads to an existing file
         if file_name.exists():
             # return the cached database
-            with open(file_name, "rb") as f:
-                return pickle.load(f)
+            return self.__read_cache(file_name, memory_map=self.use_memory_map)
 
-        # extract the database, pickle it for next time and return it
+        # extract the database, cache it for next time and return it
         print("Cannot find cached database. Will create one now for next time...")
         clear_existing_cache()
         database = self.__clean_database()
-        pickle.dump(database, open(file_name, "wb"))
+        self.__write_cache(database, file_name)
+        self.__add_to_cache_manifest(file_name, db_name)
+
+        if self.use_memory_map:
+            return MappedDatabase(file_name)
         return database
 
     def __find_cached_inventories(self, db_name: str) -> Union[None, List[dict]]:
@@ -652,25 +950,18 @@ class NewDatabase:
         if db_name is None and self.source_type == "ecospold":
             db_name = f"ecospold_{self.system_model}_{self.version}"
 
-        uncertainty_data = (
-            "w_uncertainty" if self.keep_uncertainty_data is True else "wo_uncertainty"
-        )
-
-        file_name = (
-            DIR_CACHED_DB
-            / f"cached_{''.join(tuple(map(str, __version__)))}_{db_name.strip().lower()}_{uncertainty_data}_inventories.pickle"
-        )
+        file_name = self.__cached_file_name(db_name, suffix="_inventories")
 
         # check that file path leads to an existing file
         if file_name.exists():
             # return the cached database
-            with open(file_name, "rb") as f:
-                return pickle.load(f)
+            return self.__read_cache(file_name)
 
-        # else, extract the database, pickle it for next time and return it
+        # else, extract the database, cache it for next time and return it
         print("Cannot find cached inventories. Will create them now for next time...")
         data = self.__import_inventories()
-        pickle.dump(data, open(file_name, "wb"))
+        self.__write_cache(data, file_name)
+        self.__add_to_cache_manifest(file_name, db_name)
         print(
             "Data cached. It is advised to restart your workflow at this point.\n"
             "This allows premise to use the cached data instead, which results in\n"
@@ -678,6 +969,101 @@ class NewDatabase:
         )
         return None
 
+    def __cached_file_name(self, db_name: str, suffix: str = "") -> Path:
+        """
+        Return the path of the cache file for the source database,
+        keyed on the fingerprint of the source database,
+        the system model, the ecoinvent version and the uncertainty flag,
+        so that caches of different sources can coexist.
+        :param db_name: database name
+        :param suffix: suffix to add to the file name
+        :return: file path
+        """
+        uncertainty_data = (
+            "w_uncertainty" if self.keep_uncertainty_data is True else "wo_uncertainty"
+        )
+
+        cache_key = hashlib.sha256(
+            "|".join(
+                [
+                    self.source_fingerprint,
+                    self.source_type,
+                    self.system_model,
+                    self.version,
+                    uncertainty_data,
+                ]
+            ).encode("utf-8")
+        ).hexdigest()[:12]
+
+        extension = "arrow" if self.cache_format == "arrow" else "pickle"
+
+        return (
+            DIR_CACHED_DB
+            / f"cached_{''.join(tuple(map(str, __version__)))}_{db_name.strip().lower()}_{uncertainty_data}_{cache_key}{suffix}.{extension}"
+        )
+
+    @staticmethod
+    def __read_cache(file_name: Path, memory_map: bool = False) -> List[dict]:
+        """
+        Read a cached database, from a pickle or an Arrow file.
+        :param file_name: path of the cache file
+        :param memory_map: if True, an Arrow file is memory-mapped
+        and its datasets are read on demand
+        :return: database
+        """
+        if file_name.suffix == ".arrow":
+            if memory_map:
+                return MappedDatabase(file_name)
+            return read_database(file_name)
+
+        with open(file_name, "rb") as f:
+            return pickle.load(f)
+
+    @staticmethod
+    def __write_cache(database: List[dict], file_name: Path) -> None:
+        """
+        Write a database to a cache file, as pickle or Arrow
+        depending on the extension of `file_name`.
+        :param database: database
+        :param file_name: path of the cache file
+        """
+        if file_name.suffix == ".arrow":
+            write_database(database, file_name)
+        else:
+            with open(file_name, "wb") as f:
+                pickle.dump(database, f)
+
+    def __add_to_cache_manifest(self, file_name: Path, db_name: str) -> None:
+        """
+        Record a cache file and the source it was built from in the
+        manifest of the cache folder. Entries of deleted files are dropped.
+        :param file_name: path of the cache file
+        :param db_name: database name
+        """
+        manifest_file = (
+            DIR_CACHED_DB
+            / f"cached_{''.join(tuple(map(str, __version__)))}_manifest.json"
+        )
+
+        manifest = {}
+        if manifest_file.exists():
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+
+        manifest = {k: v for k, v in manifest.items() if (DIR_CACHED_DB / k).exists()}
+        manifest[file_name.name] = {
+            "source": db_name,
+            "source type": self.source_type,
+            "source fingerprint": self.source_fingerprint,
+            "system model": self.system_model,
+            "version": self.version,
+            "uncertainty data": self.keep_uncertainty_data,
+            "created": datetime.now().isoformat(timespec="seconds"),
+        }
+
+        with open(manifest_file, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
     def __clean_database(self) -> List[dict]:
         """
         Extracts the ecoinvent database, loads it into a dictionary and does a little bit of housekeeping
@@ -688,6 +1074,30 @@ class NewDatabase:
             self.source, self.source_type, self.source_file_path, self.version
         ).prepare_datasets(self.keep_uncertainty_data)
 
+    def __load_mapped_database(self) -> None:
+        """
+        Load a memory-mapped database in memory.
+        Inventory imports search the database many times,
+        which is faster on decoded datasets.
+        """
+        if isinstance(self.database, MappedDatabase):
+            self.database = list(self.database)
+
+    def __get_inventory_lookup(self) -> InventoryLookup:
+        """
+        Return the lookup tables of the database, shared by the inventory
+        imports. Datasets added to the database since the last call are
+        added to them.
+        :return: lookup tables
+        """
+        if self.__inventory_lookup is None:
+            self.__inventory_lookup = InventoryLookup([], self.version)
+
+        self.__inventory_lookup.add(self.database[self.__inventory_lookup_size :])
+        self.__inventory_lookup_size = len(self.database)
+
+        return self.__inventory_lookup
+
     def __import_inventories(self) -> List[dict]:
         """
         This method will trigger the import of a number of pickled inventories
@@ -696,6 +1106,8 @@ class NewDatabase:
 
         print("Importing default inventories...\n")
 
+        self.__load_mapped_database()
+
         # with HiddenPrints():
         # Manual import
         # file path and original ecoinvent version
@@ -774,19 +1186,22 @@ class NewDatabase:
             (FILEPATH_BUSES, "3.7"),
             (FILEPATH_PASS_CARS, "3.7"),
         ]
-        for filepath in filepaths:
-            # make an exception for FILEPATH_OIL_GAS_INVENTORIES
-            # ecoinvent version is 3.9
-            if filepath[0] in [
-                FILEPATH_OIL_GAS_INVENTORIES,
-                FILEPATH_BATTERIES_NMC_NCA_LFP,
-            ] and self.version in [
-                "3.9",
-                "3.9.1",
-                "3.10",
-            ]:
-                continue
+        # make an exception for FILEPATH_OIL_GAS_INVENTORIES
+        # ecoinvent version is 3.9
+        if self.version in ["3.9", "3.9.1", "3.10"]:
+            filepaths = [
+                filepath
+                for filepath in filepaths
+                if filepath[0]
+                not in [FILEPATH_OIL_GAS_INVENTORIES, FILEPATH_BATTERIES_NMC_NCA_LFP]
+            ]
+
+        if self.workers is not None:
+            data = self.__import_inventories_in_parallel(filepaths)
+            self.database.extend(data)
+            return data
 
+        for filepath in filepaths:
             inventory = DefaultInventory(
                 database=self.database,
                 version_in=filepath[1],
@@ -794,6 +1209,7 @@ class NewDatabase:
                 path=filepath[0],
                 system_model=self.system_model,
                 keep_uncertainty_data=self.keep_uncertainty_data,
+                lookup=self.__get_inventory_lookup(),
             )
             datasets = inventory.merge_inventory()
             data.extend(datasets)
@@ -801,6 +1217,43 @@ class NewDatabase:
 
         return data
 
+    def __import_inventories_in_parallel(self, filepaths: List[tuple]) -> List[dict]:
+        """
+        Import the inventory files in a pool of worker processes,
+        each against the source database only, and merge them in order.
+        :param filepaths: list of (file path, ecoinvent version) tuples
+        :return: list of datasets
+        """
+        # register the migration maps once, before the workers use them
+        register_migration_maps()
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_import_worker,
+            initargs=(
+                self.database,
+                self.__get_inventory_lookup(),
+                bw2data.projects.current,
+            ),
+        ) as executor:
+            inventories = list(
+                executor.map(
+                    _import_default_inventory,
+                    [filepath for filepath, _ in filepaths],
+                    [version for _, version in filepaths],
+                    [self.version] * len(filepaths),
+                    [self.system_model] * len(filepaths),
+                    [self.keep_uncertainty_data] * len(filepaths),
+                )
+            )
+
+        data = merge_inventories(inventories)
+
+        if not self.keep_uncertainty_data:
+            data = remove_uncertainty(data)
+
+        return data
+
     def __import_additional_inventories(
         self, data_package: [datapackage.DataPackage, list]
     ) -> List[dict]:
@@ -814,6 +1267,8 @@ class NewDatabase:
         """
         print("\n//////////////// IMPORTING USER-DEFINED INVENTORIES ////////////////")
 
+        self.__load_mapped_database()
+
         data = []
 
         if isinstance(data_package, list):
@@ -825,6 +1280,7 @@ class NewDatabase:
                     version_out=self.version,
                     path=file_path["filepath"],
                     system_model=self.system_model,
+                    lookup=self.__get_inventory_lookup(),
                 )
                 additional.prepare_inventory()
                 data.extend(additional.merge_inventory())
@@ -837,6 +1293,7 @@ class NewDatabase:
                     version_out=self.version,
                     path=data_package.get_resource("inventories").source,
                     system_model=self.system_model,
+                    lookup=self.__get_inventory_lookup(),
                 )
                 data.extend(additional.merge_inventory())
         else:
@@ -844,26 +1301,68 @@ class NewDatabase:
 
         return data
 
-    def update(self, sectors: [str, list, None] = None) -> None:
+    def update(
+        self,
+        sectors: [str, list, None] = None,
+        workers: int = None,
+        executor: Executor = None,
+        concurrent_sectors: bool = False,
+        checkpoints: bool = False,
+        resume: bool = False,
+        region_workers: int = None,
+        relink_cache: bool = False,
+    ) -> None:
         """
         Update a specific sector by name.
+
+        :param sectors: name or list of names of the sectors to update.
+        If None, all sectors are updated.
+        :param workers: number of worker processes to update scenarios in parallel.
+        If None (and no `executor` is given), scenarios are updated sequentially.
+        :param executor: a `concurrent.futures.Executor` to submit the scenario
+        updates to, instead of a process pool created by premise.
+        :param concurrent_sectors: if True, sectors that do not depend on each other
+        (e.g., cement and steel) are applied concurrently to each scenario,
+        in forked worker processes. Only available on platforms supporting `fork`.
+        :param checkpoints: if True, each scenario is checkpointed to the cache folder
+        after each sector, until all sectors are applied to it.
+        :param resume: if True, scenarios are restored from their last checkpoint,
+        if any, and the sectors already applied to them are skipped.
+        Implies `checkpoints=True`.
+        :param region_workers: number of worker processes to relink
+        the regional copies of datasets created by the biomass, DAC, cement,
+        steel and fuels sectors. If None, they are relinked sequentially.
+        Only available on platforms supporting `fork`.
+        :param relink_cache: if True, the suppliers chosen when relinking exchanges
+        are stored in the cache folder, per source database, IAM model and sector,
+        and re-used by later updates, as long as the suppliers available
+        for these exchanges are the same.
         """
         sector_update_methods = {
             "biomass": {
                 "func": _update_biomass,
-                "args": (self.version, self.system_model),
+                "args": (self.version, self.system_model, region_workers),
             },
             "electricity": {
                 "func": _update_electricity,
                 "args": (self.version, self.system_model, self.use_absolute_efficiency),
             },
-            "dac": {"func": _update_dac, "args": (self.version, self.system_model)},
+            "dac": {
+                "func": _update_dac,
+                "args": (self.version, self.system_model, region_workers),
+            },
             "cement": {
                 "func": _update_cement,
-                "args": (self.version, self.system_model),
+                "args": (self.version, self.system_model, region_workers),
+            },
+            "steel": {
+                "func": _update_steel,
+                "args": (self.version, self.system_model, region_workers),
+            },
+            "fuels": {
+                "func": _update_fuels,
+                "args": (self.version, self.system_model, region_workers),
             },
-            "steel": {"func": _update_steel, "args": (self.version, self.system_model)},
-            "fuels": {"func": _update_fuels, "args": (self.version, self.system_model)},
             "heat": {"func": _update_heat, "args": (self.version, self.system_model)},
             "emissions": {
                 "func": _update_emissions,
@@ -894,6 +1393,20 @@ class NewDatabase:
             },
         }
 
+        if relink_cache:
+            sector_update_methods = {
+                sector: {
+                    "func": _update_with_relink_cache,
+                    "args": (
+                        self.source_fingerprint,
+                        sector,
+                        method["func"],
+                        *method["args"],
+                    ),
+                }
+                for sector, method in sector_update_methods.items()
+            }
+
         if isinstance(sectors, str):
             sectors = [
                 sectors,
@@ -912,37 +1425,155 @@ class NewDatabase:
             [item for item in sectors if item not in sector_update_methods]
         )
 
+        if workers is not None and workers < 1:
+            raise ValueError("`workers` must be a positive integer.")
+
+        if region_workers is not None and region_workers < 1:
+            raise ValueError("`region_workers` must be a positive integer.")
+
+        checkpoints = checkpoints or resume
+
         with tqdm(
             total=len(self.scenarios), desc="Processing scenarios", ncols=70
         ) as pbar_outer:
-            for scenario in self.scenarios:
-                # add database to scenarios
-                if "database filepath" in scenario:
-                    scenario = load_database(scenario)
-                else:
-                    scenario["database"] = pickle.loads(pickle.dumps(self.database, -1))
-                for sector in sectors:
-                    if sector in scenario.get("applied functions", []):
-                        print(
-                            f"Function to update {sector} already applied to scenario."
-                        )
-                        continue
-
-                    # Prepare the function and arguments
-                    update_func = sector_update_methods[sector]["func"]
-                    fixed_args = sector_update_methods[sector]["args"]
-                    scenario = update_func(scenario, *fixed_args)
-
-                    if "applied functions" not in scenario:
-                        scenario["applied functions"] = []
-                    scenario["applied functions"].append(sector)
-
-                # dump database
-                dump_database(scenario)
-                # Manually update the outer progress bar after each sector is completed
-                pbar_outer.update()
+            if workers is None and executor is None:
+                for scenario in self.scenarios:
+                    _update_scenario(
+                        scenario,
+                        sectors,
+                        sector_update_methods,
+                        self.database,
+                        self.cache_format,
+                        concurrent_sectors,
+                        self.__checkpoint_file(scenario) if checkpoints else None,
+                        resume,
+                    )
+                    # Manually update the outer progress bar after each scenario is completed
+                    pbar_outer.update()
+            else:
+                self.__update_in_parallel(
+                    sectors,
+                    sector_update_methods,
+                    workers,
+                    executor,
+                    pbar_outer,
+                    concurrent_sectors,
+                    checkpoints,
+                    resume,
+                )
         print("Done!\n")
 
+    def __checkpoint_file(self, scenario: dict) -> Path:
+        """
+        Return the path of the checkpoint file of a scenario,
+        keyed on the source database, the settings of this instance
+        and the scenario, so that a checkpoint is only resumed
+        by an identical run.
+        :param scenario: scenario dictionary
+        :return: file path
+        """
+        checkpoint_key = hashlib.sha256(
+            json.dumps(
+                [
+                    self.source_fingerprint,
+                    self.source_type,
+                    self.version,
+                    self.system_model,
+                    self.system_model_args,
+                    self.gains_scenario,
+                    self.use_absolute_efficiency,
+                    self.keep_uncertainty_data,
+                    [
+                        str(inventory.get("filepath"))
+                        for inventory in self.additional_inventories or []
+                    ],
+                    scenario["model"],
+                    scenario["pathway"],
+                    scenario["year"],
+                    str(scenario.get("filepath")),
+                    [
+                        external.get("scenario")
+                        for external in scenario.get("external scenarios", [])
+                    ],
+                ],
+                default=str,
+            ).encode("utf-8")
+        ).hexdigest()[:16]
+
+        return (
+            DIR_CHECKPOINTS
+            / f"checkpoint_{''.join(tuple(map(str, __version__)))}_{scenario['model']}_{scenario['year']}_{checkpoint_key}.pickle"
+        )
+
+    def __update_in_parallel(
+        self,
+        sectors: List[str],
+        sector_update_methods: dict,
+        workers: int,
+        executor: Executor,
+        pbar: tqdm,
+        concurrent_sectors: bool = False,
+        checkpoints: bool = False,
+        resume: bool = False,
+    ) -> None:
+        """
+        Update the scenarios in a pool of worker processes.
+        If premise creates the pool, the base database is sent once
+        to each worker. A user-provided `executor` receives it with each scenario.
+        """
+
+        # datapackages of external scenarios cannot be pickled,
+        # so these scenarios are updated in the current process
+        local_scenarios = [s for s in self.scenarios if "external scenarios" in s]
+        remote_scenarios = [s for s in self.scenarios if "external scenarios" not in s]
+
+        owns_executor = executor is None
+        if owns_executor:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_update_worker,
+                initargs=(self.database,),
+            )
+            database = None
+        else:
+            database = self.database
+
+        try:
+            futures = {
+                executor.submit(
+                    _update_scenario_in_worker,
+                    scenario,
+                    sectors,
+                    sector_update_methods,
+                    database,
+                    self.cache_format,
+                    concurrent_sectors,
+                    self.__checkpoint_file(scenario) if checkpoints else None,
+                    resume,
+                ): scenario
+                for scenario in remote_scenarios
+            }
+
+            for scenario in local_scenarios:
+                _update_scenario(
+                    scenario,
+                    sectors,
+                    sector_update_methods,
+                    self.database,
+                    self.cache_format,
+                    concurrent_sectors,
+                    self.__checkpoint_file(scenario) if checkpoints else None,
+                    resume,
+                )
+                pbar.update()
+
+            for future in as_completed(futures):
+                futures[future].update(future.result())
+                pbar.update()
+        finally:
+            if owns_executor:
+                executor.shutdown()
+
     def write_superstructure_db_to_brightway(
         self,
         name: str = f"super_db_{datetime.now().strftime('%d-%m-%Y')}",
@@ -0,0 +1,243 @@
+"""
+scheduling.py orders the sector updates of a scenario.
+Each sector declares the groups of datasets it reads and writes.
+Sectors that neither write what the other reads nor write
+the same datasets are independent, and can be applied concurrently,
+each in a worker process, to its own view of the database.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Set
+
+from .indexing import ProductionIndex
+from .utils import copy_on_write_database
+
+# groups of datasets read and written by each sector.
+# "*" stands for any dataset: such sectors are applied alone.
+SECTOR_DEPENDENCIES = {
+    "biomass": {"reads": {"biomass"}, "writes": {"biomass"}},
+    "electricity": {
+        "reads": {"biomass", "electricity"},
+        "writes": {"electricity"},
+    },
+    "dac": {"reads": {"electricity", "heat", "dac"}, "writes": {"dac"}},
+    "cement": {"reads": {"electricity", "cement"}, "writes": {"cement"}},
+    "steel": {"reads": {"electricity", "steel"}, "writes": {"steel"}},
+    "fuels": {
+        "reads": {"biomass", "electricity", "dac", "fuels"},
+        "writes": {"fuels"},
+    },
+    "heat": {"reads": {"electricity", "fuels", "heat"}, "writes": {"heat"}},
+    "emissions": {"reads": {"*"}, "writes": {"*"}},
+    "cars": {"reads": {"electricity", "fuels", "cars"}, "writes": {"cars"}},
+    "two_wheelers": {
+        "reads": {"electricity", "fuels", "two_wheelers"},
+        "writes": {"two_wheelers"},
+    },
+    "trucks": {"reads": {"electricity", "fuels", "trucks"}, "writes": {"trucks"}},
+    "buses": {"reads": {"electricity", "fuels", "buses"}, "writes": {"buses"}},
+    "external": {"reads": {"*"}, "writes": {"*"}},
+}
+
+# scenario and update functions of the worker processes
+_SECTOR_SCENARIO = None
+_SECTOR_UPDATE_METHODS = None
+
+
+def _overlap(first: Set[str], second: Set[str]) -> bool:
+    return bool(first & second) or bool(
+        ("*" in first and second) or ("*" in second and first)
+    )
+
+
+def sectors_conflict(first: str, second: str, dependencies: dict = None) -> bool:
+    """
+    Return True if the order in which two sectors are applied matters,
+    that is, if one writes datasets the other reads or writes.
+    Undeclared sectors conflict with all others.
+    :param first: name of the first sector
+    :param second: name of the second sector
+    :param dependencies: datasets read and written, per sector
+    :return: True if the sectors conflict
+    """
+    dependencies = dependencies or SECTOR_DEPENDENCIES
+    everything = {"reads": {"*"}, "writes": {"*"}}
+    first = dependencies.get(first, everything)
+    second = dependencies.get(second, everything)
+
+    return (
+        _overlap(first["writes"], second["writes"])
+        or _overlap(first["writes"], second["reads"])
+        or _overlap(first["reads"], second["writes"])
+    )
+
+
+def schedule_sectors(sectors: List[str], dependencies: dict = None) -> List[List[str]]:
+    """
+    Group sectors into successive waves of independent sectors.
+    A sector is placed in the wave following the last wave
+    holding a sector listed before it, with which it conflicts.
+    Applying the waves in turn thus gives the same result
+    as applying the sectors in the order given.
+    :param sectors: names of the sectors, in order of application
+    :param dependencies: datasets read and written, per sector
+    :return: list of waves, each a list of sector names
+    """
+    waves: List[List[str]] = []
+    levels: Dict[str, int] = {}
+
+    for i, sector in enumerate(sectors):
+        level = 1 + max(
+            (
+                levels[previous]
+                for previous in sectors[:i]
+                if sectors_conflict(previous, sector, dependencies)
+            ),
+            default=-1,
+        )
+        levels[sector] = level
+        if level == len(waves):
+            waves.append([])
+        waves[level].append(sector)
+
+    return waves
+
+
+def _apply_sector_to_view(sector: str) -> dict:
+    """
+    Apply a sector update, in a worker process, to a copy-on-write
+    view of the database of the scenario, and return the changes made
+    to the database (datasets modified, removed and added)
+    and to its production index.
+    """
+    scenario = dict(_SECTOR_SCENARIO)
+    base = scenario["database"]
+    view = copy_on_write_database(base)
+    scenario["database"] = view
+    # positions of the datasets in the base database, taken before
+    # the update, which may add datasets to the view
+    origins = {id(dataset): i for i, dataset in enumerate(view)}
+    # the index is the forked copy of that of the parent process
+    index = scenario["index"]
+    index.record_changes()
+
+    update_func = _SECTOR_UPDATE_METHODS[sector]["func"]
+    fixed_args = _SECTOR_UPDATE_METHODS[sector]["args"]
+    scenario = update_func(scenario, *fixed_args)
+
+    modified, kept, added = {}, set(), []
+
+    for dataset in scenario["database"]:
+        i = origins.get(id(dataset))
+        if i is None:
+            added.append(dataset)
+            continue
+        kept.add(i)
+        if dataset.differs_from(base[i]):
+            modified[i] = dataset
+
+    return {
+        "modified": modified,
+        "removed": set(range(len(base))) - kept,
+        "added": added,
+        "cache": scenario.get("cache") or {},
+        # None if the sector replaced the index
+        "index": index.changes() if scenario.get("index") is index else None,
+    }
+
+
+def _merge_cache(cache: dict, other: dict) -> None:
+    """
+    Merge the relinking cache `other`, of the form
+    {location: {model: {key: value}}}, into `cache`.
+    """
+    for location, models in other.items():
+        for model, entries in models.items():
+            cache.setdefault(location, {}).setdefault(model, {}).update(entries)
+
+
+def apply_sectors_concurrently(
+    scenario: dict,
+    sectors: List[str],
+    sector_update_methods: dict,
+    dependencies: dict = None,
+) -> List[str]:
+    """
+    Apply independent sectors to a scenario, each in a worker process,
+    and merge the changes they made to its database.
+    The changes of a sector are not merged if they touch datasets
+    already changed by a sector listed before it: such sectors are
+    returned, to be applied after the others.
+    :param scenario: scenario dictionary, with its database
+    :param sectors: names of independent sectors, in order of application
+    :param sector_update_methods: update functions and arguments, per sector
+    :param dependencies: datasets read and written, per sector
+    :return: names of the sectors left to apply
+    """
+    global _SECTOR_SCENARIO, _SECTOR_UPDATE_METHODS
+
+    if len(sectors) < 2 or "fork" not in multiprocessing.get_all_start_methods():
+        return sectors
+
+    # workers start from the same index, and return the changes made to it
+    if not scenario.get("index"):
+        scenario["index"] = ProductionIndex.from_database(scenario["database"])
+
+    # worker processes are forked, and inherit the scenario
+    # and its IAM data, rather than receiving a pickled copy
+    _SECTOR_SCENARIO = scenario
+    _SECTOR_UPDATE_METHODS = sector_update_methods
+    try:
+        with ProcessPoolExecutor(
+            max_workers=len(sectors),
+            mp_context=multiprocessing.get_context("fork"),
+        ) as executor:
+            results = list(executor.map(_apply_sector_to_view, sectors))
+    finally:
+        _SECTOR_SCENARIO = None
+        _SECTOR_UPDATE_METHODS = None
+
+    database = scenario["database"]
+    changed, created = set(), set()
+    modified, removed, added, deferred = {}, set(), [], []
+    index_changes = []
+
+    for sector, result in zip(sectors, results):
+        touched = set(result["modified"]) | result["removed"]
+        keys = {
+            (ds["name"], ds.get("reference product"), ds.get("location"))
+            for ds in result["added"]
+        }
+        if touched & changed or keys & created:
+            print(f"Datasets changed by {sector} overlap: applying it afterwards.")
+            deferred.append(sector)
+            continue
+
+        changed |= touched
+        created |= keys
+        modified.update(result["modified"])
+        removed |= result["removed"]
+        added.extend(result["added"])
+        _merge_cache(scenario.setdefault("cache", {}), result["cache"])
+        if index_changes is not None and result["index"] is not None:
+            index_changes.extend(result["index"])
+        else:
+            index_changes = None
+        scenario.setdefault("applied functions", []).append(sector)
+
+    scenario["database"] = [
+        modified.get(i, dataset)
+        for i, dataset in enumerate(database)
+        if i not in removed
+    ] + added
+
+    # entries added to and removed from the index by the sectors,
+    # removals included, are applied to the index of the scenario
+    if index_changes is not None:
+        scenario["index"].apply_changes(index_changes)
+    else:
+        # a sector replaced its index: it is rebuilt from the database
+        scenario.pop("index", None)
+
+    return deferred
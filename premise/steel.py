@@ -14,7 +14,7 @@ from .validation import SteelValidation
 logger = create_logger("steel")
 
 
-def _update_steel(scenario, version, system_model):
+def _update_steel(scenario, version, system_model, workers=None):
     steel = Steel(
         database=scenario["database"],
         model=scenario["model"],
@@ -25,6 +25,7 @@ def _update_steel(scenario, version, system_model):
         system_model=system_model,
         cache=scenario.get("cache"),
         index=scenario.get("index"),
+        workers=workers,
     )
 
     if scenario["iam data"].steel_markets is not None:
@@ -70,6 +71,7 @@ class Steel(BaseTransformation):
         system_model: str,
         cache: dict = None,
         index: dict = None,
+        workers: int = None,
     ) -> None:
         super().__init__(
             database,
@@ -81,9 +83,10 @@ class Steel(BaseTransformation):
             system_model,
             cache,
             index,
+            workers,
         )
         self.version = version
-        mapping = InventorySet(self.database)
+        mapping = InventorySet(self.database, search_index=self.search_index)
         self.material_map: dict = mapping.generate_material_map()
 
     def generate_activities(self):
@@ -7,11 +7,12 @@ on the wurst database.
 
 import copy
 import logging.config
+import multiprocessing
 import uuid
 from collections import defaultdict
 from collections.abc import ValuesView
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
-from functools import lru_cache
 from itertools import groupby, product
 from pathlib import Path
 from typing import Any, Dict, List, Set, Tuple, Union
@@ -20,7 +21,6 @@ import numpy as np
 import xarray as xr
 import yaml
 from _operator import itemgetter
-from constructive_geometries import resolved_row
 from wurst import reference_product, rescale_exchange
 from wurst import searching as ws
 from wurst import transformations as wt
@@ -29,6 +29,7 @@ from .activity_maps import InventorySet
 from .data_collection import IAMDataCollection
 from .filesystem_constants import DATA_DIR
 from .geomap import Geomap
+from .indexing import ConsumerIndex, DatasetIndex, ProductionIndex, SearchIndex
 from .utils import get_fuel_properties
 
 LOG_CONFIG = DATA_DIR / "utils" / "logging" / "logconfig.yaml"
@@ -45,6 +46,10 @@ with open(LOG_CONFIG, encoding="utf-8") as f:
 
 logger = logging.getLogger("module")
 
+# transformation and regional proxies relinked by the worker processes
+_PROXY_TRANSFORMATION = None
+_PROXY_DATASETS = None
+
 
 def get_suppliers_of_a_region(
     database: List[dict],
@@ -54,6 +59,7 @@ def get_suppliers_of_a_region(
     unit: str,
     exclude: List[str] = None,
     exact_match: bool = False,
+    search_index: SearchIndex = None,
 ) -> filter:
     """
     Return a list of datasets, for which the location, name,
@@ -67,6 +73,8 @@ def get_suppliers_of_a_region(
     :param reference_prod: reference product of dataset
     :return: list of wurst datasets
     :param exclude: list of terms to exclude
+    :param search_index: if provided, index of `database` used
+        to find the datasets whose name contains one of `names`
     """
 
     if exact_match:
@@ -87,6 +95,9 @@ def get_suppliers_of_a_region(
     if exclude:
         filters.append(ws.doesnt_contain_any("name", exclude))
 
+    if search_index is not None and not exact_match:
+        database = search_index.contains(database, "name", names)
+
     return ws.get_many(
         database,
         *filters,
@@ -327,6 +338,31 @@ def find_fuel_efficiency(
     return current_efficiency
 
 
+def _relink_proxies_in_worker(regions: List[str]) -> Dict[str, tuple]:
+    """
+    Relink the regional proxies of `regions`, in a worker process,
+    and return, for each region, the relinked dataset, the cache
+    entries of the region and the products added to the index.
+    """
+    transformation, results = _PROXY_TRANSFORMATION, {}
+
+    for region in regions:
+        dataset = _PROXY_DATASETS[region]
+        unindexed = {
+            (exc["name"], exc["product"])
+            for exc in filter_technosphere_exchanges(dataset["exchanges"])
+            if (exc["name"], exc["product"]) not in transformation.index
+        }
+        dataset = transformation.relink_technosphere_exchanges(dataset)
+        results[region] = (
+            dataset,
+            transformation.cache.get(region, {}).get(transformation.model, {}),
+            {key for key in unindexed if key in transformation.index},
+        )
+
+    return results
+
+
 class BaseTransformation:
     """
     Base transformation class.
@@ -335,6 +371,8 @@ class BaseTransformation:
     :ivar iam_data: IAMDataCollection object_
     :ivar model: IAM model
     :ivar year: database year
+    :ivar workers: number of worker processes to relink regional proxies with.
+    If None, regional proxies are relinked sequentially.
     """
 
     def __init__(
@@ -348,6 +386,7 @@ class BaseTransformation:
         system_model: str,
         cache: dict = None,
         index: dict = None,
+        workers: int = None,
     ) -> None:
         self.database: List[dict] = database
         self.iam_data: IAMDataCollection = iam_data
@@ -361,6 +400,7 @@ class BaseTransformation:
 
         self.system_model: str = system_model
         self.cache: dict = cache or {}
+        self.workers: int = workers
         self.ecoinvent_to_iam_loc: Dict[str, str] = {
             loc: self.geo.ecoinvent_to_iam_location(loc)
             for loc in self.get_ecoinvent_locs()
@@ -370,53 +410,22 @@ class BaseTransformation:
             self.iam_to_ecoinvent_loc[value].append(key)
 
         self.index = index or self.create_index()
+        self.dataset_index = DatasetIndex()
+        self.search_index = SearchIndex()
+        self.consumer_index = ConsumerIndex()
 
-    def create_index(self):
-        idx = defaultdict(list)
-        for ds in self.database:
-            key = (copy.deepcopy(ds["name"]), copy.deepcopy(ds["reference product"]))
-            idx[key].append(
-                {
-                    "name": ds["name"],
-                    "reference product": ds["reference product"],
-                    "location": ds["location"],
-                    "unit": ds["unit"],
-                    "production volume": list(ws.production(ds))[0].get(
-                        "production volume", 0
-                    ),
-                }
-            )
-        return idx
+    def create_index(self) -> ProductionIndex:
+        return ProductionIndex.from_database(self.database)
 
     def add_to_index(self, ds: [dict, list, ValuesView]):
-        if isinstance(ds, ValuesView):
-            ds = list(ds)
-
         if isinstance(ds, dict):
             ds = [ds]
 
         for d in ds:
-            key = (copy.deepcopy(d["name"]), copy.deepcopy(d["reference product"]))
-            self.index[key].append(
-                {
-                    "name": d["name"],
-                    "reference product": d["reference product"],
-                    "location": d["location"],
-                    "unit": d["unit"],
-                    "production volume": list(ws.production(d))[0].get(
-                        "production volume", 0
-                    ),
-                }
-            )
+            self.index.add_dataset(d)
 
     def remove_from_index(self, ds):
-        key = (copy.deepcopy(ds["name"]), copy.deepcopy(ds["reference product"]))
-        available_locations = [k["location"] for k in self.index[key]]
-        if ds["location"] in available_locations:
-            ds_to_remove = [
-                d for d in self.index[key] if d["location"] == ds["location"]
-            ][0]
-            self.index[key].remove(ds_to_remove)
+        self.index.remove(ds["name"], ds["reference product"], ds["location"])
 
     def is_in_index(self, ds, location=None):
         if not any(key in ds for key in ["reference product", "product"]):
@@ -424,14 +433,64 @@ class BaseTransformation:
                 f"Dataset {ds['name']} does not have neither 'reference product' nor 'product' keys."
             )
         if "reference product" in ds:
-            key = (ds["name"], ds["reference product"])
+            product = ds["reference product"]
         else:
-            key = (ds["name"], ds["product"])
+            product = ds["product"]
 
         if location is None:
-            return ds["location"] in [k["location"] for k in self.index[key]]
+            location = ds["location"]
+
+        return self.index.contains(ds["name"], product, location)
 
-        return location in [k["location"] for k in self.index[key]]
+    def get_datasets(
+        self, name: str, ref_prod: str = None, location: str = None
+    ) -> List[dict]:
+        """
+        Return the datasets in the database with the given name,
+        and optionally, reference product and location.
+        Equivalent to `ws.get_many` with `ws.equals` filters,
+        but uses `self.dataset_index` instead of scanning the database.
+        :param name: dataset name
+        :param ref_prod: dataset reference product
+        :param location: dataset location
+        :return: list of datasets
+        """
+        return self.dataset_index.get(self.database, name, ref_prod, location)
+
+    def get_dataset(self, name: str, ref_prod: str, location: str) -> dict:
+        """
+        Return the dataset in the database with the given
+        name, reference product and location.
+        Equivalent to `ws.get_one` with `ws.equals` filters.
+        :param name: dataset name
+        :param ref_prod: dataset reference product
+        :param location: dataset location
+        :return: dataset
+        """
+        results = self.get_datasets(name, ref_prod, location)
+        if not results:
+            raise ws.NoResults(f"Can't find {name} {ref_prod} {location}")
+        if len(results) > 1:
+            raise ws.MultipleResults(
+                f"Found {len(results)} datasets for {name} {ref_prod} {location}"
+            )
+        return results[0]
+
+    def remove_datasets(self, datasets: List[dict]) -> None:
+        """
+        Remove `datasets` from the database, keeping
+        `self.dataset_index` and `self.search_index` in sync.
+        :param datasets: datasets to remove
+        """
+        datasets = list(datasets)
+        if not datasets:
+            return
+        self.dataset_index.sync(self.database)
+        self.search_index.sync(self.database)
+        to_remove = {id(ds) for ds in datasets}
+        self.database = [ds for ds in self.database if id(ds) not in to_remove]
+        self.dataset_index.discard(datasets, self.database)
+        self.search_index.discard(datasets, self.database)
 
     def select_multiple_suppliers(
         self,
@@ -487,14 +546,24 @@ class BaseTransformation:
                 )
             )
 
+        # datasets whose name contains one of `possible_names`
+        if subset:
+            candidates = list(
+                ws.get_many(
+                    subset,
+                    ws.either(*[ws.contains("name", sup) for sup in possible_names]),
+                )
+            )
+        else:
+            candidates = self.search_index.contains(
+                self.database, "name", list(possible_names)
+            )
+
         try:
             while not suppliers:
                 suppliers = list(
                     ws.get_many(
-                        subset or self.database,
-                        ws.either(
-                            *[ws.contains("name", sup) for sup in possible_names]
-                        ),
+                        candidates,
                         (
                             ws.either(
                                 *[
@@ -513,8 +582,7 @@ class BaseTransformation:
 
             suppliers = list(
                 ws.get_many(
-                    subset or self.database,
-                    ws.either(*[ws.contains("name", sup) for sup in possible_names]),
+                    candidates,
                     *extra_filters,
                 )
             )
@@ -707,6 +775,15 @@ class BaseTransformation:
 
         ds_name, ds_ref_prod = [None, None]
 
+        # regional copies are relinked in worker processes, all at once,
+        # once they are all created
+        parallel = (
+            relink
+            and (self.workers or 1) > 1
+            and len(d_iam_to_eco) > 1
+            and "fork" in multiprocessing.get_all_start_methods()
+        )
+
         for region in d_iam_to_eco:
             # build filters
             if exact_name_match is True:
@@ -724,14 +801,20 @@ class BaseTransformation:
 
             filters.append(ws.equals("location", d_iam_to_eco[region]))
 
+            if not subset and exact_name_match is True:
+                # only datasets with that exact name can match
+                candidates = self.get_datasets(name=name, location=d_iam_to_eco[region])
+            else:
+                candidates = subset or self.database
+
             try:
                 dataset = ws.get_one(
-                    subset or self.database,
+                    candidates,
                     *filters,
                 )
             except ws.MultipleResults as err:
                 results = ws.get_many(
-                    subset or self.database,
+                    candidates,
                     *filters,
                 )
                 raise ws.MultipleResults(
@@ -750,12 +833,11 @@ class BaseTransformation:
             # if not self.is_in_index(dataset, region):
             if self.is_in_index(dataset, region):
                 # delete original dataset from the database
-                self.database = [
-                    d
-                    for d in self.database
-                    if (d["name"], d["reference product"], d["location"])
-                    != (dataset["name"], dataset["reference product"], region)
-                ]
+                self.remove_datasets(
+                    self.get_datasets(
+                        dataset["name"], dataset["reference product"], region
+                    )
+                )
 
             d_act[region] = copy.deepcopy(dataset)
             d_act[region]["location"] = region
@@ -815,19 +897,18 @@ class BaseTransformation:
                 prod["location"] = region
                 prod["production volume"] = prod_vol
 
-            if relink:
+            if relink and not parallel:
                 d_act[region] = self.relink_technosphere_exchanges(d_act[region])
 
             ds_name = d_act[region]["name"]
             ds_ref_prod = d_act[region]["reference product"]
 
+        if parallel:
+            d_act = self.relink_proxies_in_parallel(d_act)
+
         if unlist is True:
             # remove dataset from index
-            for ds in ws.get_many(
-                self.database,
-                ws.equals("name", ds_name),
-                ws.equals("reference product", ds_ref_prod),
-            ):
+            for ds in self.get_datasets(ds_name, ds_ref_prod):
                 self.remove_from_index(ds)
 
         # empty original datasets
@@ -843,16 +924,59 @@ class BaseTransformation:
 
         if delete_original_dataset is True:
             # remove the dataset from `self.database`
-            self.database = [
-                ds
-                for ds in self.database
-                if not (
-                    ds["name"] == ds_name and ds["reference product"] == ds_ref_prod
-                )
-            ]
+            self.remove_datasets(self.get_datasets(ds_name, ds_ref_prod))
 
         return d_act
 
+    def relink_proxies_in_parallel(self, datasets: Dict[str, dict]) -> Dict[str, dict]:
+        """
+        Relink the technosphere exchanges of regional proxies
+        in `self.workers` forked worker processes, which inherit
+        the database, index and cache of this transformation.
+        The relinked datasets, and the cache entries and index entries
+        created by each worker, are merged back in the order of the regions,
+        so that the result does not depend on the order in which workers finish.
+        :param datasets: dictionary with IAM regions as keys, proxy datasets as values
+        :return: dictionary with IAM regions as keys, relinked proxy datasets as values
+        """
+        global _PROXY_TRANSFORMATION, _PROXY_DATASETS
+
+        regions = list(datasets)
+        workers = min(self.workers, len(regions))
+
+        _PROXY_TRANSFORMATION = self
+        _PROXY_DATASETS = datasets
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("fork"),
+            ) as executor:
+                results = {}
+                for batch in executor.map(
+                    _relink_proxies_in_worker,
+                    [regions[i::workers] for i in range(workers)],
+                ):
+                    results.update(batch)
+        finally:
+            _PROXY_TRANSFORMATION = None
+            _PROXY_DATASETS = None
+
+        relinked, indexed = {}, set()
+        for region in regions:
+            dataset, cache, keys = results[region]
+            relinked[region] = dataset
+            self.cache.setdefault(region, {}).setdefault(self.model, {}).update(cache)
+            indexed |= keys
+
+        # products the workers did not find in the index,
+        # and added to their own copy of it
+        if indexed:
+            for ds in self.database:
+                if (ds["name"], ds["reference product"]) in indexed:
+                    self.add_to_index(ds)
+
+        return relinked
+
     def empty_original_datasets(
         self,
         name: str,
@@ -880,14 +1004,11 @@ class BaseTransformation:
             for v in loc_map.values():
                 if self.geo.ecoinvent_to_iam_location(v) in loc_map.keys():
                     mapping[v].add(self.geo.ecoinvent_to_iam_location(v))
-        existing_datasets = ws.get_many(
-            self.database,
-            ws.equals("name", name),
-            ws.equals("reference product", ref_prod),
-            ws.exclude(
-                ws.either(*[ws.equals("location", loc) for loc in self.regions])
-            ),
-        )
+        existing_datasets = [
+            ds
+            for ds in self.get_datasets(name, ref_prod)
+            if ds["location"] not in self.regions
+        ]
 
         for existing_ds in existing_datasets:
             if existing_ds["location"] in mapping:
@@ -1046,8 +1167,20 @@ class BaseTransformation:
         alt_names = alt_names or []
         excludes_datasets = excludes_datasets or []
 
+        # only the consumers of suppliers that are
+        # not in the index have exchanges to relink
+        self.consumer_index.sync(self.database)
+        unlinked_suppliers = [
+            key
+            for key in self.consumer_index.suppliers()
+            if not self.is_in_index(
+                {"name": key[0], "product": key[1], "location": key[2]}
+            )
+        ]
+
         for act in ws.get_many(
-            self.database, ws.doesnt_contain_any("name", excludes_datasets)
+            self.consumer_index.consumers(unlinked_suppliers),
+            ws.doesnt_contain_any("name", excludes_datasets),
         ):
             # Filter out exchanges to relink
             excs_to_relink = [
@@ -1152,12 +1285,7 @@ class BaseTransformation:
             pvs = []
             for o in lst:
                 try:
-                    ds = ws.get_one(
-                        self.database,
-                        ws.equals("name", o[0]),
-                        ws.equals("reference product", o[1]),
-                        ws.equals("location", o[2]),
-                    )
+                    ds = self.get_dataset(o[0], o[1], o[2])
 
                 except ws.NoResults:
                     raise ws.NoResults(
@@ -1373,13 +1501,11 @@ class BaseTransformation:
         # use it for any plant with a similar flue gas composition (CO2 concentration
         # and composition of the flue gas).
         dataset = ws.get_one(
-            self.database,
-            ws.equals(
-                "name",
-                "carbon dioxide, captured at cement production plant, "
+            self.get_datasets(
+                name="carbon dioxide, captured at cement production plant, "
                 "with underground storage, post, 200 km",
-            ),
-            ws.equals("location", "RER"),
+                location="RER",
+            )
         )
 
         # duplicate the dataset
@@ -1601,7 +1727,7 @@ class BaseTransformation:
         # This function needs to handle the logic when
         # an exchange is not in the cache.
         key = (exchange["name"], exchange["product"])
-        possible_datasets = self.index[key]
+        possible_datasets = self.index.get(key)
 
         if len(possible_datasets) == 0:
             if "market for" in exchange["name"]:
@@ -1609,7 +1735,7 @@ class BaseTransformation:
                     exchange["name"].replace("market for", "market group for"),
                     exchange["product"],
                 )
-                possible_datasets = self.index[key]
+                possible_datasets = self.index.get(key)
 
         if len(possible_datasets) == 0:
             # search self.database for possible datasets
@@ -1978,7 +2104,6 @@ class BaseTransformation:
 
         return dataset
 
-    @lru_cache()
     def get_gis_match(
         self,
         location,
@@ -2008,15 +2133,12 @@ class BaseTransformation:
 
         possible_locations = [loc for loc in possible_locations if loc in self.geo.geo]
 
-        with resolved_row(possible_locations, self.geo.geo) as g:
-            func = g.contained if contained else g.intersects
-
-            gis_match = func(
-                location,
-                include_self=True,
-                exclusive=exclusive,
-                biggest_first=biggest_first,
-                only=possible_locations,
-            )
-
-        return gis_match
+        # look up the faces of the locations in the geography table
+        # of the model, rather than querying the geomatcher
+        return self.geo.match(
+            location,
+            possible_locations,
+            contained=contained,
+            exclusive=exclusive,
+            biggest_first=biggest_first,
+        )
@@ -560,9 +560,11 @@ class Transport(BaseTransformation):
 
         # rename coordinates along the powertrian dimension
         rev_powertrain = {v: k for k, v in self.mapping["powertrain"].items()}
-        arr.coords["powertrain"] = [
-            rev_powertrain[p] for p in arr.coords["powertrain"].values
-        ]
+        # the fleet array is shared by the scenarios of a pathway,
+        # so it is relabelled in a copy
+        arr = arr.assign_coords(
+            powertrain=[rev_powertrain[p] for p in arr.coords["powertrain"].values]
+        )
 
         vehicle_datasets = list(ws.get_many(self.database, *filters))
 
@@ -584,8 +586,14 @@ class Transport(BaseTransformation):
         # loop through datasets that use truck transport
         if self.vehicle_type == "truck":
             list_created_trucks = [(a["name"], a["location"]) for a in fleet_act]
+            self.consumer_index.sync(self.database)
+            truck_consumers = self.consumer_index.consumers(
+                key
+                for key in self.consumer_index.suppliers()
+                if "transport, freight, lorry" in (key[0] or "")
+            )
             for dataset in ws.get_many(
-                self.database,
+                truck_consumers,
                 ws.doesnt_contain_any("name", ["freight, lorry"]),
                 ws.exclude(ws.equals("unit", "ton kilometer")),
             ):
@@ -624,4 +632,7 @@ class Transport(BaseTransformation):
                         dataset["location"]
                     )
 
+            # exchanges have been relinked in place
+            self.consumer_index.refresh(truck_consumers)
+
         return fleet_act
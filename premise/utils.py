@@ -6,11 +6,12 @@ import os
 import pickle
 import sys
 import uuid
+from copy import deepcopy
 from datetime import datetime
 from functools import lru_cache
 from numbers import Number
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 import pandas as pd
 import xarray as xr
@@ -21,6 +22,7 @@ from wurst import rescale_exchange
 from wurst.searching import biosphere, equals, get_many, technosphere
 
 from . import __version__
+from .columnar import read_database, write_database
 from .data_collection import get_delimiter
 from .filesystem_constants import (
     DATA_DIR,
@@ -29,6 +31,7 @@ from .filesystem_constants import (
     VARIABLES_DIR,
 )
 from .geomap import Geomap
+from .indexing import ProductionIndex
 
 FUELS_PROPERTIES = VARIABLES_DIR / "fuels_variables.yaml"
 CROPS_PROPERTIES = VARIABLES_DIR / "crops_variables.yaml"
@@ -357,20 +360,141 @@ def create_scenario_list(scenarios: list) -> list:
     return list_scenarios
 
 
-def dump_database(scenario):
+class CopyOnWriteDataset(dict):
+    """
+    Dataset that shares its mutable fields (exchanges, parameters, etc.)
+    with a dataset of the base database.
+    A field is deep-copied the first time it is accessed,
+    so that changes made to it do not reach the base dataset.
+    Copied, deep-copied or pickled, it becomes a regular dictionary.
     """
-    Dump database to a pickle file.
+
+    __slots__ = ("_shared",)
+
+    def __init__(self, dataset: dict) -> None:
+        # `dict.items` reads the values of `dataset` without copying them,
+        # should it be a copy-on-write dataset itself
+        super().__init__(dict.items(dataset))
+        self._shared = {
+            k
+            for k, v in dict.items(dataset)
+            if not isinstance(v, (str, Number, tuple, type(None)))
+        }
+
+    def _materialize(self, key) -> None:
+        if key in self._shared:
+            super().__setitem__(key, deepcopy(super().__getitem__(key)))
+            self._shared.discard(key)
+
+    def _materialize_all(self) -> None:
+        for key in list(self._shared):
+            self._materialize(key)
+
+    def __getitem__(self, key):
+        self._materialize(key)
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value) -> None:
+        self._shared.discard(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key) -> None:
+        self._shared.discard(key)
+        super().__delitem__(key)
+
+    def __iter__(self):
+        # overriding __iter__ makes dict(ds) and {**ds}
+        # go through __getitem__
+        return super().__iter__()
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *args):
+        self._materialize(key)
+        return super().pop(key, *args)
+
+    def popitem(self):
+        self._materialize_all()
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def update(self, *args, **kwargs) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def items(self):
+        self._materialize_all()
+        return super().items()
+
+    def values(self):
+        self._materialize_all()
+        return super().values()
+
+    def copy(self) -> dict:
+        self._materialize_all()
+        return dict(super().items())
+
+    __copy__ = copy
+
+    def differs_from(self, dataset: dict) -> bool:
+        """
+        Return True if this dataset differs from `dataset`,
+        the base dataset it was created from.
+        Fields that have not been accessed are not compared.
+        """
+        if dict.keys(self) != dataset.keys():
+            return True
+        return any(
+            value != dict.__getitem__(dataset, key)
+            for key, value in dict.items(self)
+            if key not in self._shared
+        )
+
+    def __deepcopy__(self, memo) -> dict:
+        return {k: deepcopy(v, memo) for k, v in dict.items(self)}
+
+    def __reduce__(self):
+        return dict, (dict(super().items()),)
+
+
+def copy_on_write_database(database: List[dict]) -> List[dict]:
+    """
+    Return a copy of `database` whose datasets share their
+    mutable fields with the original datasets until accessed.
+    :param database: list of datasets
+    :return: list of copy-on-write datasets
+    """
+    return [CopyOnWriteDataset(dataset) for dataset in database]
+
+
+def dump_database(scenario, cache_format: str = "pickle"):
+    """
+    Dump database to a pickle file, or to an Arrow file
+    if `cache_format` is "arrow".
     :param scenario: scenario dictionary
+    :param cache_format: "pickle" or "arrow"
     """
 
     if scenario.get("database") is None:
         return scenario
 
-    # generate random name
-    name = f"{uuid.uuid4().hex}.pickle"
-    # dump as pickle
-    with open(DIR_CACHED_FILES / name, "wb") as f:
-        pickle.dump(scenario["database"], f)
+    if cache_format == "arrow":
+        name = f"{uuid.uuid4().hex}.arrow"
+        write_database(scenario["database"], DIR_CACHED_FILES / name)
+    else:
+        # generate random name
+        name = f"{uuid.uuid4().hex}.pickle"
+        # dump as pickle
+        with open(DIR_CACHED_FILES / name, "wb") as f:
+            pickle.dump(scenario["database"], f)
     scenario["database filepath"] = DIR_CACHED_FILES / name
     del scenario["database"]
 
@@ -379,7 +503,7 @@ def dump_database(scenario):
 
 def load_database(scenario):
     """
-    Load database from a pickle file.
+    Load database from a pickle or Arrow file.
     :param scenario: scenario dictionary
     """
 
@@ -388,9 +512,12 @@ def load_database(scenario):
 
     filepath = scenario["database filepath"]
 
-    # load pickle
-    with open(filepath, "rb") as f:
-        scenario["database"] = pickle.load(f)
+    if filepath.suffix == ".arrow":
+        scenario["database"] = read_database(filepath)
+    else:
+        # load pickle
+        with open(filepath, "rb") as f:
+            scenario["database"] = pickle.load(f)
     del scenario["database filepath"]
     # delete the file
     filepath.unlink()
@@ -398,9 +525,162 @@ def load_database(scenario):
     return scenario
 
 
+# scenario entries stored in checkpoints
+CHECKPOINT_KEYS = ("database", "index", "cache", "applied functions", "configurations")
+
+
+def write_checkpoint(scenario: dict, filepath: Path) -> None:
+    """
+    Write the database, index and cache of a scenario,
+    and the sectors applied to it, to a checkpoint file.
+    The file is replaced atomically, so that an interrupted
+    write does not corrupt the previous checkpoint.
+    :param scenario: scenario dictionary
+    :param filepath: path of the checkpoint file
+    """
+    tmp_file = filepath.with_name(f"{filepath.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_file, "wb") as f:
+        pickle.dump(
+            {k: scenario[k] for k in CHECKPOINT_KEYS if k in scenario},
+            f,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(tmp_file, filepath)
+
+
+def load_checkpoint(scenario: dict, filepath: Path) -> dict:
+    """
+    Restore the database, index and cache of a scenario,
+    and the sectors applied to it, from a checkpoint file.
+    :param scenario: scenario dictionary
+    :param filepath: path of the checkpoint file
+    :return: scenario dictionary
+    """
+    with open(filepath, "rb") as f:
+        scenario.update(pickle.load(f))
+    return scenario
+
+
+def relink_cache_file(source_fingerprint: str, model: str, sector: str) -> Path:
+    """
+    Return the path of the relink cache file of a sector,
+    for a source database and an IAM model.
+    :param source_fingerprint: fingerprint of the source database
+    :param model: IAM model
+    :param sector: name of the sector
+    :return: file path
+    """
+    return (
+        DIR_CACHED_DB
+        / f"cached_{''.join(tuple(map(str, __version__)))}_relink_{source_fingerprint}_{model}_{sector}.pickle"
+    )
+
+
+def _supplier_signature(signatures: Dict[tuple, str], exchange_key: tuple) -> str:
+    """
+    Return the signature of the suppliers an exchange can be relinked to:
+    those of its name and product, and those of the market group
+    it falls back to, for markets.
+    """
+    name, product = exchange_key[0], exchange_key[1]
+    keys = [(name, product)]
+    if "market for" in name:
+        keys.append((name.replace("market for", "market group for"), product))
+    return "|".join(signatures.get(key, "") for key in keys)
+
+
+def load_relink_cache(
+    scenario: dict, filepath: Path
+) -> Tuple[Dict[tuple, str], Dict[str, Set[tuple]]]:
+    """
+    Pre-seed the relinking cache of a scenario with the entries of
+    a relink cache file whose suppliers, according to the production
+    index of the scenario, are the same as when the entries were stored.
+    Entries already in the cache of the scenario are kept.
+    :param scenario: scenario dictionary
+    :param filepath: path of the relink cache file
+    :return: signatures of the production index,
+    and exchange keys cached per location, before the sector update
+    """
+    if not scenario.get("index"):
+        scenario["index"] = ProductionIndex.from_database(scenario["database"])
+    if not scenario.get("cache"):
+        scenario["cache"] = {}
+
+    model = scenario["model"]
+    signatures = scenario["index"].signatures()
+
+    if filepath.exists():
+        with open(filepath, "rb") as f:
+            stored = pickle.load(f)
+
+        for location, entries in stored.items():
+            for key, (allocated, signature) in entries.items():
+                if signature == _supplier_signature(signatures, key):
+                    scenario["cache"].setdefault(location, {}).setdefault(
+                        model, {}
+                    ).setdefault(key, allocated)
+
+    cached_keys = {
+        location: set(models.get(model, {}))
+        for location, models in scenario["cache"].items()
+    }
+
+    return signatures, cached_keys
+
+
+def save_relink_cache(
+    scenario: dict,
+    filepath: Path,
+    signatures: Dict[tuple, str],
+    cached_keys: Dict[str, Set[tuple]],
+) -> None:
+    """
+    Add the relinking cache entries created by a sector update
+    to a relink cache file. Only entries whose suppliers did not change
+    during the update are stored, with the signature of these suppliers.
+    :param scenario: scenario dictionary
+    :param filepath: path of the relink cache file
+    :param signatures: signatures of the production index, before the update
+    :param cached_keys: exchange keys cached per location, before the update
+    """
+    if not scenario.get("index") or not scenario.get("cache"):
+        return
+
+    model = scenario["model"]
+    signatures_after = scenario["index"].signatures()
+
+    new_entries = {}
+    for location, models in scenario["cache"].items():
+        for key, allocated in models.get(model, {}).items():
+            if key in cached_keys.get(location, ()):
+                continue
+            signature = _supplier_signature(signatures, key)
+            if signature == _supplier_signature(signatures_after, key):
+                new_entries.setdefault(location, {})[key] = (allocated, signature)
+
+    if not new_entries:
+        return
+
+    # entries stored meanwhile by other scenarios are kept
+    stored = {}
+    if filepath.exists():
+        with open(filepath, "rb") as f:
+            stored = pickle.load(f)
+
+    for location, entries in new_entries.items():
+        stored.setdefault(location, {}).update(entries)
+
+    tmp_file = filepath.with_name(f"{filepath.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_file, "wb") as f:
+        pickle.dump(stored, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, filepath)
+
+
 def delete_all_pickles():
     """
-    Delete all pickle files in the cache folder.
+    Delete all pickle (and Arrow) files in the cache folder.
     """
-    for file in DIR_CACHED_FILES.glob("*.pickle"):
-        file.unlink()
+    for pattern in ("*.pickle", "*.arrow"):
+        for file in DIR_CACHED_FILES.glob(pattern):
+            file.unlink()
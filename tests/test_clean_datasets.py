@@ -60,3 +60,85 @@ def test_validity_db():
 
     dbc = DatabaseCleaner("dummy_db", "brightway", Path("."), version="3.9")
     assert dbc.database[0]["name"] == "fake activity"
+
+
+def test_fix_ecospold_datasets():
+    cleaner = DatabaseCleaner.__new__(DatabaseCleaner)
+    cleaner.database = [
+        {
+            "database": "ei",
+            "code": "a",
+            "name": "steel production",
+            "reference product": "steel",
+            "location": "CH",
+            "parameters": [{"name": "p", "amount": 2.0}],
+            "exchanges": [
+                {"name": "steel", "type": "production", "input": ("ei", "a")},
+                {
+                    "name": "electricity",
+                    "type": "technosphere",
+                    "input": ("ei", "b"),
+                },
+            ],
+        },
+        {
+            "database": "ei",
+            "code": "b",
+            "name": "electricity production",
+            "reference product": "electricity",
+            "location": "DE",
+            "parameters": [],
+            "exchanges": [],
+        },
+    ]
+    cleaner.fix_ecospold_datasets()
+
+    production, technosphere = cleaner.database[0]["exchanges"]
+    assert production["name"] == "steel production"
+    assert production["product"] == "steel"
+    assert technosphere["location"] == "DE"
+    assert technosphere["product"] == "electricity"
+    assert technosphere["name"] == "electricity production"
+    assert cleaner.database[0]["parameters"] == {"p": 2.0}
+
+
+def test_prepare_datasets():
+    cleaner = DatabaseCleaner.__new__(DatabaseCleaner)
+    cleaner.version = "3.9"
+    cleaner.database = [
+        {
+            "name": "steel production",
+            "reference product": "steel",
+            "unit": "kilogram",
+            "location": None,
+            "exchanges": [
+                {"name": "steel production", "type": "production", "amount": 1},
+                {
+                    "name": "electricity production",
+                    "type": "technosphere",
+                    "unit": "kilowatt hour",
+                    "amount": 2,
+                    "comment": None,
+                },
+            ],
+        },
+        {
+            "name": "electricity production",
+            "reference product": "electricity",
+            "unit": "kilowatt hour",
+            "location": "DE",
+            "exchanges": [],
+        },
+    ]
+
+    def tag(dataset):
+        dataset["tagged"] = True
+
+    database = cleaner.prepare_datasets(keep_uncertainty_data=True, fixers=[tag])
+
+    production, technosphere = database[0]["exchanges"]
+    assert database[0]["location"] == "GLO"
+    assert production["location"] == "GLO"
+    assert technosphere["location"] == "DE"
+    assert "comment" not in technosphere
+    assert all(ds["tagged"] for ds in database)
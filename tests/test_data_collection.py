@@ -0,0 +1,41 @@
+from unittest.mock import patch
+
+import xarray as xr
+from cryptography.fernet import Fernet
+
+from premise.data_collection import IAMDataCollection
+
+
+def make_iam_data(cache_file, key):
+    # IAM data read from the cache, without derived arrays yet
+    data = IAMDataCollection.__new__(IAMDataCollection)
+    data._lazy_attributes = {}
+    data._cache_file = cache_file
+    data._cache_key = key
+    return data
+
+
+def test_lazy_attributes_are_cached(tmp_path):
+    calls = []
+
+    def get_gains_EU_data():
+        calls.append(1)
+        return xr.DataArray([1.0, 2.0], dims="year", coords={"year": [2020, 2030]})
+
+    key = Fernet.generate_key()
+    cache_file = tmp_path / "cached_iam_remind.pickle"
+
+    with patch("premise.data_collection.get_gains_EU_data", get_gains_EU_data):
+        first = make_iam_data(cache_file, key).gains_data_EU
+        # a second load reuses the array computed by the first one
+        second = make_iam_data(cache_file, key).gains_data_EU
+
+    assert calls == [1]
+    assert (tmp_path / "cached_iam_remind_gains_data_EU.pickle").exists()
+    xr.testing.assert_equal(first, second)
+
+    # the cached array cannot be read with another key
+    with patch("premise.data_collection.get_gains_EU_data", get_gains_EU_data):
+        make_iam_data(cache_file, Fernet.generate_key()).gains_data_EU
+
+    assert calls == [1, 1]
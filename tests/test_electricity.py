@@ -86,3 +86,107 @@ def test_losses():
 def test_powerplant_map():
     s = el.powerplant_map["Biomass IGCC CCS"]
     assert isinstance(s, set)
+
+
+def test_electricity_mixes():
+    from types import SimpleNamespace
+
+    import xarray as xr
+
+    regions, technologies = ["EUR", "CHA", "World"], ["Coal", "Wind"]
+    markets = xr.DataArray(
+        np.random.default_rng(0).random((3, 2, 3)),
+        coords={
+            "region": regions,
+            "variables": technologies,
+            "year": [2020, 2030, 2100],
+        },
+        dims=("region", "variables", "year"),
+    )
+    el = Electricity.__new__(Electricity)
+    el.iam_data = SimpleNamespace(
+        electricity_markets=markets, production_volumes=markets * 100
+    )
+    el.year, el.system_model = 2025, "cutoff"
+
+    mixes = el.get_electricity_mixes([0, 20])
+    volumes = el.get_market_production_volumes()
+
+    for region in regions:
+        for period in (0, 20):
+            expected = (
+                markets.sel(region=region)
+                .interp(year=np.arange(2025, 2025 + period + 1))
+                .mean(dim="year")
+            )
+            assert mixes[(region, period)] == dict(zip(technologies, expected.values))
+        assert volumes[region] == pytest.approx(
+            markets.sel(region=region, variables="Coal").interp(year=2025).item() * 100
+        )
+
+
+def test_supplier_table():
+    from types import SimpleNamespace
+
+    import xarray as xr
+
+    def power_plant(name, location, volume):
+        return {
+            "name": name,
+            "location": location,
+            "unit": "kilowatt hour",
+            "reference product": "electricity, high voltage",
+            "volume": volume,
+        }
+
+    database = [
+        power_plant("coal plant", "DE", 3.0),
+        power_plant("coal plant", "FR", 1.0),
+        power_plant("coal plant", "PL", 0.0),
+        power_plant("wind turbine", "RoW", 0.0),
+        power_plant("wind turbine", "CH", 1.0),
+    ]
+    el = Electricity.__new__(Electricity)
+    el.iam_data = SimpleNamespace(
+        electricity_markets=xr.DataArray(
+            [0.5, 0.5], coords={"variables": ["Coal", "Wind"]}, dims="variables"
+        )
+    )
+    el.database, el.regions, el.system_model = database, ["EUR", "World"], "cutoff"
+    el.powerplant_map = {"Coal": {"coal plant"}, "Wind": {"wind turbine"}}
+    el.geo = SimpleNamespace(iam_to_ecoinvent_location=lambda r: ["DE", "FR", "PL"])
+    el.ecoinvent_to_iam_loc = {"DE": "EUR", "FR": "EUR", "PL": "EUR", "CH": "EUR"}
+    el.production_per_tech = {
+        (ds["name"], ds["location"]): ds["volume"] for ds in database
+    }
+
+    # suppliers without production volume are dropped
+    assert el.get_technology_suppliers("Coal", "EUR") == [
+        (database[0], 0.75),
+        (database[1], 0.25),
+    ]
+    # suppliers are looked for in RER, then RoW
+    assert el.get_technology_suppliers("Wind", "EUR") == [(database[3], 1.0)]
+
+
+def test_no_electricity_markets():
+    from types import SimpleNamespace
+
+    # IAM data without electricity markets, whose update is skipped
+    iam_data = SimpleNamespace(
+        regions=["WEU", "World"],
+        electricity_markets=None,
+        production_volumes=None,
+    )
+    el = Electricity(
+        database=[],
+        iam_data=iam_data,
+        model="image",
+        pathway="SSP2-Base",
+        year=2030,
+        version="3.10",
+        system_model="cutoff",
+    )
+
+    assert el.electricity_mixes == {}
+    assert el.market_production_volumes == {}
@@ -1,6 +1,9 @@
 import unittest
 
+from constructive_geometries import resolved_row
+
 from premise.geomap import Geomap
+from premise.utils import delete_all_pickles
 
 
 class TestGeomap(unittest.TestCase):
@@ -59,6 +62,40 @@ class TestGeomap(unittest.TestCase):
         assert len(iam_locations) == 1, iam_locations
         assert iam_locations[0] == "BRA", iam_locations
 
+    def test_table(self):
+        # the table is kept when the scenario dumps are deleted
+        delete_all_pickles()
+        self.assertTrue(self.geomap.table_file().exists())
+        self.assertEqual(Geomap("image").table, self.geomap.table)
+        self.assertEqual(
+            self.geomap.table["ecoinvent_to_iam"]["IT"],
+            self.geomap.ecoinvent_to_iam_location("IT"),
+        )
+
+    def test_match(self):
+        possible_locations = ["CH", "DE", "FR", "US", ("ecoinvent", "RER"), "GLO"]
+        for contained in (True, False):
+            for exclusive in (True, False):
+                with resolved_row(possible_locations, self.geomap.geo) as geo:
+                    func = geo.contained if contained else geo.intersects
+                    expected = func(
+                        "RER",
+                        include_self=True,
+                        exclusive=exclusive,
+                        biggest_first=False,
+                        only=list(possible_locations),
+                    )
+                self.assertEqual(
+                    self.geomap.match(
+                        "RER",
+                        possible_locations,
+                        contained=contained,
+                        exclusive=exclusive,
+                        biggest_first=False,
+                    ),
+                    expected,
+                )
+
 
 # This allows the test to be run from the command line via `python test_geomap.py`
 if __name__ == "__main__":
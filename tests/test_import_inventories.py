@@ -2,9 +2,16 @@
 from pathlib import Path
 
 import pytest
+from bw2io.extractors import ExcelExtractor
 
 from premise.filesystem_constants import INVENTORY_DIR
-from premise.inventory_imports import BaseInventoryImport, DefaultInventory
+from premise.inventory_imports import (
+    BaseInventoryImport,
+    CachedExcelExtractor,
+    DefaultInventory,
+    InventoryLookup,
+    merge_inventories,
+)
 
 FILEPATH_CARMA_INVENTORIES = INVENTORY_DIR / "lci-Carma-CCS.xlsx"
 FILEPATH_BIOFUEL_INVENTORIES = INVENTORY_DIR / "lci-biofuels.xlsx"
@@ -129,3 +136,80 @@ def test_load_biofuel():
         keep_uncertainty_data=False,
     )
     assert len(bio.import_db.data) >= 150
+
+
+def test_merge_inventories():
+    def dataset(name, code, exchanges=()):
+        return {
+            "name": name,
+            "reference product": name,
+            "location": "GLO",
+            "unit": "kilogram",
+            "code": code,
+            "exchanges": list(exchanges),
+        }
+
+    first = [dataset("hydrogen", "a")]
+    second = [
+        dataset("hydrogen", "b"),
+        dataset(
+            "ammonia",
+            "c",
+            [
+                {
+                    "name": "hydrogen",
+                    "location": "GLO",
+                    "unit": "kilogram",
+                    "type": "technosphere",
+                    "product": None,
+                }
+            ],
+        ),
+    ]
+
+    data = merge_inventories([first, second])
+    assert [ds["code"] for ds in data] == ["a", "c"]
+    assert data[1]["exchanges"][0]["product"] == "hydrogen"
+
+
+def test_cached_excel_extractor():
+    data = ExcelExtractor.extract(FILEPATH_SYNGAS_INVENTORIES)
+    assert CachedExcelExtractor.extract(FILEPATH_SYNGAS_INVENTORIES) == data
+    # the second extraction reads the cached worksheets
+    assert CachedExcelExtractor.extract(FILEPATH_SYNGAS_INVENTORIES) == data
+
+
+def test_inventory_lookup():
+    db, version = get_db()
+    lookup = InventoryLookup(db, "3.8")
+
+    assert "argsthyfujgyftdgr" in lookup.codes
+    assert ("fake activity", "fake product", "IAI Area, Africa") in lookup.names
+    assert (
+        lookup.find_product("fake activity", "IAI Area, Africa", "kilogram")
+        == "fake product"
+    )
+    assert (
+        lookup.find_product("fake activity", "IAI Area, Africa", "kilogram", "other")
+        is None
+    )
+
+    lookup.add(
+        [
+            {
+                "code": "abc",
+                "name": "fake activity",
+                "reference product": "other",
+                "location": "IAI Area, Africa",
+                "unit": "kilogram",
+            }
+        ]
+    )
+    assert (
+        lookup.find_product("fake activity", "IAI Area, Africa", "kilogram", "other")
+        == "other"
+    )
+    assert (
+        lookup.find_product("fake activity", "IAI Area, Africa", "kilogram")
+        == "fake product"
+    )
@@ -0,0 +1,169 @@
+from wurst import searching as ws
+
+from premise.activity_maps import act_fltr
+from premise.indexing import (
+    ConsumerIndex,
+    DatasetIndex,
+    ProductionIndex,
+    SearchIndex,
+)
+from premise.utils import copy_on_write_database
+
+
+def make_dataset(name, ref_prod, location):
+    return {
+        "name": name,
+        "reference product": ref_prod,
+        "location": location,
+        "unit": "kilogram",
+        "exchanges": [],
+    }
+
+
+def test_dataset_index():
+    database = [
+        make_dataset("steel production", "steel", "CH"),
+        make_dataset("steel production", "steel", "DE"),
+        make_dataset("cement production", "cement", "CH"),
+    ]
+    index = DatasetIndex()
+
+    assert index.get(database, "steel production", "steel", "CH") == [database[0]]
+    assert len(index.get(database, "steel production", "steel")) == 2
+    assert index.get(database, "cement production", location="CH") == [database[2]]
+    assert index.get(database, "steel production", "steel", "FR") == []
+
+    # appended datasets are found
+    database.append(make_dataset("steel production", "steel", "FR"))
+    assert index.get(database, "steel production", "steel", "FR") == [database[-1]]
+
+    # so are datasets renamed in place
+    database[2]["name"] = "clinker production"
+    assert index.get(database, "cement production") == []
+    assert index.get(database, "clinker production") == [database[2]]
+
+    # and a new list of datasets is re-indexed
+    database = [ds for ds in database if ds["location"] != "CH"]
+    assert index.get(database, "steel production", "steel", "CH") == []
+    assert len(index.get(database, "steel production", "steel")) == 2
+
+
+def test_dataset_index_discard():
+    database = [
+        make_dataset("steel production", "steel", "CH"),
+        make_dataset("steel production", "steel", "DE"),
+    ]
+    index = DatasetIndex()
+    index.sync(database)
+
+    removed = database[0]
+    database = database[1:]
+    index.discard([removed], database)
+
+    assert index.get(database, "steel production", "steel") == [database[0]]
+    assert index.get(database, "steel production", "steel", "CH") == []
+
+
+def test_search_index():
+    database = [
+        make_dataset("electricity production, hard coal", "electricity", "CH"),
+        make_dataset("electricity production, oil", "electricity", "DE"),
+        make_dataset("heat production, hard coal", "heat", "CH"),
+        make_dataset("market for oil", "oil", "GLO"),
+    ]
+    index = SearchIndex()
+
+    for substrings in (["hard coal"], ["oil", "coal"], ["il"], ["lignite"], [""]):
+        assert index.contains(database, "name", substrings) == list(
+            ws.get_many(
+                database, ws.either(*[ws.contains("name", s) for s in substrings])
+            )
+        )
+
+    assert index.contains(database, "reference product", "heat") == [database[2]]
+
+    database.append(
+        make_dataset("electricity production, lignite", "electricity", "PL")
+    )
+    assert index.contains(database, "name", "lignite") == [database[-1]]
+
+
+def test_act_fltr_with_search_index():
+    database = [
+        make_dataset("electricity production, hard coal", "electricity", "CH"),
+        make_dataset("electricity production, hard coal, CCS", "electricity", "CH"),
+        make_dataset("heat production, hard coal", "heat", "CH"),
+    ]
+    fltr = {"name": ["electricity production, hard coal"]}
+    mask = {"name": "CCS"}
+
+    assert (
+        act_fltr(database, fltr, mask, search_index=SearchIndex(fields=("name",)))
+        == act_fltr(database, fltr, mask)
+        == [database[0]]
+    )
+
+
+def test_consumer_index():
+    supplier = ("market for steel", "steel", "GLO")
+    database = [make_dataset(f"car production {i}", "car", "CH") for i in range(3)]
+    for ds in database[:2]:
+        ds["exchanges"].append(
+            {
+                "name": supplier[0],
+                "product": supplier[1],
+                "location": supplier[2],
+                "amount": 1.0,
+                "type": "technosphere",
+            }
+        )
+    database = copy_on_write_database(database)
+    index = ConsumerIndex()
+
+    index.sync(database)
+    assert index.find_suppliers("market for steel") == [supplier]
+    assert index.consumers([supplier]) == database[:2]
+
+    # replaced exchanges are re-indexed
+    database[0]["exchanges"] = []
+    database.append(make_dataset("bike production", "bike", "CH"))
+    database[-1]["exchanges"] = [dict(e) for e in database[1]["exchanges"]]
+    index.sync(database)
+    assert index.consumers([supplier]) == [database[1], database[-1]]
+
+    # as are exchanges modified in place, once refreshed
+    database[1]["exchanges"][0]["location"] = "RER"
+    index.refresh([database[1]])
+    assert index.consumers([supplier]) == [database[-1]]
+    assert index.consumers(
+        index.find_suppliers("market for steel", "steel", "RER")
+    ) == [database[1]]
+
+
+def test_production_index():
+    database = [
+        make_dataset("steel production", "steel", "CH"),
+        make_dataset("steel production", "steel", "DE"),
+    ]
+    database[0]["exchanges"].append(
+        {"type": "production", "amount": 1.0, "production volume": 5}
+    )
+    index = ProductionIndex.from_database(database)
+
+    assert ("steel production", "steel") in index
+    assert index.contains("steel production", "steel", "CH")
+    assert not index.contains("steel production", "steel", "FR")
+    assert index.get(("steel production", "steel")) == [
+        {
+            "name": "steel production",
+            "reference product": "steel",
+            "location": loc,
+            "unit": "kilogram",
+            "production volume": volume,
+        }
+        for loc, volume in (("CH", 5.0), ("DE", 0.0))
+    ]
+
+    index.remove("steel production", "steel", "CH")
+    assert index.locations(("steel production", "steel")) == ["DE"]
+    assert index.get(("cement production", "cement")) == []
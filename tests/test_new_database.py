@@ -0,0 +1,101 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from premise.new_database import NewDatabase
+from premise.utils import relink_cache_file
+
+
+def make_dataset(name, location):
+    return {
+        "name": name,
+        "reference product": name,
+        "location": location,
+        "unit": "kilogram",
+        "exchanges": [{"type": "production", "production volume": 1.0}],
+    }
+
+
+def make_new_database(source_fingerprint):
+    # bypass the extraction of the source database and of the IAM data
+    ndb = NewDatabase.__new__(NewDatabase)
+    ndb.version = "3.10"
+    ndb.system_model = "cutoff"
+    ndb.use_absolute_efficiency = False
+    ndb.gains_scenario = "CLE"
+    ndb.cache_format = "pickle"
+    ndb.source_fingerprint = source_fingerprint
+    ndb.database = [make_dataset("heat", "CH"), make_dataset("clinker", "CH")]
+    ndb.scenarios = [{"model": "remind", "pathway": "SSP2-Base", "year": 2030}]
+    return ndb
+
+
+def test_update_with_relink_cache():
+    heat = ("heat", "heat", "GLO", "kilogram")
+    seeded = []
+
+    def update_cement(scenario, version, system_model, workers=None):
+        cache = scenario["cache"].setdefault("CH", {}).setdefault("remind", {})
+        seeded.append(dict(cache))
+        cache.setdefault(heat, [("heat", "heat", "CH", "kilogram", 1.0)])
+        return scenario
+
+    source_fingerprint = uuid.uuid4().hex[:16]
+    filepath = relink_cache_file(source_fingerprint, "remind", "cement")
+
+    try:
+        with patch("premise.new_database._update_cement", update_cement):
+            for _ in range(2):
+                ndb = make_new_database(source_fingerprint)
+                ndb.update("cement", relink_cache=True)
+                ndb.scenarios[0]["database filepath"].unlink()
+    finally:
+        stored = filepath.exists()
+        filepath.unlink(missing_ok=True)
+
+    assert stored
+    # the second run starts from the entry stored by the first one
+    assert seeded == [{}, {heat: [("heat", "heat", "CH", "kilogram", 1.0)]}]
+
+
+def test_update_with_region_workers():
+    workers = []
+
+    def update_cement(scenario, version, system_model, region_workers=None):
+        workers.append(region_workers)
+        return scenario
+
+    with (
+        patch(
+            "premise.new_database.check_presence_biosphere_database",
+            lambda name: name,
+        ),
+        patch(
+            "premise.new_database.fingerprint_source_database",
+            lambda *args: "fingerprint",
+        ),
+        patch("premise.new_database.delete_all_pickles"),
+        patch.object(
+            NewDatabase,
+            "_NewDatabase__find_cached_db",
+            lambda self, db_name: [make_dataset("clinker", "CH")],
+        ),
+        patch.object(
+            NewDatabase,
+            "_NewDatabase__find_cached_inventories",
+            lambda self, db_name: None,
+        ),
+    ):
+        ndb = NewDatabase(scenarios=[], source_db="ecoinvent", quiet=True)
+
+    ndb.scenarios = [{"model": "remind", "pathway": "SSP2-Base", "year": 2030}]
+
+    with patch("premise.new_database._update_cement", update_cement):
+        ndb.update("cement", region_workers=2)
+
+        with pytest.raises(ValueError):
+            ndb.update("cement", region_workers=0)
+
+    ndb.scenarios[0]["database filepath"].unlink()
+    assert workers == [2]
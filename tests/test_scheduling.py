@@ -0,0 +1,86 @@
+from premise.indexing import ProductionIndex
+from premise.scheduling import (
+    SECTOR_DEPENDENCIES,
+    apply_sectors_concurrently,
+    schedule_sectors,
+    sectors_conflict,
+)
+
+
+def make_dataset(name, location):
+    return {
+        "name": name,
+        "reference product": name,
+        "location": location,
+        "unit": "kilogram",
+        "exchanges": [{"name": name, "amount": 1.0, "type": "production"}],
+    }
+
+
+def scale(scenario, name, factor):
+    for ds in scenario["database"]:
+        if ds["name"] == name:
+            ds["exchanges"][0]["amount"] *= factor
+    return scenario
+
+
+def regionalize(scenario, name, region):
+    # the original dataset stays in the database, but is unlisted
+    if not scenario.get("index"):
+        scenario["index"] = ProductionIndex.from_database(scenario["database"])
+    scenario["index"].remove(name, name, "CH")
+    dataset = make_dataset(name, region)
+    scenario["database"].append(dataset)
+    scenario["index"].add_dataset(dataset)
+    scenario["cache"] = {region: {"model": {name: name}}}
+    return scenario
+
+
+def test_schedule_sectors():
+    assert not sectors_conflict("cement", "steel")
+    assert sectors_conflict("electricity", "cement")
+    assert sectors_conflict("emissions", "cars")
+    assert sectors_conflict("unknown", "cars")
+
+    assert schedule_sectors(list(SECTOR_DEPENDENCIES)) == [
+        ["biomass"],
+        ["electricity"],
+        ["dac", "cement", "steel"],
+        ["fuels"],
+        ["heat"],
+        ["emissions"],
+        ["cars", "two_wheelers", "trucks", "buses"],
+        ["external"],
+    ]
+
+
+def test_apply_sectors_concurrently():
+    database = [make_dataset("cement", "CH"), make_dataset("steel", "CH")]
+    methods = {
+        "cement": {"func": regionalize, "args": ("cement", "EUR")},
+        "steel": {"func": scale, "args": ("steel", 2)},
+        "more steel": {"func": scale, "args": ("steel", 3)},
+    }
+
+    serial = {"database": [make_dataset(ds["name"], "CH") for ds in database]}
+    for sector in ("cement", "steel", "more steel"):
+        serial = methods[sector]["func"](serial, *methods[sector]["args"])
+
+    scenario = {"database": database}
+    deferred = apply_sectors_concurrently(
+        scenario, ["cement", "steel", "more steel"], methods
+    )
+
+    # "more steel" changes the same dataset as "steel"
+    assert deferred == ["more steel"]
+    assert scenario["applied functions"] == ["cement", "steel"]
+    assert scenario["cache"] == {"EUR": {"model": {"cement": "cement"}}}
+    assert database[1]["exchanges"][0]["amount"] == 1.0
+
+    # the unlisted dataset stays unlisted
+    assert scenario["index"].locations(("cement", "cement")) == ["EUR"]
+    assert scenario["index"].locations(("steel", "steel")) == ["CH"]
+    assert scenario["index"].signatures() == serial["index"].signatures()
+
+    scenario = scale(scenario, "steel", 3)
+    assert scenario["database"] == serial["database"]
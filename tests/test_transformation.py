@@ -0,0 +1,107 @@
+from premise.indexing import DatasetIndex, ProductionIndex, SearchIndex
+from premise.transformation import BaseTransformation
+
+
+class Relinking(BaseTransformation):
+    def relink_technosphere_exchanges(self, dataset, **kwargs):
+        # link to the supplier of the region, or to the global one,
+        # as the GIS matching would, and record the link in the cache
+        for exc in dataset["exchanges"]:
+            if exc["type"] == "technosphere":
+                if (exc["name"], exc["product"]) not in self.index:
+                    for ds in self.database:
+                        if ds["name"] == exc["name"]:
+                            self.add_to_index(ds)
+                locations = self.index.locations((exc["name"], exc["product"]))
+                location = (
+                    dataset["location"] if dataset["location"] in locations else "GLO"
+                )
+                self.add_new_entry_to_cache(
+                    dataset["location"],
+                    dict(exc),
+                    [dict(exc, location=location)],
+                    [1.0],
+                )
+                exc["location"] = location
+        return dataset
+
+
+def make_dataset(name, location, inputs=()):
+    return {
+        "name": name,
+        "reference product": name,
+        "location": location,
+        "unit": "kilogram",
+        "exchanges": [
+            {
+                "name": name,
+                "product": name,
+                "location": location,
+                "unit": "kilogram",
+                "amount": 1.0,
+                "type": "production",
+                "production volume": 1.0,
+            }
+        ]
+        + [
+            {
+                "name": i,
+                "product": i,
+                "location": "GLO",
+                "unit": "kilogram",
+                "amount": 1.0,
+                "type": "technosphere",
+            }
+            for i in inputs
+        ],
+    }
+
+
+def make_transformation(workers):
+    transformation = Relinking.__new__(Relinking)
+    transformation.database = [
+        make_dataset("clinker", "RoW", ["electricity", "heat"]),
+        make_dataset("electricity", "GLO"),
+        make_dataset("electricity", "EUR"),
+        make_dataset("heat", "GLO"),
+        make_dataset("heat", "CHA"),
+    ]
+    # heat is missing from the index, and found in the database
+    transformation.index = ProductionIndex.from_database(
+        [ds for ds in transformation.database if ds["name"] != "heat"]
+    )
+    transformation.dataset_index = DatasetIndex()
+    transformation.search_index = SearchIndex()
+    transformation.cache = {}
+    transformation.model = "remind"
+    transformation.workers = workers
+    return transformation
+
+
+def test_fetch_proxies_in_parallel():
+    regions = {region: "RoW" for region in ("EUR", "CHA", "USA", "IND", "JPN")}
+
+    results = []
+    for workers in (None, 3):
+        transformation = make_transformation(workers)
+        proxies = transformation.fetch_proxies(
+            name="clinker",
+            ref_prod="clinker",
+            geo_mapping=regions,
+            empty_original_activity=False,
+        )
+        results.append((transformation, proxies))
+
+    (serial, serial_proxies), (parallel, parallel_proxies) = results
+
+    for proxies in (serial_proxies, parallel_proxies):
+        for region in regions:
+            proxies[region].pop("code")
+
+    assert list(parallel_proxies) == list(regions)
+    assert parallel_proxies == serial_proxies
+    assert parallel_proxies["EUR"]["exchanges"][1]["location"] == "EUR"
+    assert parallel_proxies["CHA"]["exchanges"][2]["location"] == "CHA"
+    assert parallel.cache == serial.cache
+    assert list(parallel.cache) == list(regions)
+    assert parallel.index.locations(("heat", "heat")) == ["GLO", "CHA"]
@@ -102,3 +102,256 @@ def test_default_location():
 def test_print_version(mocked_print):
     print_version()
     assert mocked_print.mock_calls == [call(f"premise v.{__version__}")]
+
+
+def test_copy_on_write_database():
+    import pickle
+    from copy import deepcopy
+
+    base = [
+        {
+            "name": "foo",
+            "location": "CH",
+            "exchanges": [{"name": "bar", "amount": 1.0, "type": "technosphere"}],
+        }
+    ]
+    copy = copy_on_write_database(base)
+
+    copy[0]["exchanges"][0]["amount"] = 2.0
+    copy[0]["exchanges"].append({"name": "baz", "amount": 1.0})
+    copy[0]["location"] = "DE"
+
+    assert base[0]["exchanges"] == [
+        {"name": "bar", "amount": 1.0, "type": "technosphere"}
+    ]
+    assert base[0]["location"] == "CH"
+    assert copy[0]["exchanges"][0]["amount"] == 2.0
+    assert len(copy[0]["exchanges"]) == 2
+
+    # copies and pickles are plain dictionaries
+    other = copy_on_write_database(base)[0]
+    assert type(pickle.loads(pickle.dumps(other))) is dict
+    assert type(deepcopy(other)) is dict
+    dict(other)["exchanges"].append({})
+    {**other}["exchanges"].append({})
+    assert len(base[0]["exchanges"]) == 1
+
+    # views of copy-on-write datasets share their fields too
+    layer = copy_on_write_database(base)
+    view = copy_on_write_database(layer)
+    assert dict.__getitem__(layer[0], "exchanges") is base[0]["exchanges"]
+    assert dict.__getitem__(view[0], "exchanges") is base[0]["exchanges"]
+    view[0]["exchanges"].append({})
+    assert view[0].differs_from(layer[0])
+    assert dict.__getitem__(layer[0], "exchanges") is base[0]["exchanges"]
+
+
+def test_dump_and_load_database_arrow():
+    database = [
+        {
+            "name": "foo",
+            "location": "CH",
+            "exchanges": [
+                {"name": "bar", "amount": 1.0, "input": ("db", "code")},
+            ],
+            "comment": None,
+        },
+        {"name": "baz", "location": "DE", "exchanges": []},
+    ]
+    scenario = dump_database(
+        {"database": copy_on_write_database(database)}, cache_format="arrow"
+    )
+    assert scenario["database filepath"].suffix == ".arrow"
+
+    scenario = load_database(scenario)
+    assert scenario["database"] == database
+    assert type(scenario["database"][0]["exchanges"][0]["input"]) is tuple
+
+
+def test_database_to_table():
+    import pyarrow as pa
+
+    from premise.columnar import database_to_table, table_to_database
+
+    database = [
+        {
+            "name": "foo",
+            "location": "CH",
+            "classifications": [("ISIC rev.4 ecoinvent", "2394:Manufacture of cement")],
+            "exchanges": [
+                {"name": "foo", "amount": 1.0, "type": "production", "pv": 10},
+                {"name": "bar", "amount": 0.5, "input": ("db", "code")},
+            ],
+        },
+        {"name": "baz", "location": None, "parameters": {"a": 1.0}, "exchanges": []},
+        {"name": "qux", "location": "DE", "exchanges": [{"amount": 2}]},
+    ]
+    table = database_to_table(database)
+
+    # strings are dictionary-encoded, tuples stored as lists
+    exchanges = table.schema.field("exchanges").type.value_type
+    assert pa.types.is_dictionary(exchanges.field("name").type)
+    assert pa.types.is_list(exchanges.field("input").type)
+    assert table.schema.field("parameters").metadata == {b"encoding": b"pickle"}
+
+    assert table_to_database(table) == database
+    assert table_to_database(table.slice(1, 2)) == database[1:]
+    decoded = table_to_database(table)[0]
+    assert type(decoded["classifications"][0]) is tuple
+    assert type(decoded["exchanges"][0]["pv"]) is int
+
+
+def test_mapped_database(tmp_path):
+    from premise.columnar import MappedDatabase, write_database
+
+    database = [
+        {"name": f"foo {i}", "location": "CH", "exchanges": [{"amount": float(i)}]}
+        for i in range(5)
+    ]
+    for dataset in database[::2]:
+        dataset["comment"] = f"comment on {dataset['name']}"
+    write_database(database, tmp_path / "db.arrow")
+    mapped = MappedDatabase(tmp_path / "db.arrow", batch_size=2)
+
+    assert len(mapped) == 5
+    assert list(mapped) == database
+    assert mapped[-1] == database[-1]
+    assert mapped[1] == database[1]
+    assert mapped[1:3] == database[1:3]
+
+    # decoded datasets are copies
+    mapped[0]["name"] = "bar"
+    assert mapped[0]["name"] == "foo 0"
+
+    # appended datasets are kept in memory, and pickled with the mapping
+    mapped.append({"name": "baz", "exchanges": []})
+    other = pickle.loads(pickle.dumps(mapped))
+    assert list(other) == database + [{"name": "baz", "exchanges": []}]
+
+
+def test_checkpoint_and_resume(tmp_path):
+    import pytest
+
+    from premise.new_database import _update_scenario
+
+    calls = []
+
+    def scale(scenario, factor):
+        calls.append(factor)
+        for ds in scenario["database"]:
+            ds["exchanges"][0]["amount"] *= factor
+        return scenario
+
+    def fail(scenario):
+        raise RuntimeError("sector failed")
+
+    database = [{"name": "foo", "location": "CH", "exchanges": [{"amount": 1.0}]}]
+    methods = {
+        "double": {"func": scale, "args": (2,)},
+        "triple": {"func": fail, "args": ()},
+    }
+    checkpoint = tmp_path / "checkpoint.pickle"
+    scenario = {"model": "remind", "pathway": "SSP2-Base", "year": 2030}
+
+    with pytest.raises(RuntimeError):
+        _update_scenario(
+            dict(scenario), list(methods), methods, database, checkpoint=checkpoint
+        )
+
+    assert load_checkpoint({}, checkpoint)["applied functions"] == ["double"]
+
+    # completed sectors are skipped when resuming
+    methods["triple"] = {"func": scale, "args": (3,)}
+    scenario = _update_scenario(
+        scenario, list(methods), methods, database, checkpoint=checkpoint, resume=True
+    )
+    scenario = load_database(scenario)
+
+    assert calls == [2, 3]
+    assert scenario["applied functions"] == ["double", "triple"]
+    assert scenario["database"][0]["exchanges"][0]["amount"] == 6.0
+    assert database[0]["exchanges"][0]["amount"] == 1.0
+    assert not checkpoint.exists()
+
+
+def test_relink_cache(tmp_path):
+    def make_dataset(name, location, volume=1.0):
+        return {
+            "name": name,
+            "reference product": name,
+            "location": location,
+            "unit": "kilogram",
+            "exchanges": [{"type": "production", "production volume": volume}],
+        }
+
+    def relink(scenario):
+        # link heat in CH to its Swiss supplier, and add a dataset
+        # supplying steel, which makes the steel links unsafe to store
+        cache = scenario["cache"].setdefault("CH", {}).setdefault("remind", {})
+        for product in ("heat", "steel"):
+            key = (product, product, "GLO", "kilogram")
+            cache.setdefault(key, [(product, product, "CH", "kilogram", 1.0)])
+        dataset = make_dataset("steel", "EUR")
+        scenario["database"].append(dataset)
+        scenario["index"].add_dataset(dataset)
+        return scenario
+
+    filepath = tmp_path / "relink.pickle"
+    heat = ("heat", "heat", "GLO", "kilogram")
+    steel = ("steel", "steel", "GLO", "kilogram")
+
+    def new_scenario(volume=1.0):
+        database = [make_dataset("heat", "CH", volume), make_dataset("steel", "CH")]
+        return {"model": "remind", "database": database}
+
+    scenario = new_scenario()
+    signatures, cached_keys = load_relink_cache(scenario, filepath)
+    scenario = relink(scenario)
+    save_relink_cache(scenario, filepath, signatures, cached_keys)
+
+    # only the heat link is stored, and it pre-seeds the next run
+    scenario = new_scenario()
+    load_relink_cache(scenario, filepath)
+    assert scenario["cache"] == {
+        "CH": {"remind": {heat: [("heat", "heat", "CH", "kilogram", 1.0)]}}
+    }
+    assert steel not in scenario["cache"]["CH"]["remind"]
+
+    # it is dropped once the suppliers of heat differ
+    scenario = new_scenario(volume=2.0)
+    load_relink_cache(scenario, filepath)
+    assert scenario["cache"] == {}
+
+
+def test_update_scenario_shares_mapped_database(tmp_path):
+    from premise.columnar import MappedDatabase, write_database
+    from premise.new_database import _update_scenario
+
+    def rename(scenario):
+        scenario["database"][0]["exchanges"][0]["amount"] = 2.0
+        return scenario
+
+    database = [
+        {"name": f"foo {i}", "location": "CH", "exchanges": [{"amount": float(i)}]}
+        for i in range(3)
+    ]
+    write_database(database, tmp_path / "db.arrow")
+    mapped = MappedDatabase(tmp_path / "db.arrow")
+    methods = {"rename": {"func": rename, "args": ()}}
+
+    shared = mapped.shared_datasets()
+    # datasets are decoded once, and shared by the callers
+    assert all(a is b for a, b in zip(shared, mapped.shared_datasets()))
+
+    for _ in range(2):
+        scenario = _update_scenario(
+            {"model": "remind", "pathway": "SSP2-Base", "year": 2030},
+            ["rename"],
+            methods,
+            mapped,
+        )
+        scenario = load_database(scenario)
+        assert scenario["database"][0]["exchanges"][0]["amount"] == 2.0
+
+    # changes made by the scenarios do not reach the shared datasets
+    assert mapped.shared_datasets() == database